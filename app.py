@@ -2,6 +2,8 @@
 FastAPI 백엔드 — 경쟁사 카드 이벤트 인텔리전스 시스템
 """
 
+import asyncio
+import hashlib
 import json
 import logging
 import sys
@@ -17,18 +19,21 @@ from contextlib import asynccontextmanager
 from datetime import datetime, date, timedelta
 from threading import Lock
 
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.requests import Request
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import func
 from typing import List, Optional
 from pydantic import BaseModel
 import uvicorn
 
 import database as db
+from modules.cache import VersionedCache
 
 logger = logging.getLogger(__name__)
 COMPANY_BRIEF_TTL_SEC = 600
@@ -37,20 +42,61 @@ _COMPANY_BRIEF_CACHE = {}
 _QUAL_COMPARISON_CACHE = None
 _COMPANY_BRIEF_LOCK = Lock()
 
-# 간단한 메모리 캐시 (벤치마크/매트릭스 등)
-_SIMPLE_CACHE = {}
-_SIMPLE_CACHE_TTL = 300  # 5분
+# 분석 결과 캐시 (벤치마크/매트릭스 등): 데이터 버전이 바뀔 때까지 유효, LRU 상한
+_ANALYTICS_CACHE = VersionedCache()
 
 
-def _cached(key, builder, ttl=None):
-    """간단한 메모리 캐시. builder()의 결과를 TTL만큼 캐시."""
-    now = datetime.now()
-    entry = _SIMPLE_CACHE.get(key)
-    if entry and (now - entry["at"]).total_seconds() <= (ttl or _SIMPLE_CACHE_TTL):
-        return entry["data"]
-    data = builder()
-    _SIMPLE_CACHE[key] = {"data": data, "at": now}
-    return data
+def _cached(session: Session, key: str, builder):
+    """builder() 결과를 현재 데이터 버전 기준으로 캐시. 날짜에 따라 달라지는 결과는 key에 날짜 포함."""
+    return _ANALYTICS_CACHE.get_or_build(key, db.get_data_version(session), builder)
+
+
+# ETag / If-None-Match: 태그가 같으면 payload 계산 없이 304
+def _make_etag(*parts) -> str:
+    """
+    약한 검증자(W/"...") 태그. 같은 태그가 GZipMiddleware의 gzip/원문 응답 모두에 붙으므로
+    바이트 동일성을 약속하는 강한 태그는 쓰지 않는다 (비교도 약한 비교, _etag_matches).
+    """
+    raw = "|".join(str(p) for p in parts)
+    return 'W/"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def _version_etag(request: Request, session: Session) -> str:
+    """데이터 버전 + 경로/쿼리 + 오늘 날짜 기반 태그. payload를 만들기 전에 계산 가능."""
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    return _make_etag("v", db.get_data_version(session), request.url.path, query, date.today())
+
+
+def _content_etag(payload) -> str:
+    """내용 해시 기반 태그 (생성 시각 등 가변 필드 제외). Gemini 캐시/진행 상태처럼 데이터 버전과 무관한 응답용."""
+    return _make_etag("c", _section_version(payload))
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # 약한 비교 (RFC 9110 8.8.3.2): W/ 접두사를 떼고 opaque-tag만 비교
+    return etag.removeprefix("W/") in {t.strip().removeprefix("W/") for t in header.split(",")}
+
+
+def _not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    If-None-Match가 etag와 같으면 304 응답, 아니면 response에 ETag를 달고 None.
+    사용: return _not_modified(request, response, etag) or build()
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _cached_response(request: Request, response: Response, session: Session, key: str, builder):
+    """_cached + 데이터 버전 ETag. 태그가 맞으면 캐시 조회/builder 없이 304."""
+    return _not_modified(request, response, _version_etag(request, session)) or _cached(session, key, builder)
 
 
 # ===========================================================================
@@ -78,8 +124,10 @@ def _ratio(n, d):
 # 분석 함수
 # ===========================================================================
 
-def build_company_overview(session: Session) -> dict:
-    events = session.query(db.CardEvent).all()
+def build_company_overview(session: Session, events: List[db.CardEvent] = None) -> dict:
+    """events: 미리 읽어 둔 전체 이벤트(비노출 포함). None이면 조회."""
+    if events is None:
+        events = session.query(db.CardEvent).all()
     by = defaultdict(lambda: {
         "company": "", "collected_count": 0, "visible_count": 0,
         "active_count": 0, "ended_count": 0, "extracted_count": 0,
@@ -92,7 +140,7 @@ def build_company_overview(session: Session) -> dict:
     for ev in events:
         c = (ev.company or "기타").strip()
         it = by[c]; it["company"] = c; it["collected_count"] += 1
-        if db.has_meaningful_info(ev):
+        if ev.is_visible:
             it["visible_count"] += 1
             if ev.period_end and ev.period_end >= today:
                 it["active_count"] += 1
@@ -134,10 +182,13 @@ def build_company_overview(session: Session) -> dict:
     return {"generated_at": datetime.now().isoformat(), "totals": totals, "companies": rows}
 
 
-def build_trends(session: Session, from_date: date, to_date: date) -> dict:
-    events = session.query(db.CardEvent).filter(
-        db.CardEvent.period_start.isnot(None)
-    ).all()
+def build_trends(session: Session, from_date: date, to_date: date, events: List[db.CardEvent] = None) -> dict:
+    if events is None:
+        events = session.query(db.CardEvent).filter(
+            db.CardEvent.period_start.isnot(None)
+        ).all()
+    else:
+        events = [ev for ev in events if ev.period_start is not None]
     by_week = defaultdict(lambda: {"started": 0, "ended": 0})
     for ev in events:
         if ev.period_start and from_date <= ev.period_start <= to_date:
@@ -150,15 +201,16 @@ def build_trends(session: Session, from_date: date, to_date: date) -> dict:
             "weeks": dict(sorted(by_week.items()))}
 
 
-def build_strategy_map(session: Session) -> dict:
-    """카드사 x objective_tags 히트맵 데이터"""
-    rows = session.query(db.EventInsight).all()
+def build_strategy_map(session: Session, company_by_id: dict = None) -> dict:
+    """카드사 x objective_tags 히트맵 데이터. company_by_id: {event_id: company} (None이면 조회)"""
+    rows = session.query(db.EventInsight.event_id, db.EventInsight.objective_tags).all()
+    if company_by_id is None:
+        company_by_id = dict(session.query(db.CardEvent.id, db.CardEvent.company).all())
     heatmap = defaultdict(lambda: defaultdict(int))
     for row in rows:
-        ev = row.event
-        if not ev:
+        if row.event_id not in company_by_id:
             continue
-        company = (ev.company or "기타").strip()
+        company = (company_by_id[row.event_id] or "기타").strip()
         tags = []
         try:
             tags = json.loads(row.objective_tags) if row.objective_tags else []
@@ -169,11 +221,14 @@ def build_strategy_map(session: Session) -> dict:
     return {"heatmap": {k: dict(v) for k, v in heatmap.items()}}
 
 
-def build_benefit_benchmark(session: Session) -> dict:
+def build_benefit_benchmark(session: Session, events: List[db.CardEvent] = None) -> dict:
     """카드사별 혜택 금액/비율 분포"""
-    events = session.query(db.CardEvent).filter(
-        db.CardEvent.benefit_amount_won.isnot(None)
-    ).all()
+    if events is None:
+        events = session.query(db.CardEvent).filter(
+            db.CardEvent.benefit_amount_won.isnot(None)
+        ).all()
+    else:
+        events = [ev for ev in events if ev.benefit_amount_won is not None]
     by_company = defaultdict(list)
     for ev in events:
         c = (ev.company or "기타").strip()
@@ -200,15 +255,14 @@ def build_benefit_benchmark(session: Session) -> dict:
 
 def build_compare_matrix(session: Session, axis: str = "category") -> dict:
     """카드사 x 축 교차 건수 매트릭스. axis: category/benefit_type/target/strategy"""
-    events = session.query(db.CardEvent).all()
     heatmap = defaultdict(lambda: defaultdict(int))
 
     if axis in ("category", "benefit_type"):
-        for ev in events:
-            if not db.has_meaningful_info(ev):
-                continue
-            company = (ev.company or "기타").strip()
-            val = (getattr(ev, axis, None) or "").strip()
+        column = getattr(db.CardEvent, axis)
+        rows = session.query(db.CardEvent.company, column).filter(db.CardEvent.is_visible == 1).all()
+        for company, val in rows:
+            company = (company or "기타").strip()
+            val = (val or "").strip()
             if val:
                 heatmap[company][val] += 1
     elif axis in ("target", "strategy"):
@@ -237,9 +291,11 @@ def build_compare_matrix(session: Session, axis: str = "category") -> dict:
 
 def build_shinhan_gap(session: Session) -> dict:
     """신한이 미대응이지만 경쟁사에 있는 카테고리 갭 분석."""
-    events = [e for e in session.query(db.CardEvent).all() if db.has_meaningful_info(e)]
     today = date.today()
-    active = [e for e in events if e.period_end and e.period_end >= today]
+    active = session.query(db.CardEvent).filter(
+        db.CardEvent.is_visible == 1,
+        db.CardEvent.period_end >= today,
+    ).all()
 
     cat_company = defaultdict(lambda: defaultdict(list))
     for ev in active:
@@ -274,8 +330,12 @@ def build_shinhan_gap(session: Session) -> dict:
 def _build_shinhan_gap_trend(session: Session, num_weeks: int = 8) -> dict:
     """주차별 신한 공백 카테고리 수 추세."""
     from datetime import timedelta as td
-    events = [e for e in session.query(db.CardEvent).all() if db.has_meaningful_info(e)]
     today = date.today()
+    events = session.query(db.CardEvent).filter(
+        db.CardEvent.is_visible == 1,
+        db.CardEvent.period_start.isnot(None),
+        db.CardEvent.period_end.isnot(None),
+    ).all()
     shinhan_key = "신한카드"
     result_weeks = []
     gap_counts = []
@@ -563,7 +623,8 @@ def _company_order_key(company: str) -> tuple:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
-    from modules.pipeline import run_extract_and_enrich
+    from modules.pipeline import run_extract_and_enrich, enrichment_worker_loop
+    from modules.browser import close_browser_pool
 
     scheduler = AsyncIOScheduler()
     scheduler.add_job(
@@ -575,9 +636,19 @@ async def lifespan(app: FastAPI):
     )
     scheduler.start()
     print("[스케줄러] 파이프라인: 30초 후 첫 실행, 이후 6시간마다")
+    # rule 인사이트 -> Gemini 업그레이드 대기열 워커 (GEMINI_MAX_RPM 내에서 상시 소비)
+    worker_stop = asyncio.Event()
+    worker_task = asyncio.create_task(enrichment_worker_loop(worker_stop))
     sys.stdout.flush()
     yield
+    worker_stop.set()
+    worker_task.cancel()
+    try:
+        await worker_task
+    except (asyncio.CancelledError, Exception):
+        pass
     scheduler.shutdown(wait=False)
+    await close_browser_pool()
 
 
 # ===========================================================================
@@ -628,6 +699,8 @@ async def pipeline_error_middleware(request, call_next):
 
 
 app.middleware("http")(pipeline_error_middleware)
+# 1KB 이상 JSON 응답 gzip (대시보드 bootstrap/이벤트 목록)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 
 # Static Files Mount (Robust)
@@ -672,6 +745,29 @@ class EventResponse(BaseModel):
         from_attributes = True
 
 
+class EventSummary(BaseModel):
+    """목록 화면용 경량 응답 (fields=summary). 대용량 Text 컬럼은 SQL에서부터 제외."""
+    id: int
+    url: str
+    company: str
+    category: Optional[str] = None
+    title: str
+    period: Optional[str] = None
+    period_start: Optional[date] = None
+    period_end: Optional[date] = None
+    benefit_type: Optional[str] = None
+    benefit_value: Optional[str] = None
+    benefit_amount_won: Optional[int] = None
+    benefit_pct: Optional[float] = None
+    conditions: Optional[str] = None
+    target_segment: Optional[str] = None
+    threat_level: Optional[str] = None
+    status: Optional[str] = None
+    marketing_insights: Optional[str] = None  # benefit_level/objective_tags 등 목록용 키만 남긴 JSON
+    extracted: bool = False
+    created_at: Optional[datetime] = None
+
+
 class EventCreate(BaseModel):
     url: str
     company: str
@@ -712,24 +808,58 @@ async def redirect_index():
     return RedirectResponse(url="/", status_code=302)
 
 
-@app.get("/api/events", response_model=List[EventResponse])
+@app.get("/api/events", response_model=None,
+         responses={200: {"model": List[EventResponse], "description": "fields=summary면 EventSummary 목록"}})
 async def get_events(
+    request: Request,
+    response: Response,
     company: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     threat_level: Optional[str] = Query(None),
     page: Optional[int] = Query(None, ge=1),
     size: int = Query(1000, ge=1, le=5000),
-    db_session: Session = Depends(db.get_db),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값 (created_at, id keyset)"),
+    include_total: bool = Query(True, description="X-Total-Count 헤더 계산 여부 (대량 조회 시 false 권장)"),
+    fields: Optional[str] = Query(None, description="summary 또는 쉼표 구분 필드 목록 (예: id,title,company)"),
+    db_session: Session = Depends(db.get_read_db),
 ):
+    """
+    이벤트 목록 (최신순). 다음 페이지는 X-Next-Cursor 헤더 값을 cursor로 넘겨 조회.
+    page는 OFFSET 방식 하위호환용이며, cursor가 있으면 무시된다.
+    fields를 주면 해당 컬럼만 SELECT (summary = EventSummary 필드).
+    ETag는 데이터 버전+쿼리 기준이며, 304에는 X-Next-Cursor/X-Total-Count가 없으므로 직전 200 응답 값을 재사용.
+    """
+    not_modified = _not_modified(request, response, _version_etag(request, db_session))
+    if not_modified:
+        return not_modified
+    projection = None
+    if fields:
+        if fields.strip() == "summary":
+            projection = "summary"
+        else:
+            projection = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = [f for f in projection if f not in EventResponse.model_fields]
+            if unknown:
+                raise HTTPException(400, f"알 수 없는 필드: {', '.join(unknown)}")
     filters = {}
     if company: filters["company"] = company
     if category: filters["category"] = category
     if threat_level: filters["threat_level"] = threat_level
-    all_events = db.get_all_events(db_session, filters)
-    if page is not None:
-        offset = (page - 1) * size
-        return all_events[offset:offset + size]
-    return all_events[:size]
+    offset = (page - 1) * size if page is not None else None
+    try:
+        rows, next_cursor = db.list_events(db_session, filters, limit=size, cursor=cursor, offset=offset,
+                                           fields=projection)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if include_total:
+        response.headers["X-Total-Count"] = str(db.count_events(db_session, filters))
+    if projection is None:
+        return [EventResponse.model_validate(row) for row in rows]
+    if projection == "summary":
+        return [EventSummary.model_validate(row) for row in rows]
+    return rows
 
 
 @app.post("/api/events/extract-pending")
@@ -742,7 +872,7 @@ async def extract_pending_events(
 
 
 @app.get("/api/events/{event_id}", response_model=EventResponse)
-async def get_event(event_id: int, db_session: Session = Depends(db.get_db)):
+async def get_event(event_id: int, db_session: Session = Depends(db.get_read_db)):
     event = db.get_event_by_id(db_session, event_id)
     if not event:
         raise HTTPException(404, "이벤트를 찾을 수 없습니다.")
@@ -757,13 +887,14 @@ async def extract_event_detail(event_id: int, db_session: Session = Depends(db.g
     if not event.url or not event.url.startswith("http"):
         raise HTTPException(400, "유효한 URL이 없습니다.")
     try:
+        from modules.browser import get_browser_pool
         from modules.extraction import extract_detail
         from modules.normalization import normalize_extracted
-        from modules.insights import generate_hybrid_insight
+        from modules.insights import agenerate_hybrid_insight
 
-        extracted = await extract_detail(event.url)
+        extracted = await extract_detail(event.url, pool=get_browser_pool())
         update_data = normalize_extracted(extracted, event)
-        insight_data, source = generate_hybrid_insight(extracted, event.company or "")
+        insight_data, source = await agenerate_hybrid_insight(extracted, event.company or "", lane="interactive")
         update_data["marketing_insights"] = insight_data
         if source == "gemini":
             if insight_data.get("one_line_summary"):
@@ -772,13 +903,20 @@ async def extract_event_detail(event_id: int, db_session: Session = Depends(db.g
                 update_data["category"] = insight_data["category"]
             if insight_data.get("threat_level"):
                 update_data["threat_level"] = insight_data["threat_level"]
-        db.update_event(db_session, event_id, update_data)
-        mc = extracted.get("marketing_content") or {}
-        if mc:
-            db.save_sections(db_session, event_id, mc)
-        db.save_insight(db_session, event_id, insight_data, source=source)
-        db.save_snapshot(db_session, event_id, raw_text=extracted.get("raw_text"),
-                         extracted_json=extracted, latency_ms=extracted.get("extraction_latency_ms"))
+        network = extracted.get("network") or {}
+        # Gemini 슬롯이 없어 rule로 저장된 건은 워커가 나중에 업그레이드 (enqueue)
+        db.persist_enrichment_result(
+            db_session, event_id,
+            update_data=update_data,
+            sections=extracted.get("marketing_content") or {},
+            insight_data=insight_data,
+            insight_source=source,
+            snapshot={"raw_text": extracted.get("raw_text"), "extracted_json": extracted,
+                      "latency_ms": extracted.get("extraction_latency_ms"),
+                      "readiness_wait_ms": extracted.get("readiness_wait_ms"),
+                      "bytes_transferred": network.get("bytes"), "requests_blocked": network.get("blocked")},
+            enqueue=source != "gemini",
+        )
     except Exception as e:
         err = str(e).strip()
         if any(k in err.lower() for k in ("playwright", "chromium", "executable", "browser")):
@@ -806,18 +944,17 @@ async def delete_event(event_id: int, db_session: Session = Depends(db.get_db)):
 
 
 @app.get("/api/companies")
-async def get_companies(db_session: Session = Depends(db.get_db)):
+async def get_companies(db_session: Session = Depends(db.get_read_db)):
     return {"companies": db.get_companies(db_session)}
 
 
 @app.get("/api/categories")
-async def get_categories(db_session: Session = Depends(db.get_db)):
+async def get_categories(db_session: Session = Depends(db.get_read_db)):
     return {"categories": db.get_categories(db_session)}
 
 
-@app.get("/api/stats")
-async def get_statistics(db_session: Session = Depends(db.get_db)):
-    all_events = db.get_all_events(db_session)
+def build_stats(all_events: List[db.CardEvent]) -> dict:
+    """노출 이벤트 기준 카드사/위협도/카테고리 건수."""
     company_stats = {}
     threat_stats = {"High": 0, "Mid": 0, "Low": 0}
     category_stats = {}
@@ -836,20 +973,30 @@ async def get_statistics(db_session: Session = Depends(db.get_db)):
     }
 
 
+@app.get("/api/stats")
+async def get_statistics(request: Request, response: Response, db_session: Session = Depends(db.get_read_db)):
+    return _cached_response(request, response, db_session, "stats",
+                            lambda: build_stats(db.get_all_events(db_session)))
+
+
 # ---------------------------------------------------------------------------
 # 신규 Analytics API
 # ---------------------------------------------------------------------------
 
 @app.get("/api/analytics/company-overview")
-async def get_company_overview(db_session: Session = Depends(db.get_db)):
-    return build_company_overview(db_session)
+async def get_company_overview(request: Request, response: Response,
+                               db_session: Session = Depends(db.get_read_db)):
+    return _cached_response(request, response, db_session, f"company_overview:{date.today()}",
+                            lambda: build_company_overview(db_session))
 
 
 @app.get("/api/analytics/trends")
 async def get_trends(
+    request: Request,
+    response: Response,
     from_date: Optional[str] = Query(None, alias="from"),
     to_date: Optional[str] = Query(None, alias="to"),
-    db_session: Session = Depends(db.get_db),
+    db_session: Session = Depends(db.get_read_db),
 ):
     try:
         fd = date.fromisoformat(from_date) if from_date else date.today() - timedelta(days=90)
@@ -857,35 +1004,45 @@ async def get_trends(
     except Exception:
         fd = date.today() - timedelta(days=90)
         td = date.today()
-    return build_trends(db_session, fd, td)
+    return _cached_response(request, response, db_session, f"trends:{fd}:{td}",
+                            lambda: build_trends(db_session, fd, td))
 
 
 @app.get("/api/analytics/strategy-map")
-async def get_strategy_map(db_session: Session = Depends(db.get_db)):
-    return _cached("strategy_map", lambda: build_strategy_map(db_session))
+async def get_strategy_map(request: Request, response: Response,
+                           db_session: Session = Depends(db.get_read_db)):
+    return _cached_response(request, response, db_session, "strategy_map", lambda: build_strategy_map(db_session))
 
 
 @app.get("/api/analytics/compare-matrix")
 async def get_compare_matrix(
+    request: Request,
+    response: Response,
     axis: str = Query("category"),
-    db_session: Session = Depends(db.get_db),
+    db_session: Session = Depends(db.get_read_db),
 ):
     if axis not in ("category", "benefit_type", "target", "strategy"):
         raise HTTPException(400, "axis must be one of: category, benefit_type, target, strategy")
-    return build_compare_matrix(db_session, axis)
+    return _cached_response(request, response, db_session, f"compare_matrix:{axis}",
+                            lambda: build_compare_matrix(db_session, axis))
 
 
 @app.get("/api/analytics/shinhan-gap")
-async def get_shinhan_gap(db_session: Session = Depends(db.get_db)):
-    return build_shinhan_gap(db_session)
+async def get_shinhan_gap(request: Request, response: Response,
+                          db_session: Session = Depends(db.get_read_db)):
+    return _cached_response(request, response, db_session, f"shinhan_gap:{date.today()}",
+                            lambda: build_shinhan_gap(db_session))
 
 
 @app.get("/api/analytics/shinhan-gap-trend")
 async def get_shinhan_gap_trend(
+    request: Request,
+    response: Response,
     weeks: int = Query(8, ge=2, le=52),
-    db_session: Session = Depends(db.get_db),
+    db_session: Session = Depends(db.get_read_db),
 ):
-    return _cached(f"shinhan_gap_trend_{weeks}", lambda: _build_shinhan_gap_trend(db_session, weeks), ttl=600)
+    return _cached_response(request, response, db_session, f"shinhan_gap_trend:{weeks}:{date.today()}",
+                            lambda: _build_shinhan_gap_trend(db_session, weeks))
 
 
 _TEXT_COMPARISON_CACHE = None
@@ -893,8 +1050,10 @@ _TEXT_COMPARISON_CACHE = None
 
 @app.get("/api/analytics/text-comparison")
 async def get_text_comparison(
+    request: Request,
+    response: Response,
     force: bool = Query(False),
-    db_session: Session = Depends(db.get_db),
+    db_session: Session = Depends(db.get_read_db),
 ):
     global _TEXT_COMPARISON_CACHE
     now = datetime.now()
@@ -904,12 +1063,12 @@ async def get_text_comparison(
         if age <= 900:
             result = dict(_TEXT_COMPARISON_CACHE["result"])
             result["cached"] = True
-            return result
+            return _not_modified(request, response, _content_etag(result)) or result
 
     try:
-        from gemini_insight import compare_event_texts
+        from gemini_insight import acompare_event_texts
     except Exception:
-        compare_event_texts = None
+        acompare_event_texts = None
 
     # 카드사별 추출 텍스트 수집
     events = db.get_all_events(db_session)
@@ -925,8 +1084,8 @@ async def get_text_comparison(
 
     result = None
     source = "rule"
-    if compare_event_texts and company_texts:
-        result = compare_event_texts(company_texts)
+    if acompare_event_texts and company_texts:
+        result = await acompare_event_texts(company_texts)
         if result:
             source = "gemini"
 
@@ -938,36 +1097,53 @@ async def get_text_comparison(
         found = [p for p in patterns if p in all_text]
         result = {"common_patterns": found, "differentiators": {}, "condition_patterns": []}
 
-    response = {
+    payload = {
         "source": source,
         "cached": False,
         **result,
     }
-    _TEXT_COMPARISON_CACHE = {"result": response, "updated_at": now}
-    return response
+    _TEXT_COMPARISON_CACHE = {"result": payload, "updated_at": now}
+    return _not_modified(request, response, _content_etag(payload)) or payload
 
 
 @app.get("/api/analytics/benefit-benchmark")
-async def get_benefit_benchmark(db_session: Session = Depends(db.get_db)):
-    return _cached("benefit_benchmark", lambda: build_benefit_benchmark(db_session))
+async def get_benefit_benchmark(request: Request, response: Response,
+                                db_session: Session = Depends(db.get_read_db)):
+    return _cached_response(request, response, db_session, "benefit_benchmark",
+                            lambda: build_benefit_benchmark(db_session))
+
+
+def _group_by_company(events: List[db.CardEvent]) -> dict:
+    grouped = defaultdict(list)
+    for ev in events:
+        grouped[(ev.company or "기타").strip()].append(ev)
+    return grouped
 
 
 @app.get("/api/analytics/company-briefings")
 async def get_company_briefings(
+    request: Request,
+    response: Response,
     force: bool = Query(False),
-    db_session: Session = Depends(db.get_db),
+    db_session: Session = Depends(db.get_read_db),
 ):
+    payload = jsonable_encoder(await _company_briefings(db_session, force=force))
+    return _not_modified(request, response, _content_etag(payload)) or payload
+
+
+async def _company_briefings(db_session: Session, force: bool = False, overview: dict = None,
+                             grouped: dict = None) -> dict:
+    """overview/grouped(카드사별 노출 이벤트)를 넘기면 재조회 없이 사용 (bootstrap 공유 패스)."""
     try:
-        from gemini_insight import summarize_company_status
+        from gemini_insight import asummarize_company_status
     except Exception:
-        summarize_company_status = None
+        asummarize_company_status = None
 
-    overview = build_company_overview(db_session)
+    if overview is None:
+        overview = build_company_overview(db_session)
+    if grouped is None:
+        grouped = _group_by_company(db.get_all_events(db_session))
     rows = overview.get("companies", [])
-    events = db.get_all_events(db_session)
-    grouped = defaultdict(list)
-    for ev in events:
-        grouped[(ev.company or "기타").strip()].append(ev)
 
     now = datetime.now()
     items = []
@@ -990,9 +1166,9 @@ async def get_company_briefings(
             updated_at = cached["updated_at"]
         else:
             ai_result = None
-            if summarize_company_status:
+            if asummarize_company_status:
                 try:
-                    ai_result = summarize_company_status(company, snapshot)
+                    ai_result = await asummarize_company_status(company, snapshot)
                 except Exception as e:
                     logger.warning("회사 개요 Gemini 생성 실패 (%s): %s", company, str(e)[:200])
             brief = ai_result if ai_result else _rule_company_brief(company, snapshot)
@@ -1034,21 +1210,29 @@ async def get_company_briefings(
 
 @app.get("/api/analytics/qualitative-comparison")
 async def get_qualitative_comparison(
+    request: Request,
+    response: Response,
     force: bool = Query(False),
-    db_session: Session = Depends(db.get_db),
+    db_session: Session = Depends(db.get_read_db),
 ):
+    payload = jsonable_encoder(await _qualitative_comparison(db_session, force=force))
+    return _not_modified(request, response, _content_etag(payload)) or payload
+
+
+async def _qualitative_comparison(db_session: Session, force: bool = False, overview: dict = None,
+                                  grouped: dict = None) -> dict:
+    """overview/grouped를 넘기면 재조회 없이 사용 (bootstrap 공유 패스)."""
     global _QUAL_COMPARISON_CACHE
     try:
-        from gemini_insight import infer_qualitative_comparison
+        from gemini_insight import ainfer_qualitative_comparison
     except Exception:
-        infer_qualitative_comparison = None
+        ainfer_qualitative_comparison = None
 
-    overview = build_company_overview(db_session)
+    if overview is None:
+        overview = build_company_overview(db_session)
+    if grouped is None:
+        grouped = _group_by_company(db.get_all_events(db_session))
     rows = overview.get("companies", [])
-    events = db.get_all_events(db_session)
-    grouped = defaultdict(list)
-    for ev in events:
-        grouped[(ev.company or "기타").strip()].append(ev)
 
     companies_payload = []
     for row in rows:
@@ -1083,9 +1267,9 @@ async def get_qualitative_comparison(
             return response
 
     ai_obj = None
-    if infer_qualitative_comparison:
+    if ainfer_qualitative_comparison:
         try:
-            ai_obj = infer_qualitative_comparison(snapshot_for_ai)
+            ai_obj = await ainfer_qualitative_comparison(snapshot_for_ai)
         except Exception as e:
             logger.warning("정성 비교 Gemini 생성 실패: %s", str(e)[:200])
 
@@ -1140,6 +1324,154 @@ async def get_qualitative_comparison(
     return response
 
 
+# ---------------------------------------------------------------------------
+# Dashboard bootstrap (loadAll 9개 요청 -> 1개)
+# ---------------------------------------------------------------------------
+
+BOOTSTRAP_SECTIONS = (
+    "events", "stats", "overview", "benchmark", "strategy", "trends", "briefings", "qual_compare", "progress",
+)
+# 공유 패스에서 읽는 이벤트 컬럼 (통계/개요/벤치마크/전략맵/추세 빌더가 쓰는 것만)
+_BOOTSTRAP_EVENT_COLUMNS = (
+    "id", "company", "title", "category", "status", "is_visible", "period", "period_start", "period_end",
+    "benefit_value", "benefit_amount_won", "benefit_pct", "threat_level", "created_at",
+    "marketing_insights", "marketing_content",
+)
+# 브리핑/정성비교 스냅샷(_event_blob)에서만 쓰는 본문 컬럼: 해당 섹션을 요청할 때만 함께 읽는다
+_BOOTSTRAP_TEXT_COLUMNS = ("conditions", "target_segment", "one_line_summary", "raw_text")
+_BOOTSTRAP_TEXT_SECTIONS = ("briefings", "qual_compare")
+# 데이터 버전과 무관하게 바뀌는 섹션 (Gemini TTL 캐시, 파이프라인 진행 상태): 먼저 만들어 내용 해시를 ETag에 넣는다
+_BOOTSTRAP_CONTENT_SECTIONS = ("briefings", "qual_compare", "progress")
+# 섹션 버전 계산 시 제외하는 값 (내용이 같아도 호출마다 바뀌는 필드)
+_VOLATILE_KEYS = ("generated_at", "cached")
+
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in _VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def _section_version(payload) -> str:
+    """섹션 내용 해시 (생성 시각 등 가변 필드 제외). 같으면 클라이언트가 가진 데이터 재사용."""
+    raw = json.dumps(_strip_volatile(payload), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _parse_known_versions(known: Optional[str]) -> dict:
+    out = {}
+    for part in (known or "").split(","):
+        name, _, version = part.strip().partition(":")
+        if name and version:
+            out[name] = version
+    return out
+
+
+@app.get("/api/dashboard/bootstrap")
+async def dashboard_bootstrap(
+    request: Request,
+    response: Response,
+    sections: Optional[str] = Query(None, description="쉼표 구분 섹션 (기본: 전체)"),
+    known: Optional[str] = Query(None, description="클라이언트 보유 버전 section:version,... (같으면 data 생략)"),
+    db_session: Session = Depends(db.get_read_db),
+):
+    """
+    대시보드 초기 로드용 묶음 응답. 통계/개요/벤치마크/전략맵/추세는 데이터 버전 캐시에서 꺼내고,
+    미스가 나면 빌더에 필요한 컬럼만 한 번 읽어 브리핑/정성비교와 공유한다 (raw_text 등 본문은 브리핑/정성비교
+    요청 시에만). events 섹션은 목록 API와 같은 요약 조회(list_events)를 따로 쓴다. 섹션마다 version을 붙이며, known으로 넘긴 버전과 같으면
+    {"version", "unchanged": true}만 보내 부분 갱신을 돕는다.
+    ETag는 데이터 버전/쿼리/날짜 태그에 진행 상태·Gemini 섹션의 내용 해시만 더해 나머지 섹션을 만들기 전에
+    계산하므로, 태그가 맞으면 이벤트/분석 섹션은 만들지 않고 304 (본문 없음).
+    """
+    wanted = [s.strip() for s in (sections or "").split(",") if s.strip()] or list(BOOTSTRAP_SECTIONS)
+    unknown = [s for s in wanted if s not in BOOTSTRAP_SECTIONS]
+    if unknown:
+        raise HTTPException(400, f"알 수 없는 섹션: {', '.join(unknown)}")
+    known_versions = _parse_known_versions(known)
+
+    # 공유 패스: 캐시 미스가 난 섹션이 있을 때만 전체 이벤트를 1회 조회 (최신순, 필요한 컬럼만)
+    shared = {}
+    columns = _BOOTSTRAP_EVENT_COLUMNS
+    if any(name in _BOOTSTRAP_TEXT_SECTIONS for name in wanted):
+        columns += _BOOTSTRAP_TEXT_COLUMNS
+
+    def _all_events():
+        if "all" not in shared:
+            shared["all"] = (
+                db_session.query(db.CardEvent)
+                .options(load_only(*(getattr(db.CardEvent, c) for c in columns)))
+                .order_by(db.CardEvent.created_at.desc())
+                .all()
+            )
+        return shared["all"]
+
+    def _visible():
+        return [ev for ev in _all_events() if ev.is_visible]
+
+    def _overview():
+        return _cached(db_session, f"company_overview:{date.today()}",
+                       lambda: build_company_overview(db_session, events=_all_events()))
+
+    def _grouped():
+        if "grouped" not in shared:
+            shared["grouped"] = _group_by_company(_visible())
+        return shared["grouped"]
+
+    async def _build(name):
+        today = date.today()
+        if name == "events":
+            rows, _ = db.list_events(db_session, limit=1000, fields="summary")
+            return [EventSummary.model_validate(row) for row in rows]
+        if name == "stats":
+            return _cached(db_session, "stats", lambda: build_stats(_visible()))
+        if name == "overview":
+            return _overview()
+        if name == "benchmark":
+            return _cached(db_session, "benefit_benchmark",
+                           lambda: build_benefit_benchmark(db_session, events=_all_events()))
+        if name == "strategy":
+            return _cached(db_session, "strategy_map", lambda: build_strategy_map(
+                db_session, company_by_id={ev.id: ev.company for ev in _all_events()}))
+        if name == "trends":
+            fd = today - timedelta(days=90)
+            return _cached(db_session, f"trends:{fd}:{today}",
+                           lambda: build_trends(db_session, fd, today, events=_all_events()))
+        if name == "briefings":
+            return await _company_briefings(db_session, overview=_overview(), grouped=_grouped())
+        if name == "qual_compare":
+            return await _qualitative_comparison(db_session, overview=_overview(), grouped=_grouped())
+        from modules.pipeline import get_pipeline_progress as _get
+        return _get()
+
+    async def _section(name):
+        try:
+            payload = jsonable_encoder(await _build(name))
+        except Exception as e:
+            logger.warning("bootstrap 섹션 실패 (%s): %s", name, str(e)[:200])
+            return {"version": None, "error": str(e)[:200]}
+        version = _section_version(payload)
+        if known_versions.get(name) == version:
+            return {"version": version, "unchanged": True}
+        return {"version": version, "data": payload}
+
+    # 1) 데이터 버전과 무관한 섹션만 먼저 만들고, 2) 태그가 맞으면 나머지는 만들지 않고 304
+    early = {name: await _section(name) for name in wanted if name in _BOOTSTRAP_CONTENT_SECTIONS}
+    etag = _make_etag("b", _version_etag(request, db_session),
+                      *(f"{name}:{s['version'] or s.get('error')}" for name, s in early.items()))
+    not_modified = _not_modified(request, response, etag)
+    if not_modified:
+        return not_modified
+
+    out = {}
+    for name in wanted:
+        out[name] = early[name] if name in early else await _section(name)
+    if any(s.get("error") for name, s in out.items() if name not in early):
+        del response.headers["ETag"]  # 데이터 섹션 실패는 태그에 반영되지 않으므로 재검증 대상에서 제외
+    return {"generated_at": datetime.now().isoformat(), "sections": out}
+
+
 # ---------------------------------------------------------------------------
 # Jobs API
 # ---------------------------------------------------------------------------
@@ -1149,7 +1481,7 @@ async def list_jobs(
     job_type: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     limit: int = Query(50, ge=1, le=200),
-    db_session: Session = Depends(db.get_db),
+    db_session: Session = Depends(db.get_read_db),
 ):
     jobs = db.get_jobs(db_session, job_type=job_type, status=status, limit=limit)
     return [
@@ -1164,10 +1496,44 @@ async def list_jobs(
 
 
 @app.get("/api/jobs/stats")
-async def job_stats(db_session: Session = Depends(db.get_db)):
+async def job_stats(db_session: Session = Depends(db.get_read_db)):
     return db.get_job_stats(db_session)
 
 
+@app.get("/api/enrichment/queue")
+async def enrichment_queue_stats(db_session: Session = Depends(db.get_read_db)):
+    return db.get_enrichment_queue_stats(db_session)
+
+
+@app.get("/api/gemini/rate-limit")
+async def gemini_rate_limit():
+    from gemini_insight import get_rate_limiter_status
+    return get_rate_limiter_status()
+
+
+@app.get("/api/gemini/prompt-stats")
+async def gemini_prompt_stats():
+    from gemini_insight import get_prompt_compaction_stats
+    return get_prompt_compaction_stats()
+
+
+@app.get("/api/cache/stats")
+async def analytics_cache_stats(db_session: Session = Depends(db.get_read_db)):
+    return {"data_version": db.get_data_version(db_session), **_ANALYTICS_CACHE.stats()}
+
+
+@app.get("/api/gemini/models")
+async def gemini_model_stats():
+    from gemini_insight import get_model_routing_stats
+    return get_model_routing_stats()
+
+
+@app.get("/api/gemini/cache-stats")
+async def gemini_cache_stats():
+    from gemini_insight import get_response_cache_stats
+    return get_response_cache_stats()
+
+
 @app.post("/api/jobs/{job_id}/retry")
 async def retry_job(job_id: int, db_session: Session = Depends(db.get_db)):
     job = db_session.query(db.Job).filter(db.Job.id == job_id).first()
@@ -1184,12 +1550,15 @@ async def retry_job(job_id: int, db_session: Session = Depends(db.get_db)):
 # ---------------------------------------------------------------------------
 
 @app.get("/api/events/{event_id}/snapshots")
-async def get_event_snapshots(event_id: int, db_session: Session = Depends(db.get_db)):
+async def get_event_snapshots(event_id: int, db_session: Session = Depends(db.get_read_db)):
     snaps = db.get_snapshots(db_session, event_id)
     return [
         {
             "id": s.id, "captured_at": s.captured_at,
             "extraction_latency_ms": s.extraction_latency_ms,
+            "readiness_wait_ms": s.readiness_wait_ms,
+            "bytes_transferred": s.bytes_transferred,
+            "requests_blocked": s.requests_blocked,
             "raw_text_len": len(s.raw_text) if s.raw_text else 0,
         }
         for s in snaps
@@ -1197,13 +1566,20 @@ async def get_event_snapshots(event_id: int, db_session: Session = Depends(db.ge
 
 
 @app.get("/api/events/{event_id}/intelligence")
-async def get_event_intelligence(event_id: int, db_session: Session = Depends(db.get_db)):
+async def get_event_intelligence(request: Request, response: Response, event_id: int,
+                                 db_session: Session = Depends(db.get_read_db)):
+    # snapshot_count는 데이터 버전에 반영되지 않으므로(스냅샷 저장은 버전 유지) 태그에 직접 포함
+    snapshot_count = db_session.query(func.count(db.EventSnapshot.id)).filter(
+        db.EventSnapshot.event_id == event_id).scalar()
+    etag = _make_etag("i", _version_etag(request, db_session), snapshot_count)
+    not_modified = _not_modified(request, response, etag)
+    if not_modified:
+        return not_modified
     event = db.get_event_by_id(db_session, event_id)
     if not event:
         raise HTTPException(404, "이벤트를 찾을 수 없습니다.")
     insight = db.get_latest_insight(db_session, event_id)
     sections = db.get_sections(db_session, event_id)
-    snapshots = db.get_snapshots(db_session, event_id)
 
     def _jl(val):
         if not val: return []
@@ -1236,7 +1612,7 @@ async def get_event_intelligence(event_id: int, db_session: Session = Depends(db
                if (mi := _pjson(event.marketing_insights)) else {}),
         } if insight else None,
         "sections": [{"type": s.section_type, "content": s.content} for s in sections],
-        "snapshot_count": len(snapshots),
+        "snapshot_count": snapshot_count,
     }
 
 
@@ -1273,7 +1649,7 @@ async def manual_update_event(event_id: int, body: ManualUpdateRequest, db_sessi
 
 
 @app.get("/api/events/{event_id}/edit-history")
-async def get_edit_history(event_id: int, db_session: Session = Depends(db.get_db)):
+async def get_edit_history(event_id: int, db_session: Session = Depends(db.get_read_db)):
     history = db.get_edit_history(db_session, event_id)
     return [
         {
@@ -1308,7 +1684,7 @@ async def audit_edits(
     to_date: Optional[str] = Query(None, alias="to"),
     page: int = Query(1, ge=1),
     size: int = Query(50, ge=1, le=200),
-    db_session: Session = Depends(db.get_db),
+    db_session: Session = Depends(db.get_read_db),
 ):
     fd = datetime.fromisoformat(from_date) if from_date else None
     td = datetime.fromisoformat(to_date) if to_date else None
@@ -1334,10 +1710,11 @@ async def audit_edits(
 # ---------------------------------------------------------------------------
 
 @app.get("/api/pipeline/progress")
-async def get_pipeline_progress():
-    """전체 추출 진행 상태 (실제 처리 건수·성공·실패)."""
+async def get_pipeline_progress(request: Request, response: Response):
+    """전체 추출 진행 상태 (실제 처리 건수·성공·실패). 폴링 시 값이 그대로면 304."""
     from modules.pipeline import get_pipeline_progress as _get
-    return _get()
+    payload = jsonable_encoder(_get())
+    return _not_modified(request, response, _content_etag(payload)) or payload
 
 
 @app.post("/api/pipeline/ingest")
@@ -1378,6 +1755,11 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat(), "version": "2.0.0"}
 
 
+@app.get("/api/db/profile")
+async def db_profile():
+    return db.get_engine_profile()
+
+
 if __name__ == "__main__":
     print("[START] 경쟁사 카드 이벤트 인텔리전스 v2.0")
     print("[INFO] 대시보드: http://localhost:8000")
@@ -8,17 +8,29 @@ SQLAlchemy를 사용한 SQLite 데이터베이스 관리
   event_sections   - 혜택/참여방법/유의사항 등 섹션별 정규화
   event_insights   - 인사이트 (rule-based + AI)
   jobs             - 수집/추출/인사이트 잡 상태 추적
+  connector_state  - 커넥터별 증분 수집 상태 (예: 삼성 cms_id 탐색 frontier)
+  gemini_response_cache - Gemini 응답 캐시 (모델+프롬프트 해시 키, LRU)
+  enrichment_queue - rule 인사이트 저장 후 Gemini 업그레이드 대기열
+  rate_limit_state - 프로세스 간 공유 token bucket (Gemini RPM, 429 cooldown)
+  data_version     - 이벤트/인사이트 변경 시 증가하는 데이터 버전 (분석 캐시·ETag 무효화)
+
+쓰기 헬퍼(update_event, save_* 등)는 각자 commit한다. 한 이벤트의 처리 결과를
+원자적으로 저장할 때는 persist_enrichment_result를 쓴다.
 """
 
+import base64
 import json
 import os
 import re
-from datetime import datetime, date
+import time
+import uuid
+from datetime import datetime, date, timedelta
+from types import SimpleNamespace
 from typing import List, Optional
 
 from sqlalchemy import (
-    create_engine, Column, String, Integer, Float, DateTime, Date,
-    Text, ForeignKey, or_, Index,
+    create_engine, event as sa_event, Column, String, Integer, Float, DateTime, Date,
+    Text, ForeignKey, or_, and_, func, literal_column, update, Index,
 )
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 
@@ -27,12 +39,63 @@ from sqlalchemy.orm import sessionmaker, declarative_base, relationship
 # ---------------------------------------------------------------------------
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./events.db")
 
-_engine_kwargs = {}
-if DATABASE_URL.startswith("sqlite"):
-    _engine_kwargs["connect_args"] = {"check_same_thread": False}
-
-engine = create_engine(DATABASE_URL, **_engine_kwargs)
+# SQLite 성능 프로필 (파일 DB에만 적용). WAL이면 읽기와 쓰기가 서로를 막지 않는다.
+# 네트워크 파일시스템처럼 WAL을 못 쓰는 환경이면 SQLITE_JOURNAL_MODE=DELETE.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL").strip().upper()
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").strip().upper()
+SQLITE_BUSY_TIMEOUT_MS = max(0, int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000")))
+SQLITE_CACHE_SIZE_KB = max(0, int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536")))
+SQLITE_MMAP_SIZE = max(0, int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))))
+DB_READ_POOL_SIZE = max(1, int(os.getenv("DB_READ_POOL_SIZE", "8")))
+
+_IS_SQLITE = DATABASE_URL.startswith("sqlite")
+# 파일 DB일 때만 읽기 전용 엔진을 분리 (메모리 DB는 연결마다 별도 DB라 공유 불가)
+_SPLIT_READER = _IS_SQLITE and ":memory:" not in DATABASE_URL and DATABASE_URL not in ("sqlite://", "sqlite:///")
+
+
+def _sqlite_pragmas(read_only: bool) -> list:
+    pragmas = [
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    else:
+        # journal_mode는 DB 파일에 영구 기록되므로 쓰기 연결에서만 설정
+        pragmas.insert(0, f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    return pragmas
+
+
+def _make_engine(read_only: bool = False):
+    kwargs = {}
+    if _IS_SQLITE:
+        # 잠금 대기는 PRAGMA busy_timeout이 담당 (pysqlite timeout은 초 단위라 함께 맞춤)
+        kwargs["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    if read_only:
+        kwargs.update(pool_size=DB_READ_POOL_SIZE, max_overflow=DB_READ_POOL_SIZE, pool_pre_ping=True)
+    new_engine = create_engine(DATABASE_URL, **kwargs)
+    if _SPLIT_READER:
+        pragmas = _sqlite_pragmas(read_only)
+
+        @sa_event.listens_for(new_engine, "connect")
+        def _apply_pragmas(dbapi_conn, _record):
+            cursor = dbapi_conn.cursor()
+            try:
+                for pragma in pragmas:
+                    cursor.execute(pragma)
+            finally:
+                cursor.close()
+    return new_engine
+
+
+# engine: 쓰기 엔진 (파이프라인/수정/캐시). read_engine: 조회 전용 풀 (대시보드/분석 GET)
+engine = _make_engine()
+read_engine = _make_engine(read_only=True) if _SPLIT_READER else engine
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 
@@ -64,6 +127,7 @@ class CardEvent(Base):
     marketing_content = Column(Text)       # JSON (하위호환, deprecated)
     marketing_insights = Column(Text)      # JSON (하위호환, deprecated)
     status = Column(String, index=True, default="active")  # active / ended / unknown
+    is_visible = Column(Integer, index=True, default=1)    # 1=목록/분석 노출 (has_meaningful_info, 쓰기 시점 계산)
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
@@ -73,6 +137,11 @@ class CardEvent(Base):
     insights = relationship("EventInsight", back_populates="event", cascade="all, delete-orphan")
     jobs_rel = relationship("Job", back_populates="event", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # 목록 keyset 페이지네이션: WHERE is_visible=1 ORDER BY created_at DESC, id DESC
+        Index("ix_events_visible_created", "is_visible", "created_at", "id"),
+    )
+
 
 class EventSnapshot(Base):
     """수집 시점별 원본/구조화 스냅샷 — 변화 추적용"""
@@ -84,6 +153,9 @@ class EventSnapshot(Base):
     raw_text = Column(Text)
     extracted_json = Column(Text)          # 추출 결과 JSON
     extraction_latency_ms = Column(Integer)
+    readiness_wait_ms = Column(Integer)    # 본문 준비 대기에 실제로 쓴 시간 (적응형 대기)
+    bytes_transferred = Column(Integer)    # 페이지 로드 중 수신 바이트 (차단 리소스 제외)
+    requests_blocked = Column(Integer)     # 리소스 차단 프로필로 abort된 요청 수
     noise_ratio = Column(Float)
     captured_at = Column(DateTime, default=datetime.now)
 
@@ -183,13 +255,77 @@ class Job(Base):
     event = relationship("CardEvent", back_populates="jobs_rel")
 
 
+class ConnectorState(Base):
+    """커넥터별 증분 수집 상태 (JSON). 다음 수집 시 이어서 탐색하는 데 사용."""
+    __tablename__ = "connector_state"
+
+    company = Column(String, primary_key=True)
+    state_json = Column(Text)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class EnrichmentQueue(Base):
+    """Gemini 인사이트 업그레이드 대기열. 추출 직후 rule 인사이트를 저장하고 여기 등록한다."""
+    __tablename__ = "enrichment_queue"
+
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String, index=True, default="pending")  # pending / running / done / failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text)
+    claim_token = Column(String, index=True)  # running 처리 중인 워커의 claim 식별자
+    enqueued_at = Column(DateTime, default=datetime.now, index=True)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+
+class RateLimitState(Base):
+    """
+    프로세스 간 공유 token bucket. 시각은 모두 epoch 초(time.time()) 기준.
+    uvicorn 워커/스케줄러/수동 실행이 같은 DB 행을 갱신하므로 전체 RPM이 지켜진다.
+    """
+    __tablename__ = "rate_limit_state"
+
+    name = Column(String, primary_key=True)      # 예: gemini
+    tokens = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(Float, nullable=False, default=0.0)
+    cooldown_until = Column(Float, nullable=False, default=0.0)
+    granted = Column(Integer, nullable=False, default=0)      # 누적 발급 토큰 수
+    throttled = Column(Integer, nullable=False, default=0)    # 누적 대기/거절 판정 수
+    interactive_at = Column(Float, nullable=False, default=0.0)  # 마지막 interactive 요청(대기 포함) 시각
+
+
+class DataVersion(Base):
+    """
+    단조 증가 데이터 버전. 이벤트 삽입/수정/삭제, 인사이트 저장, 수동 수정, 잠금 변경 시
+    같은 트랜잭션에서 +1 된다. 여러 프로세스가 공유하므로 DB에 둔다.
+    """
+    __tablename__ = "data_version"
+
+    name = Column(String, primary_key=True)      # 예: events
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.now)
+
+
+class GeminiResponseCache(Base):
+    """Gemini 응답 캐시. 키 = sha256(모델명, 프롬프트 템플릿 버전, 렌더링된 프롬프트, 생성 옵션)."""
+    __tablename__ = "gemini_response_cache"
+
+    cache_key = Column(String, primary_key=True)
+    model_name = Column(String)
+    template = Column(String, index=True)       # 예: enrich:v1
+    response_text = Column(Text, nullable=False)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.now)
+    last_used_at = Column(DateTime, default=datetime.now, index=True)
+
+
 # ===========================================================================
 # 초기화
 # ===========================================================================
 
 def init_db():
-    """데이터베이스 초기화 (테이블 생성)"""
+    """데이터베이스 초기화 (테이블 생성 + 누락 컬럼 추가)"""
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
     print("[OK] 데이터베이스가 초기화되었습니다.")
 
 
@@ -202,6 +338,49 @@ def get_db():
         db.close()
 
 
+def get_read_db():
+    """FastAPI Depends용 조회 전용 세션 (읽기 엔진 풀). 쓰기 시도는 SQLite가 거부한다."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_engine_profile() -> dict:
+    """현재 연결에 적용된 SQLite PRAGMA 값 (진단용)."""
+    profile = {"split_reader": _SPLIT_READER, "read_pool_size": DB_READ_POOL_SIZE if _SPLIT_READER else None}
+    if not _IS_SQLITE:
+        return profile
+    with engine.connect() as conn:
+        for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size"):
+            profile[name] = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+    return profile
+
+
+# ===========================================================================
+# 데이터 버전 (분석 캐시 / ETag 무효화)
+# ===========================================================================
+
+DATA_VERSION_KEY = "events"
+
+
+def _stage_data_version_bump(db, name: str = DATA_VERSION_KEY) -> None:
+    """현재 트랜잭션에 버전 +1 추가 (commit은 호출자). 행이 없으면 생성."""
+    result = db.execute(
+        update(DataVersion).where(DataVersion.name == name)
+        .values(version=DataVersion.version + 1, updated_at=datetime.now())
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        db.add(DataVersion(name=name, version=1, updated_at=datetime.now()))
+
+
+def get_data_version(db, name: str = DATA_VERSION_KEY) -> int:
+    """현재 데이터 버전 (한 번도 변경이 없으면 0)."""
+    return db.query(DataVersion.version).filter(DataVersion.name == name).scalar() or 0
+
+
 # ===========================================================================
 # 유틸: 파싱 헬퍼
 # ===========================================================================
@@ -289,7 +468,10 @@ def _parse_json_field(value) -> Optional[dict]:
 # ===========================================================================
 
 def has_meaningful_info(event) -> bool:
-    """이벤트에 실질적인 정보가 있는지 판단 (목록 노출용)"""
+    """
+    이벤트에 실질적인 정보가 있는지 판단 (목록 노출용).
+    결과는 events.is_visible에 저장되므로 조회 시에는 컬럼으로 거른다 (refresh_visibility 참고).
+    """
     title = (event.title or '').strip()
     if not title or title in EMPTY_MARKERS:
         return False
@@ -308,12 +490,14 @@ def has_meaningful_info(event) -> bool:
     return has_benefit or has_conditions or has_period
 
 
-def insert_event(db, event_data: dict) -> Optional[int]:
-    """이벤트 삽입 (중복 URL 체크). 성공 시 event.id 반환, 중복이면 None."""
-    existing = db.query(CardEvent).filter(CardEvent.url == event_data.get("url")).first()
-    if existing:
-        return None
-    # period -> dates 파싱
+def refresh_visibility(event) -> int:
+    """title/period/benefit_value/conditions 변경 후 is_visible 재계산."""
+    event.is_visible = int(has_meaningful_info(event))
+    return event.is_visible
+
+
+def _prepare_event_row(event_data: dict) -> dict:
+    """insert용 컬럼 dict: 모델에 없는 키 제거 + period/혜택 파싱 + status 계산."""
     ps, pe = parse_period_dates(event_data.get("period"))
     aw, bp = parse_benefit_amount(event_data.get("benefit_value"))
     safe = {k: v for k, v in event_data.items() if hasattr(CardEvent, k)}
@@ -322,15 +506,78 @@ def insert_event(db, event_data: dict) -> Optional[int]:
     safe.setdefault("benefit_amount_won", aw)
     safe.setdefault("benefit_pct", bp)
     safe.setdefault("status", compute_status(pe))
-    new_event = CardEvent(**safe)
+    safe["is_visible"] = int(has_meaningful_info(SimpleNamespace(
+        **{k: safe.get(k) for k in ("title", "period", "benefit_value", "conditions")}
+    )))
+    return safe
+
+
+def insert_event(db, event_data: dict) -> Optional[int]:
+    """이벤트 삽입 (중복 URL 체크). 성공 시 event.id 반환, 중복이면 None."""
+    existing = db.query(CardEvent).filter(CardEvent.url == event_data.get("url")).first()
+    if existing:
+        return None
+    new_event = CardEvent(**_prepare_event_row(event_data))
     db.add(new_event)
+    _stage_data_version_bump(db)
     db.commit()
     db.refresh(new_event)
     return new_event.id
 
 
-def get_all_events(db, filters: dict = None):
-    query = db.query(CardEvent)
+# SQLite 바인드 변수 한도(구버전 999) 안에서 IN 조회
+_URL_LOOKUP_CHUNK = 500
+
+
+def insert_events_bulk(db, events: list) -> dict:
+    """
+    커넥터 수집 결과 일괄 삽입. 기존 URL은 한 번의 IN 조회(청크 단위)로 걸러내고
+    신규 행만 한 트랜잭션에서 executemany로 넣는다. 배치 내 중복 URL은 첫 건만 사용.
+    SQLite에서는 ON CONFLICT(url) DO NOTHING으로 동시 수집과의 경합도 건너뛴다.
+
+    Returns:
+        {"inserted": 신규 건수, "skipped": 중복/URL 없음 건수}
+    """
+    urls = list(dict.fromkeys(e.get("url") for e in events if e.get("url")))
+    existing = set()
+    for i in range(0, len(urls), _URL_LOOKUP_CHUNK):
+        chunk = urls[i:i + _URL_LOOKUP_CHUNK]
+        existing.update(u for (u,) in db.query(CardEvent.url).filter(CardEvent.url.in_(chunk)))
+
+    rows, seen = [], set(existing)
+    now = datetime.now()
+    for event_data in events:
+        url = event_data.get("url")
+        if not url or url in seen:
+            continue
+        seen.add(url)
+        row = _prepare_event_row(event_data)
+        row.setdefault("created_at", now)
+        row.setdefault("updated_at", now)
+        rows.append(row)
+
+    inserted = 0
+    if rows:
+        # executemany는 행마다 컬럼 집합이 같아야 하므로 누락 키는 None으로 채움
+        columns = set().union(*rows)
+        rows = [{c: row.get(c) for c in columns} for row in rows]
+        if db.get_bind().dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+            stmt = sqlite_insert(CardEvent).on_conflict_do_nothing(index_elements=["url"])
+        else:
+            from sqlalchemy import insert
+            stmt = insert(CardEvent)
+        result = db.connection().execute(stmt, rows)
+        inserted = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(rows)
+        if inserted:
+            _stage_data_version_bump(db)
+        db.commit()
+    return {"inserted": inserted, "skipped": len(events) - inserted}
+
+
+def _filter_events(query, filters: dict = None):
+    """노출 이벤트 + company/category/threat_level 필터 (SQL)."""
+    query = query.filter(CardEvent.is_visible == 1)
     if filters:
         if filters.get("company"):
             query = query.filter(CardEvent.company == filters["company"])
@@ -338,8 +585,145 @@ def get_all_events(db, filters: dict = None):
             query = query.filter(CardEvent.category == filters["category"])
         if filters.get("threat_level"):
             query = query.filter(CardEvent.threat_level == filters["threat_level"])
-    all_rows = query.order_by(CardEvent.created_at.desc()).all()
-    return [e for e in all_rows if has_meaningful_info(e)]
+    return query
+
+
+def get_all_events(db, filters: dict = None):
+    query = _filter_events(db.query(CardEvent), filters)
+    return query.order_by(CardEvent.created_at.desc()).all()
+
+
+def encode_event_cursor(created_at: Optional[datetime], event_id: int) -> str:
+    """(created_at, id) keyset 커서 -> URL-safe 문자열."""
+    raw = f"{created_at.isoformat() if created_at else ''}|{event_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_event_cursor(cursor: str) -> tuple:
+    """encode_event_cursor 역변환. 형식이 틀리면 ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, _, event_id = raw.partition("|")
+        return (datetime.fromisoformat(ts) if ts else None), int(event_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"잘못된 커서: {cursor!r}") from e
+
+
+# 목록 화면용 요약 필드 (raw_text/marketing_content 등 대용량 Text 제외)
+EVENT_SUMMARY_FIELDS = (
+    "id", "url", "company", "category", "title", "period", "period_start", "period_end",
+    "benefit_type", "benefit_value", "benefit_amount_won", "benefit_pct", "conditions",
+    "target_segment", "threat_level", "status", "created_at",
+)
+# summary의 marketing_insights는 목록 필터/정렬/엑셀에 쓰는 키만 남긴 축약 JSON
+INSIGHT_DIGEST_KEYS = ("benefit_level", "objective_tags", "competitive_points", "promo_strategies")
+
+_INSIGHT_DIGEST_SQL = (
+    "CASE WHEN json_valid(events.marketing_insights) THEN ("
+    "SELECT json_group_object(j.key, CASE WHEN j.type IN ('object', 'array') THEN json(j.value) ELSE j.value END) "
+    "FROM json_each(events.marketing_insights) AS j WHERE j.key IN ({keys})) END"
+).format(keys=", ".join(f"'{k}'" for k in INSIGHT_DIGEST_KEYS))
+# 대시보드 isExtracted와 동일 기준: 원문 20자 초과 또는 비어 있지 않은 인사이트
+_EXTRACTED_SQL = (
+    "CASE WHEN length(trim(events.raw_text)) > 20 THEN 1 "
+    "WHEN json_valid(events.marketing_insights) AND trim(events.marketing_insights) NOT IN ('{}', '[]', 'null', '\"\"') "
+    "THEN 1 ELSE 0 END"
+)
+
+
+def _insight_digest(raw) -> Optional[str]:
+    """_INSIGHT_DIGEST_SQL의 Python 버전 (SQLite 외 DB용)."""
+    if not raw:
+        return None
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return "{}"
+    return json.dumps({k: data[k] for k in INSIGHT_DIGEST_KEYS if k in data}, ensure_ascii=False)
+
+
+def _projection_columns(db, fields) -> list:
+    """fields("summary" 또는 컬럼명 목록) -> SELECT 대상. 커서 계산용 id/created_at은 항상 포함."""
+    if fields == "summary":
+        names = list(EVENT_SUMMARY_FIELDS)
+    else:
+        names = list(dict.fromkeys(["id", *fields]))
+        unknown = [n for n in names if n not in CardEvent.__table__.columns]
+        if unknown:
+            raise ValueError(f"알 수 없는 필드: {', '.join(unknown)}")
+    columns = [getattr(CardEvent, n) for n in names]
+    if "created_at" not in names:
+        columns.append(CardEvent.created_at.label("_cursor_created_at"))
+    if fields == "summary":
+        if db.get_bind().dialect.name == "sqlite":
+            columns.append(literal_column(_INSIGHT_DIGEST_SQL).label("marketing_insights"))
+            columns.append(literal_column(_EXTRACTED_SQL).label("extracted"))
+        else:
+            columns.append(CardEvent.marketing_insights.label("_raw_insights"))
+            columns.append(func.length(func.trim(CardEvent.raw_text)).label("_raw_text_len"))
+    return columns
+
+
+def _projected_row(row) -> dict:
+    data = dict(row._mapping)
+    data.pop("_cursor_created_at", None)
+    if "_raw_insights" in data:
+        raw = data.pop("_raw_insights")
+        data["marketing_insights"] = _insight_digest(raw)
+        data["extracted"] = (data.pop("_raw_text_len") or 0) > 20 or \
+            (data["marketing_insights"] or "{}") != "{}"
+    if "extracted" in data:
+        data["extracted"] = bool(data["extracted"])
+    return data
+
+
+def list_events(db, filters: dict = None, limit: int = 1000, cursor: str = None,
+                offset: int = None, fields=None) -> tuple:
+    """
+    노출 이벤트 목록 한 페이지. created_at DESC, id DESC 순 keyset 페이지네이션으로
+    필터/정렬/LIMIT 모두 SQL에서 처리 (테이블 크기와 무관하게 페이지당 비용 일정).
+    cursor가 없고 offset이 있으면 기존 page 방식(OFFSET) 호환.
+
+    fields:
+        None      -> CardEvent 엔티티 (전체 컬럼)
+        "summary" -> EVENT_SUMMARY_FIELDS + 축약 marketing_insights + extracted (dict)
+        컬럼명 목록 -> 해당 컬럼 + id만 SELECT (dict). 모르는 이름이면 ValueError
+
+    Returns:
+        (rows, next_cursor) — 다음 페이지가 없으면 next_cursor는 None
+    """
+    entities = [CardEvent] if fields is None else _projection_columns(db, fields)
+    query = _filter_events(db.query(*entities), filters)
+    if cursor:
+        created_at, last_id = decode_event_cursor(cursor)
+        if created_at is None:
+            # created_at이 없는 행은 DESC 정렬에서 맨 뒤
+            query = query.filter(CardEvent.created_at.is_(None), CardEvent.id < last_id)
+        else:
+            query = query.filter(or_(
+                CardEvent.created_at < created_at,
+                and_(CardEvent.created_at == created_at, CardEvent.id < last_id),
+                CardEvent.created_at.is_(None),
+            ))
+    query = query.order_by(CardEvent.created_at.desc(), CardEvent.id.desc())
+    if offset and not cursor:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        created_at = last.created_at if fields is None or "created_at" in last._fields else last._cursor_created_at
+        next_cursor = encode_event_cursor(created_at, last.id)
+    if fields is not None:
+        rows = [_projected_row(row) for row in rows]
+    return rows, next_cursor
+
+
+def count_events(db, filters: dict = None) -> int:
+    return _filter_events(db.query(func.count(CardEvent.id)), filters).scalar() or 0
 
 
 def get_event_by_id(db, event_id: int):
@@ -363,11 +747,11 @@ def get_events_pending_extraction(db, limit: int = None):
     return q.all()
 
 
-def update_event(db, event_id: int, update_data: dict) -> bool:
-    """이벤트 필드 업데이트. JSON 필드 자동 직렬화."""
+def _stage_event_update(db, event_id: int, update_data: dict) -> Optional[CardEvent]:
+    """update_event 본체 (commit 없음). 이벤트가 없으면 None."""
     event = db.query(CardEvent).filter(CardEvent.id == event_id).first()
     if not event:
-        return False
+        return None
     allowed = {
         "title", "period", "period_start", "period_end",
         "benefit_type", "benefit_value", "benefit_amount_won", "benefit_pct",
@@ -389,6 +773,16 @@ def update_event(db, event_id: int, update_data: dict) -> bool:
         if pe:
             event.period_end = pe
             event.status = compute_status(pe)
+    refresh_visibility(event)
+    _stage_data_version_bump(db)
+    return event
+
+
+def update_event(db, event_id: int, update_data: dict) -> bool:
+    """이벤트 필드 업데이트. JSON 필드 자동 직렬화."""
+    event = _stage_event_update(db, event_id, update_data)
+    if event is None:
+        return False
     db.commit()
     db.refresh(event)
     return True
@@ -397,7 +791,9 @@ def update_event(db, event_id: int, update_data: dict) -> bool:
 def delete_event(db, event_id: int) -> bool:
     event = db.query(CardEvent).filter(CardEvent.id == event_id).first()
     if event:
+        db.query(EnrichmentQueue).filter(EnrichmentQueue.event_id == event_id).delete()
         db.delete(event)
+        _stage_data_version_bump(db)
         db.commit()
         return True
     return False
@@ -415,17 +811,33 @@ def get_categories(db):
 # CRUD: snapshots
 # ===========================================================================
 
-def save_snapshot(db, event_id: int, raw_html: str = None, raw_text: str = None,
-                  extracted_json: dict = None, latency_ms: int = None, noise_ratio: float = None):
+def _stage_snapshot(db, event_id: int, raw_html: str = None, raw_text: str = None,
+                    extracted_json: dict = None, latency_ms: int = None, noise_ratio: float = None,
+                    bytes_transferred: int = None, requests_blocked: int = None,
+                    readiness_wait_ms: int = None) -> EventSnapshot:
     snap = EventSnapshot(
         event_id=event_id,
         raw_html=raw_html,
         raw_text=raw_text,
         extracted_json=json.dumps(extracted_json, ensure_ascii=False) if extracted_json else None,
         extraction_latency_ms=latency_ms,
+        readiness_wait_ms=readiness_wait_ms,
+        bytes_transferred=bytes_transferred,
+        requests_blocked=requests_blocked,
         noise_ratio=noise_ratio,
     )
-    db.add(snap)
+    db.add(snap)  # 스냅샷은 분석/부트스트랩 payload에 쓰이지 않으므로 데이터 버전을 올리지 않는다
+    return snap
+
+
+def save_snapshot(db, event_id: int, raw_html: str = None, raw_text: str = None,
+                  extracted_json: dict = None, latency_ms: int = None, noise_ratio: float = None,
+                  bytes_transferred: int = None, requests_blocked: int = None,
+                  readiness_wait_ms: int = None):
+    snap = _stage_snapshot(db, event_id, raw_html=raw_html, raw_text=raw_text,
+                           extracted_json=extracted_json, latency_ms=latency_ms, noise_ratio=noise_ratio,
+                           bytes_transferred=bytes_transferred, requests_blocked=requests_blocked,
+                           readiness_wait_ms=readiness_wait_ms)
     db.commit()
     return snap.id
 
@@ -439,8 +851,7 @@ def get_snapshots(db, event_id: int):
 # CRUD: sections
 # ===========================================================================
 
-def save_sections(db, event_id: int, sections_dict: dict):
-    """marketing_content dict를 event_sections 행으로 저장 (기존 삭제 후 재생성)."""
+def _stage_sections(db, event_id: int, sections_dict: dict):
     db.query(EventSection).filter(EventSection.event_id == event_id).delete()
     order = 0
     for section_type, items in sections_dict.items():
@@ -454,6 +865,12 @@ def save_sections(db, event_id: int, sections_dict: dict):
             db.add(EventSection(event_id=event_id, section_type=section_type,
                                 content=str(items)[:2000], sort_order=order))
             order += 1
+    _stage_data_version_bump(db)
+
+
+def save_sections(db, event_id: int, sections_dict: dict):
+    """marketing_content dict를 event_sections 행으로 저장 (기존 삭제 후 재생성)."""
+    _stage_sections(db, event_id, sections_dict)
     db.commit()
 
 
@@ -466,8 +883,7 @@ def get_sections(db, event_id: int):
 # CRUD: insights
 # ===========================================================================
 
-def save_insight(db, event_id: int, insight_data: dict, source: str = "rule"):
-    """인사이트 저장 (기존 동일 source 삭제 후 재생성)."""
+def _stage_insight(db, event_id: int, insight_data: dict, source: str = "rule") -> EventInsight:
     db.query(EventInsight).filter(
         EventInsight.event_id == event_id,
         EventInsight.source == source,
@@ -482,6 +898,13 @@ def save_insight(db, event_id: int, insight_data: dict, source: str = "rule"):
             else:
                 setattr(row, k, v)
     db.add(row)
+    _stage_data_version_bump(db)
+    return row
+
+
+def save_insight(db, event_id: int, insight_data: dict, source: str = "rule"):
+    """인사이트 저장 (기존 동일 source 삭제 후 재생성)."""
+    row = _stage_insight(db, event_id, insight_data, source=source)
     db.commit()
     return row.id
 
@@ -503,15 +926,16 @@ def get_latest_insight(db, event_id: int):
 # CRUD: jobs
 # ===========================================================================
 
-def create_job(db, job_type: str, event_id: int = None, company: str = None) -> int:
+def create_job(db, job_type: str, event_id: int = None, company: str = None, status: str = "pending") -> int:
+    """잡 생성. 바로 실행할 잡은 status="running"으로 만들어 update_job commit 1회를 줄인다."""
     job = Job(job_type=job_type, event_id=event_id, company=company,
-              status="pending", started_at=datetime.now())
+              status=status, started_at=datetime.now())
     db.add(job)
     db.commit()
     return job.id
 
 
-def update_job(db, job_id: int, status: str, error: str = None):
+def _stage_job_status(db, job_id: int, status: str, error: str = None) -> Optional[Job]:
     job = db.query(Job).filter(Job.id == job_id).first()
     if job:
         job.status = status
@@ -521,6 +945,11 @@ def update_job(db, job_id: int, status: str, error: str = None):
             job.finished_at = datetime.now()
         if status == "failed":
             job.retry_count = (job.retry_count or 0) + 1
+    return job
+
+
+def update_job(db, job_id: int, status: str, error: str = None):
+    if _stage_job_status(db, job_id, status, error=error):
         db.commit()
 
 
@@ -544,6 +973,349 @@ def get_job_stats(db):
     return stats
 
 
+# ===========================================================================
+# CRUD: connector state
+# ===========================================================================
+
+def get_connector_state(db, company: str) -> dict:
+    row = db.query(ConnectorState).filter(ConnectorState.company == company).first()
+    return (_parse_json_field(row.state_json) or {}) if row else {}
+
+
+def save_connector_state(db, company: str, state: dict):
+    row = db.query(ConnectorState).filter(ConnectorState.company == company).first()
+    payload = json.dumps(state or {}, ensure_ascii=False)
+    if row:
+        row.state_json = payload
+    else:
+        db.add(ConnectorState(company=company, state_json=payload))
+    db.commit()
+
+
+# ===========================================================================
+# CRUD: enrichment queue
+# ===========================================================================
+
+def _stage_enqueue(db, event_id: int):
+    row = db.query(EnrichmentQueue).filter(EnrichmentQueue.event_id == event_id).first()
+    if row:
+        row.status = "pending"
+        row.attempts = 0
+        row.last_error = None
+        row.enqueued_at = datetime.now()
+    else:
+        db.add(EnrichmentQueue(event_id=event_id, status="pending", attempts=0))
+
+
+def enqueue_enrichment(db, event_id: int):
+    """Gemini 업그레이드 대기열 등록 (이미 있으면 pending으로 재설정, 시도 횟수 초기화)."""
+    _stage_enqueue(db, event_id)
+    db.commit()
+
+
+def claim_enrichment_batch(db, limit: int, exclude_ids=None) -> List[EnrichmentQueue]:
+    """
+    pending 항목을 오래된 순으로 limit건 running 처리 후 반환. exclude_ids는 건너뜀 (같은 회차 재시도 방지).
+    UPDATE ... WHERE status='pending' AND event_id IN (SELECT ... LIMIT) 한 문장으로 claim_token을 찍고
+    그 토큰으로 다시 읽으므로, 여러 워커 프로세스가 동시에 claim해도 같은 행을 가져가지 않는다.
+    """
+    token = uuid.uuid4().hex
+    candidates = db.query(EnrichmentQueue.event_id).filter(EnrichmentQueue.status == "pending")
+    if exclude_ids:
+        candidates = candidates.filter(EnrichmentQueue.event_id.notin_(list(exclude_ids)))
+    candidates = candidates.order_by(EnrichmentQueue.enqueued_at.asc()).limit(limit)
+    db.query(EnrichmentQueue).filter(
+        EnrichmentQueue.status == "pending",
+        EnrichmentQueue.event_id.in_(candidates.scalar_subquery()),
+    ).update({
+        "status": "running",
+        "claim_token": token,
+        "attempts": func.coalesce(EnrichmentQueue.attempts, 0) + 1,
+        "updated_at": datetime.now(),
+    }, synchronize_session=False)
+    db.commit()
+    return db.query(EnrichmentQueue).filter(EnrichmentQueue.claim_token == token)\
+        .order_by(EnrichmentQueue.enqueued_at.asc()).all()
+
+
+def release_enrichment(db, event_id: int):
+    """claim했지만 처리하지 않은 항목을 시도 횟수 차감 없이 pending으로 되돌린다."""
+    row = db.query(EnrichmentQueue).filter(EnrichmentQueue.event_id == event_id).first()
+    if row:
+        row.status = "pending"
+        row.claim_token = None
+        row.attempts = max(0, (row.attempts or 1) - 1)
+        db.commit()
+
+
+def _stage_finish_enrichment(db, event_id: int, status: str, error: str = None) -> Optional[EnrichmentQueue]:
+    row = db.query(EnrichmentQueue).filter(EnrichmentQueue.event_id == event_id).first()
+    if row:
+        row.status = status
+        row.last_error = error
+    return row
+
+
+def finish_enrichment(db, event_id: int, status: str, error: str = None):
+    if _stage_finish_enrichment(db, event_id, status, error=error):
+        db.commit()
+
+
+# running 상태가 이 시간(초) 넘게 갱신되지 않으면 비정상 종료된 워커의 claim으로 본다
+ENRICH_CLAIM_STALE_SEC = max(60, int(os.getenv("ENRICH_CLAIM_STALE_SEC", "900")))
+
+
+def reset_running_enrichment(db, stale_sec: int = ENRICH_CLAIM_STALE_SEC) -> int:
+    """
+    비정상 종료로 running에 남은 항목을 pending으로 되돌린다 (워커 기동 시).
+    다른 워커 프로세스가 처리 중인 항목은 건드리지 않도록 stale_sec보다 오래된 claim만 되돌린다.
+    """
+    cutoff = datetime.now() - timedelta(seconds=stale_sec)
+    n = db.query(EnrichmentQueue).filter(
+        EnrichmentQueue.status == "running",
+        or_(EnrichmentQueue.updated_at.is_(None), EnrichmentQueue.updated_at < cutoff),
+    ).update({"status": "pending", "claim_token": None}, synchronize_session=False)
+    db.commit()
+    return n
+
+
+def get_enrichment_queue_stats(db) -> dict:
+    from sqlalchemy import func
+    rows = db.query(EnrichmentQueue.status, func.count(EnrichmentQueue.event_id))\
+        .group_by(EnrichmentQueue.status).all()
+    stats = {"pending": 0, "running": 0, "done": 0, "failed": 0}
+    stats.update({status: n for status, n in rows})
+    oldest = db.query(func.min(EnrichmentQueue.enqueued_at))\
+        .filter(EnrichmentQueue.status == "pending").scalar()
+    stats["oldest_pending_at"] = oldest.isoformat() if oldest else None
+    return stats
+
+
+def get_latest_extracted(db, event_id: int) -> Optional[dict]:
+    """가장 최근 스냅샷의 추출 결과 JSON (Gemini 재분석 입력용)."""
+    snap = db.query(EventSnapshot).filter(
+        EventSnapshot.event_id == event_id,
+        EventSnapshot.extracted_json.isnot(None),
+    ).order_by(EventSnapshot.captured_at.desc(), EventSnapshot.id.desc()).first()
+    return _parse_json_field(snap.extracted_json) if snap else None
+
+
+# ===========================================================================
+# 단위 작업: 추출/인사이트 결과 일괄 저장
+# ===========================================================================
+
+def persist_enrichment_result(db, event_id: int, update_data: dict = None, sections: dict = None,
+                              insight_data: dict = None, insight_source: str = "rule",
+                              snapshot: dict = None, job_id: int = None, job_status: str = None,
+                              job_error: str = None, enqueue: bool = False,
+                              queue_status: str = None) -> bool:
+    """
+    이벤트 1건의 처리 결과를 한 트랜잭션(commit 1회)으로 저장.
+    이벤트 갱신 + 섹션 + 인사이트 + 스냅샷 + 잡 상태 + 대기열 상태 중 넘긴 것만 반영하며,
+    중간에 실패하면 전부 rollback 후 예외를 다시 올린다 (반쯤 저장된 이벤트 방지).
+
+    Args:
+        snapshot: save_snapshot 키워드 인자 dict (raw_text, extracted_json, latency_ms, ...)
+        enqueue: True면 Gemini 업그레이드 대기열에 (재)등록
+        queue_status: 대기열 항목 상태 갱신 (예: 워커 업그레이드 완료 시 "done")
+
+    Returns:
+        이벤트가 없으면 False (아무것도 저장하지 않음)
+    """
+    try:
+        if update_data is not None and _stage_event_update(db, event_id, update_data) is None:
+            db.rollback()
+            return False
+        if sections:
+            _stage_sections(db, event_id, sections)
+        if insight_data is not None:
+            _stage_insight(db, event_id, insight_data, source=insight_source)
+        if snapshot is not None:
+            _stage_snapshot(db, event_id, **snapshot)
+        if job_id is not None and job_status:
+            _stage_job_status(db, job_id, job_status, error=job_error)
+        if enqueue:
+            _stage_enqueue(db, event_id)
+        elif queue_status:
+            _stage_finish_enrichment(db, event_id, queue_status)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return True
+
+
+# ===========================================================================
+# 공유 rate limiter (token bucket)
+# ===========================================================================
+
+def _lock_rate_row(conn, name: str, now: float, capacity: float):
+    """행에 쓰기 잠금을 먼저 걸고(UPDATE) 읽는다. 없으면 가득 찬 버킷으로 생성."""
+    from sqlalchemy import select, update, insert
+    from sqlalchemy.exc import IntegrityError
+
+    table = RateLimitState.__table__
+    touched = conn.execute(update(table).where(table.c.name == name).values(name=name)).rowcount
+    if not touched:
+        stmt = insert(table).values(
+            name=name, tokens=float(capacity), updated_at=now,
+            cooldown_until=0.0, granted=0, throttled=0, interactive_at=0.0,
+        )
+        if conn.dialect.name == "sqlite":
+            conn.execute(stmt.prefix_with("OR IGNORE"))
+        else:
+            try:
+                with conn.begin_nested():
+                    conn.execute(stmt)
+            except IntegrityError:
+                pass  # 다른 프로세스가 먼저 생성
+    return conn.execute(select(table).where(table.c.name == name)).one()
+
+
+def take_rate_token(name: str, capacity: float, refill_per_sec: float,
+                    now: float = None, cost: float = 1.0, reserve: float = 0.0,
+                    interactive: bool = False, reserve_hold_sec: float = 60.0) -> float:
+    """
+    토큰 1개(cost) 획득 시도. 성공하면 0, 아니면 다음 토큰까지 필요한 대기 초 반환.
+    reserve: 차감 후에도 남아 있어야 하는 토큰 수 (저우선 호출자가 고우선 예약분을 쓰지 않도록).
+        마지막 interactive 요청이 reserve_hold_sec 이내일 때만 적용하고, 그 외에는 용량 전체를 쓴다.
+    interactive: 고우선 호출자. 획득 여부와 무관하게 시각을 기록해 다른 프로세스의 저우선 호출자가 양보하게 한다.
+    한 트랜잭션 안에서 잠금 -> 리필 -> 차감을 수행하므로 여러 프로세스가 동시에 호출해도 안전.
+    """
+    from sqlalchemy import update
+
+    now = time.time() if now is None else now
+    table = RateLimitState.__table__
+    with engine.begin() as conn:
+        row = _lock_rate_row(conn, name, now, capacity)
+        elapsed = max(0.0, now - (row.updated_at or now))
+        tokens = min(float(capacity), (row.tokens or 0.0) + elapsed * refill_per_sec)
+        values = {"tokens": tokens, "updated_at": now}
+        if interactive:
+            values["interactive_at"] = now
+        elif now - (row.interactive_at or 0.0) >= reserve_hold_sec:
+            reserve = 0.0  # 최근 interactive 수요 없음: 예약분 없이 용량 전체 사용
+
+        if now < (row.cooldown_until or 0.0):
+            wait_for = row.cooldown_until - now
+        elif tokens >= cost + reserve:
+            wait_for = 0.0
+            values["tokens"] = tokens - cost
+            values["granted"] = (row.granted or 0) + 1
+        else:
+            needed = cost + reserve - tokens
+            wait_for = needed / refill_per_sec if refill_per_sec > 0 else float("inf")
+        if wait_for > 0:
+            values["throttled"] = (row.throttled or 0) + 1
+        conn.execute(update(table).where(table.c.name == name).values(**values))
+    return wait_for
+
+
+def set_rate_cooldown(name: str, until: float, capacity: float = 1.0):
+    """429 감지 시 공유 cooldown 설정 (기존보다 늦은 시각만 반영) + 남은 토큰 소진."""
+    from sqlalchemy import update
+
+    table = RateLimitState.__table__
+    now = time.time()
+    with engine.begin() as conn:
+        row = _lock_rate_row(conn, name, now, capacity)
+        conn.execute(update(table).where(table.c.name == name).values(
+            cooldown_until=max(row.cooldown_until or 0.0, until), tokens=0.0, updated_at=now,
+        ))
+
+
+def get_rate_limit_state(db, name: str) -> Optional[dict]:
+    row = db.query(RateLimitState).filter(RateLimitState.name == name).first()
+    if not row:
+        return None
+    return {
+        "name": row.name,
+        "tokens": row.tokens,
+        "updated_at": row.updated_at,
+        "cooldown_until": row.cooldown_until,
+        "granted": row.granted,
+        "throttled": row.throttled,
+        "interactive_at": row.interactive_at,
+    }
+
+
+# ===========================================================================
+# CRUD: Gemini 응답 캐시
+# ===========================================================================
+
+# 적중 시 hits/last_used_at 갱신(쓰기) 최소 간격. LRU 정밀도는 이 간격 단위.
+GEMINI_CACHE_TOUCH_SEC = 60
+
+
+def get_cached_gemini_response(db, cache_key: str, touch_interval_sec: int = GEMINI_CACHE_TOUCH_SEC) -> Optional[str]:
+    """
+    캐시 조회. 적중해도 last_used_at이 touch_interval_sec보다 오래됐을 때만 hits/last_used_at을 갱신해
+    매 적중마다 쓰기 트랜잭션이 생기지 않게 한다 (stored_hits는 갱신 횟수 기준).
+    """
+    row = db.query(GeminiResponseCache.response_text, GeminiResponseCache.last_used_at).filter(
+        GeminiResponseCache.cache_key == cache_key
+    ).first()
+    if not row:
+        return None
+    now = datetime.now()
+    if row.last_used_at is None or (now - row.last_used_at).total_seconds() >= touch_interval_sec:
+        db.query(GeminiResponseCache).filter(GeminiResponseCache.cache_key == cache_key).update(
+            {"hits": func.coalesce(GeminiResponseCache.hits, 0) + 1, "last_used_at": now},
+            synchronize_session=False,
+        )
+        db.commit()
+    return row.response_text
+
+
+def delete_cached_gemini_response(db, cache_key: str) -> bool:
+    """검증에 실패한 캐시 항목 제거."""
+    deleted = db.query(GeminiResponseCache).filter(GeminiResponseCache.cache_key == cache_key).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    return bool(deleted)
+
+
+def save_gemini_response(db, cache_key: str, model_name: str, template: str,
+                         response_text: str, max_entries: int = None) -> int:
+    """응답 저장 후 max_entries 초과분을 last_used_at 오래된 순으로 제거. 제거 건수 반환."""
+    now = datetime.now()
+    row = db.query(GeminiResponseCache).filter(GeminiResponseCache.cache_key == cache_key).first()
+    if row:
+        row.response_text = response_text
+        row.last_used_at = now
+    else:
+        db.add(GeminiResponseCache(
+            cache_key=cache_key, model_name=model_name, template=template,
+            response_text=response_text, hits=0, created_at=now, last_used_at=now,
+        ))
+    db.flush()
+
+    evicted = 0
+    if max_entries:
+        overflow = db.query(GeminiResponseCache).count() - max_entries
+        if overflow > 0:
+            stale = db.query(GeminiResponseCache.cache_key).order_by(
+                GeminiResponseCache.last_used_at.asc()
+            ).limit(overflow).subquery()
+            evicted = db.query(GeminiResponseCache).filter(
+                GeminiResponseCache.cache_key.in_(stale.select())
+            ).delete(synchronize_session=False)
+    db.commit()
+    return evicted
+
+
+def get_gemini_cache_summary(db) -> dict:
+    from sqlalchemy import func
+    entries, hits = db.query(
+        func.count(GeminiResponseCache.cache_key), func.coalesce(func.sum(GeminiResponseCache.hits), 0)
+    ).one()
+    by_template = dict(db.query(
+        GeminiResponseCache.template, func.count(GeminiResponseCache.cache_key)
+    ).group_by(GeminiResponseCache.template).all())
+    return {"entries": entries, "stored_hits": int(hits or 0), "by_template": by_template}
+
+
 # ===========================================================================
 # CRUD: manual edits / curation state
 # ===========================================================================
@@ -556,6 +1328,7 @@ def save_manual_edit(db, event_id: int, field_name: str, old_value, new_value, e
         editor=editor, reason=reason,
     )
     db.add(edit)
+    _stage_data_version_bump(db)
     db.commit()
     return edit.id
 
@@ -597,6 +1370,7 @@ def lock_event(db, event_id: int, locked_by: str = "admin", reason: str = None):
             locked_by=locked_by, locked_at=datetime.now(), lock_reason=reason,
         )
         db.add(state)
+    _stage_data_version_bump(db)
     db.commit()
 
 
@@ -607,6 +1381,7 @@ def unlock_event(db, event_id: int):
         state.locked_by = None
         state.locked_at = None
         state.lock_reason = None
+        _stage_data_version_bump(db)
         db.commit()
 
 
@@ -623,34 +1398,93 @@ def get_curation_state(db, event_id: int):
 # 마이그레이션 (기존 DB -> 확장 스키마)
 # ===========================================================================
 
-def run_migration():
-    """기존 events.db를 확장 스키마로 마이그레이션."""
-    from sqlalchemy import text, inspect
-
-    # 1) 새 테이블 생성
-    Base.metadata.create_all(bind=engine)
-
-    inspector = inspect(engine)
-    existing_cols = {c["name"] for c in inspector.get_columns("events")}
-    new_cols = {
+# 기존 테이블에 나중에 추가된 컬럼: {table: {column: DDL type}}
+_ADDED_COLUMNS = {
+    "events": {
         "period_start": "DATE",
         "period_end": "DATE",
         "benefit_amount_won": "INTEGER",
         "benefit_pct": "FLOAT",
         "status": "VARCHAR DEFAULT 'unknown'",
-    }
+        "is_visible": "INTEGER",
+    },
+    "enrichment_queue": {
+        "claim_token": "VARCHAR",
+    },
+    "rate_limit_state": {
+        "interactive_at": "FLOAT NOT NULL DEFAULT 0",
+    },
+    "event_snapshots": {
+        "readiness_wait_ms": "INTEGER",
+        "bytes_transferred": "INTEGER",
+        "requests_blocked": "INTEGER",
+    },
+}
+
+
+_ADDED_INDEXES = {
+    "ix_events_is_visible": ("events", "is_visible"),
+    "ix_events_visible_created": ("events", "is_visible, created_at, id"),
+    "ix_enrichment_queue_claim_token": ("enrichment_queue", "claim_token"),
+}
+
+
+def _add_missing_columns():
+    """_ADDED_COLUMNS 중 없는 컬럼을 ALTER TABLE로 추가 (init_db/run_migration 공용). 추가된 컬럼 목록 반환."""
+    from sqlalchemy import text, inspect
 
+    inspector = inspect(engine)
+    added = []
+    with engine.connect() as conn:
+        for table, cols in _ADDED_COLUMNS.items():
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            for col_name, col_type in cols.items():
+                if col_name not in existing:
+                    try:
+                        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type}"))
+                        added.append(f"{table}.{col_name}")
+                        print(f"[MIGRATE] {table}.{col_name} 추가됨")
+                    except Exception as e:
+                        if "duplicate" not in str(e).lower():
+                            print(f"[MIGRATE] {table}.{col_name} 추가 실패: {e}")
+        conn.commit()
     with engine.connect() as conn:
-        # 2) events에 새 컬럼 추가
-        for col_name, col_type in new_cols.items():
-            if col_name not in existing_cols:
-                try:
-                    conn.execute(text(f"ALTER TABLE events ADD COLUMN {col_name} {col_type}"))
-                    print(f"[MIGRATE] events.{col_name} 추가됨")
-                except Exception as e:
-                    if "duplicate" not in str(e).lower():
-                        print(f"[MIGRATE] events.{col_name} 추가 실패: {e}")
+        # create_all은 기존 테이블에 인덱스를 만들지 않으므로 추가 컬럼 인덱스는 직접 생성
+        for index_name, (table, col_name) in _ADDED_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({col_name})"))
         conn.commit()
+    backfill_visibility()
+    return added
+
+
+def backfill_visibility(recompute_all: bool = False) -> int:
+    """is_visible이 비어 있는(또는 recompute_all이면 전체) 이벤트의 노출 여부 계산. 갱신 건수 반환."""
+    session = SessionLocal()
+    try:
+        q = session.query(CardEvent)
+        if not recompute_all:
+            q = q.filter(CardEvent.is_visible.is_(None))
+        count = 0
+        for ev in q.all():
+            refresh_visibility(ev)
+            count += 1
+        if count:
+            _stage_data_version_bump(session)
+        session.commit()
+    finally:
+        session.close()
+    if count:
+        print(f"[MIGRATE] events.is_visible {count}건 계산")
+    return count
+
+
+def run_migration():
+    """기존 events.db를 확장 스키마로 마이그레이션."""
+    # 1) 새 테이블 생성
+    Base.metadata.create_all(bind=engine)
+
+    # 2) events / event_snapshots에 새 컬럼 추가
+    _add_missing_columns()
 
     # 3) 기존 데이터 파싱: period -> dates, benefit_value -> amounts, status
     session = SessionLocal()
@@ -679,6 +1513,9 @@ def run_migration():
             if not ev.status or ev.status == "unknown":
                 ev.status = compute_status(ev.period_end)
                 changed = True
+            if ev.is_visible != int(has_meaningful_info(ev)):
+                refresh_visibility(ev)
+                changed = True
 
             # 4) marketing_content -> event_sections
             mc = _parse_json_field(ev.marketing_content)
@@ -693,6 +1530,7 @@ def run_migration():
             if changed:
                 migrated += 1
 
+        _stage_data_version_bump(session)
         session.commit()
         print(f"[MIGRATE] 완료: {migrated}건 파싱 업데이트, {len(events)}건 총 처리")
     finally:
@@ -8,14 +8,8 @@ import re
 from typing import Dict, List, Tuple
 
 from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
 
-# playwright_stealth 2.x: Stealth 클래스만 사용 (1.x stealth_async는 제거됨)
-try:
-    from playwright_stealth import Stealth
-    _STEALTH_CLS = Stealth
-except ImportError:
-    _STEALTH_CLS = None
+from modules.browser import get_browser_pool
 
 # 알림/헤더 제외용 (4사 공통)
 _HEADER_LIKE = (
@@ -727,11 +721,182 @@ def _extract_marketing_insights(extracted_data: dict) -> dict:
     return insights
 
 
-async def extract_from_url(url: str, wait_sec: float = 3) -> dict:
+# 본문 준비 판정: READY_POLL_SEC 간격으로 본문 길이/문서 높이를 재서 READY_QUIET_SEC 동안 변화가 없으면 준비 완료
+READY_POLL_SEC = 0.2
+READY_QUIET_SEC = 0.6
+SCROLL_ROUNDS = 3
+SCROLL_MAX_WAIT_SEC = 0.8
+
+_MEASURE_JS = """(selectors) => {
+    let el = null;
+    for (const s of selectors) { el = document.querySelector(s); if (el) break; }
+    el = el || document.body;
+    const text = el ? (el.innerText || '').length : 0;
+    const height = document.body ? document.body.scrollHeight : 0;
+    return [text, height];
+}"""
+
+
+_FRAME_MEASURE_JS = """() => [
+    document.body ? (document.body.innerText || '').length : 0,
+    document.body ? document.body.scrollHeight : 0,
+]"""
+
+
+async def _measure_frames(page) -> Tuple[int, int, int]:
+    """하위 frame들의 (본문 길이 합, 높이 합, frame 수). 접근 불가 frame은 0으로 센다."""
+    text_total, height_total, count = 0, 0, 0
+    main = getattr(page, "main_frame", None)
+    for frame in getattr(page, "frames", None) or []:
+        if frame is main:
+            continue
+        count += 1
+        try:
+            text_len, height = await frame.evaluate(_FRAME_MEASURE_JS)
+            text_total += int(text_len or 0)
+            height_total += int(height or 0)
+        except Exception:
+            continue
+    return text_total, height_total, count
+
+
+async def _measure_content(page, domain_key: str) -> Tuple[int, int]:
+    """
+    (본문 길이, 문서 높이). 도메인 셀렉터에 iframe이 있으면 하위 frame 본문도 합산하며,
+    frame이 붙었는데 아직 본문이 비어 있으면 본문 길이 0(미준비)으로 본다.
+    """
+    domain_selectors = _DOMAIN_TEXT_SELECTORS.get(domain_key, [])
+    selectors = [s for s in domain_selectors if s != "iframe"]
+    try:
+        text_len, height = await page.evaluate(_MEASURE_JS, selectors)
+        text_len, height = int(text_len or 0), int(height or 0)
+    except Exception:
+        return 0, 0
+    if "iframe" in domain_selectors:
+        frame_text, frame_height, frame_count = await _measure_frames(page)
+        if frame_count and not frame_text:
+            return 0, height
+        text_len += frame_text
+        height += frame_height
+    return text_len, height
+
+
+async def _wait_for_content_ready(page, domain_key: str, max_wait: float) -> float:
+    """
+    본문 컨테이너 텍스트 길이와 문서 높이가 READY_QUIET_SEC 동안 그대로면 즉시 반환.
+    최대 max_wait초까지 대기. 실제 대기한 초 반환.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    last = await _measure_content(page, domain_key)
+    stable_since = started
+    while True:
+        now = loop.time()
+        if now - started >= max_wait:
+            break
+        if last[0] > 0 and now - stable_since >= READY_QUIET_SEC:
+            break
+        await asyncio.sleep(min(READY_POLL_SEC, max(0.0, max_wait - (now - started))))
+        current = await _measure_content(page, domain_key)
+        if current != last:
+            last = current
+            stable_since = loop.time()
+    return loop.time() - started
+
+
+async def _scroll_until_stable(page, domain_key: str) -> float:
+    """lazy-load 대비 하단 스크롤. 문서 높이가 더 이상 늘지 않으면 중단. 실제 대기한 초 반환."""
+    waited = 0.0
+    _, height = await _measure_content(page, domain_key)
+    for _ in range(SCROLL_ROUNDS):
+        try:
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        except Exception:
+            break
+        waited += await _wait_for_content_ready(page, domain_key, max_wait=SCROLL_MAX_WAIT_SEC)
+        _, new_height = await _measure_content(page, domain_key)
+        if new_height <= height:
+            break
+        height = new_height
+    return waited
+
+
+async def _read_rendered_page(page, url: str, wait_sec: float, domain_key: str) -> Tuple[str, str, int]:
+    """
+    열린 page로 URL 이동 후 (html, body_text, wait_ms) 반환. 로드 실패 시 예외 전파.
+    wait_ms: 본문 안정화 대기 + 스크롤에 실제로 쓴 시간 (최대 wait_sec + 3×0.8초)
+    """
+    await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+    waited = await _wait_for_content_ready(page, domain_key, max_wait=wait_sec)
+    # 스크롤 후에도 매 회 안정화 대기를 거치므로 별도 고정 대기 없음
+    waited += await _scroll_until_stable(page, domain_key)
+    html = await page.content()
+
+    # 핵심: 실제 렌더링된 body 텍스트를 우선 확보
+    try:
+        body_text = await page.inner_text("body")
+    except Exception:
+        body_text = ""
+
+    # body가 빈 경우 주요 컨테이너 셀렉터로 재시도
+    if len(_normalize_text(body_text)) < 120:
+        base_selectors = [
+            "main", "article", "#content", ".content", ".event-detail", ".evt_cont", ".container",
+            "#main_contents", ".eventViewWrap", "#eventBodyRE", "#eventContents", "#eventContentsWrap",
+        ]
+        selectors = base_selectors + _DOMAIN_TEXT_SELECTORS.get(domain_key, [])
+        for selector in selectors:
+            try:
+                # iframe selector가 잡히면 frame 본문 우선 시도
+                if selector == "iframe":
+                    for frame in page.frames:
+                        if frame == page.main_frame:
+                            continue
+                        try:
+                            candidate = await frame.inner_text("body")
+                            if len(_normalize_text(candidate)) > len(_normalize_text(body_text)):
+                                body_text = candidate
+                        except Exception:
+                            continue
+                    continue
+                candidate = await page.inner_text(selector)
+                if len(_normalize_text(candidate)) > len(_normalize_text(body_text)):
+                    body_text = candidate
+            except Exception:
+                continue
+
+    # 메인 문서가 빈 경우 frame 본문도 시도
+    if len(_normalize_text(body_text)) < 120:
+        for frame in page.frames:
+            if frame == page.main_frame:
+                continue
+            try:
+                candidate = await frame.inner_text("body")
+                if len(_normalize_text(candidate)) > len(_normalize_text(body_text)):
+                    body_text = candidate
+            except Exception:
+                continue
+
+    # 마지막 JS 폴백
+    if len(_normalize_text(body_text)) < 60:
+        try:
+            candidate = await page.evaluate("() => (document.body && document.body.innerText) ? document.body.innerText : ''")
+            if len(_normalize_text(candidate)) > len(_normalize_text(body_text)):
+                body_text = candidate
+        except Exception:
+            pass
+    return html, body_text, int(waited * 1000)
+
+
+async def extract_from_url(url: str, wait_sec: float = 3, page=None) -> dict:
     """
     URL(상세 페이지)에서 iframe과 동일한 화면 내용을 추출하여 구조화.
     모든 마케팅 내용(혜택, 참여방법, 유의사항, 파트너십, 마케팅 메시지 등)을 섹션별로 추출.
-    
+
+    Args:
+        page: 브라우저 풀에서 빌린 stealth page. None이면 공유 풀(get_browser_pool)에서 1회 빌려 사용.
+              page를 넘기면 로드 실패 예외를 호출자에게 전파 (풀이 page 폐기).
+
     Returns:
         dict: 기본 필드 + marketing_content (구조화된 마케팅 정보) + insights (인사이트)
     """
@@ -750,91 +915,21 @@ async def extract_from_url(url: str, wait_sec: float = 3) -> dict:
     if not url or not url.startswith("http"):
         return result
 
-    html = ""
-    body_text = ""
     domain_key = _detect_domain_key(url)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-            viewport={"width": 1920, "height": 1080},
-        )
-        if _STEALTH_CLS:
-            await _STEALTH_CLS().apply_stealth_async(context)
-        page = await context.new_page()
+    if page is not None:
+        # 풀 page: 로드 예외는 그대로 전파해야 BrowserPool.page()가 해당 page를 폐기한다
+        html, body_text, wait_ms = await _read_rendered_page(page, url, wait_sec, domain_key)
+    else:
+        # 공유 풀 page (stealth + 리소스 차단 프로필). 예외가 pool.page() 블록을 지나야 풀이 page를 폐기한다
         try:
-            await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-            await asyncio.sleep(wait_sec)
-            for _ in range(3):
-                try:
-                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                    await asyncio.sleep(0.8)
-                except Exception:
-                    pass
-
-            # 본문 렌더링 안정화
-            await asyncio.sleep(0.5)
-            html = await page.content()
-
-            # 핵심: 실제 렌더링된 body 텍스트를 우선 확보
-            try:
-                body_text = await page.inner_text("body")
-            except Exception:
-                body_text = ""
-
-            # body가 빈 경우 주요 컨테이너 셀렉터로 재시도
-            if len(_normalize_text(body_text)) < 120:
-                base_selectors = [
-                    "main", "article", "#content", ".content", ".event-detail", ".evt_cont", ".container",
-                    "#main_contents", ".eventViewWrap", "#eventBodyRE", "#eventContents", "#eventContentsWrap",
-                ]
-                selectors = base_selectors + _DOMAIN_TEXT_SELECTORS.get(domain_key, [])
-                for selector in selectors:
-                    try:
-                        # iframe selector가 잡히면 frame 본문 우선 시도
-                        if selector == "iframe":
-                            for frame in page.frames:
-                                if frame == page.main_frame:
-                                    continue
-                                try:
-                                    candidate = await frame.inner_text("body")
-                                    if len(_normalize_text(candidate)) > len(_normalize_text(body_text)):
-                                        body_text = candidate
-                                except Exception:
-                                    continue
-                            continue
-                        candidate = await page.inner_text(selector)
-                        if len(_normalize_text(candidate)) > len(_normalize_text(body_text)):
-                            body_text = candidate
-                    except Exception:
-                        continue
-
-            # 메인 문서가 빈 경우 frame 본문도 시도
-            if len(_normalize_text(body_text)) < 120:
-                for frame in page.frames:
-                    if frame == page.main_frame:
-                        continue
-                    try:
-                        candidate = await frame.inner_text("body")
-                        if len(_normalize_text(candidate)) > len(_normalize_text(body_text)):
-                            body_text = candidate
-                    except Exception:
-                        continue
-
-            # 마지막 JS 폴백
-            if len(_normalize_text(body_text)) < 60:
-                try:
-                    candidate = await page.evaluate("() => (document.body && document.body.innerText) ? document.body.innerText : ''")
-                    if len(_normalize_text(candidate)) > len(_normalize_text(body_text)):
-                        body_text = candidate
-                except Exception:
-                    pass
+            async with get_browser_pool().page() as pooled_page:
+                html, body_text, wait_ms = await _read_rendered_page(pooled_page, url, wait_sec, domain_key)
         except Exception as e:
             result["raw_text"] = f"로드 실패: {str(e)[:200]}"
             return result
-        finally:
-            await browser.close()
+
+    result["readiness_wait_ms"] = wait_ms
 
     if "조회 결과가 없습니다" in html:
         result["raw_text"] = "조회 결과가 없습니다."
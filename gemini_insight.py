@@ -4,13 +4,18 @@ Playwright 추출 후 raw_text + marketing_content를 Gemini에 전달해
 한줄요약, 카테고리, 위협도, 심층 마케팅 전략 분석을 얻는다.
 """
 
+import asyncio
+import hashlib
 import json
 import os
 import logging
+import re
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 from threading import Lock
-from typing import Optional
+from typing import Callable, Optional
 
 from dotenv import load_dotenv
 
@@ -31,12 +36,54 @@ _MODEL_CANDIDATES = [m.strip() for m in GEMINI_MODEL_PRIORITY.split(",") if m.st
 if not _MODEL_CANDIDATES:
     _MODEL_CANDIDATES = ["gemini-2.5-flash-lite", "gemini-2.5-flash"]
 
+# 모델 라우팅: cascade = 후보 첫 모델(저렴/빠름)로 먼저 분석하고, 스키마 위반·핵심 필드 누락·rule과 큰 불일치일 때만
+# 마지막 후보(상위 모델)로 재분석. failover = 기존처럼 첫 모델만 쓰고 사용 불가 시 다음 후보로 전환.
+GEMINI_ROUTING_MODE = (os.getenv("GEMINI_ROUTING_MODE", "cascade") or "cascade").strip().lower()
+
+# 프로세스 간 공유 token bucket (database.RateLimitState). 끄면(0) 프로세스 로컬 슬라이딩 윈도우만 사용.
+# 버킷 용량(버스트)이 클수록 짧은 구간에 몰아 쓸 수 있지만 1분 구간 합계가 RPM을 넘을 수 있다.
+GEMINI_SHARED_LIMITER = os.getenv("GEMINI_SHARED_LIMITER", "1").strip().lower() not in ("0", "false", "no")
+GEMINI_BUCKET_CAPACITY = max(1, int(os.getenv("GEMINI_BUCKET_CAPACITY", "2")))
+GEMINI_LIMITER_NAME = "gemini"
+
+# 우선순위 lane: interactive(대시보드/수동 요청) / background(일괄 인사이트).
+# interactive 요청이 대기 중이거나 GEMINI_INTERACTIVE_HOLD_SEC 이내에 있었으면 bucket 용량 중
+# GEMINI_INTERACTIVE_SHARE 비율(최소 1토큰)을 interactive 전용으로 남겨두고 background는 그 위의 토큰만 쓴다.
+# interactive 수요가 없으면 background가 용량 전체를 쓴다.
+LANE_INTERACTIVE = "interactive"
+LANE_BACKGROUND = "background"
+GEMINI_INTERACTIVE_SHARE = min(1.0, max(0.0, float(os.getenv("GEMINI_INTERACTIVE_SHARE", "0.5"))))
+GEMINI_INTERACTIVE_HOLD_SEC = max(0.0, float(os.getenv("GEMINI_INTERACTIVE_HOLD_SEC", "60")))
+
+# 응답 캐시 (SQLite, database.GeminiResponseCache). 프롬프트 템플릿을 고치면 버전을 올려 기존 캐시를 무효화.
+GEMINI_CACHE_ENABLED = os.getenv("GEMINI_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+GEMINI_CACHE_MAX_ENTRIES = max(1, int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "2000")))
+PROMPT_TEMPLATE_VERSIONS = {
+    "enrich": "v2",
+    "enrich_batch": "v2",
+    "company_brief": "v1",
+    "qualitative": "v1",
+    "text_compare": "v1",
+}
+
 _model = None
 _model_name = None
 _model_index = 0
+_named_models = {}
+_model_stats = {}
+_routing_stats = {"routed": 0, "escalated": 0, "no_response": 0,
+                  "reasons": {"schema": 0, "empty_fields": 0, "rule_disagreement": 0}}
+_unavailable_models = set()  # 라우팅 중 404 등으로 사용 불가 판정된 모델 (프로세스 수명 동안 건너뜀)
 _request_timestamps = deque()
 _rate_lock = Lock()
 _cooldown_until = 0.0
+_last_interactive_at = None  # 마지막 interactive 요청 시각 (monotonic)
+_cache_stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalid": 0, "errors": 0}
+_lane_stats = {
+    lane: {"waiting": 0, "requests": 0, "granted": 0, "rejected": 0, "wait_total_sec": 0.0, "wait_max_sec": 0.0}
+    for lane in (LANE_INTERACTIVE, LANE_BACKGROUND)
+}
+_cache_stats_lock = Lock()
 
 
 def _prune_timestamps(now: float) -> None:
@@ -44,64 +91,241 @@ def _prune_timestamps(now: float) -> None:
         _request_timestamps.popleft()
 
 
+def _refill_per_sec() -> float:
+    return GEMINI_MAX_RPM / float(GEMINI_WINDOW_SEC)
+
+
 def _mark_rate_cooldown(seconds: int = GEMINI_COOLDOWN_SEC) -> None:
     global _cooldown_until
     with _rate_lock:
         now = time.monotonic()
         _cooldown_until = max(_cooldown_until, now + max(1, seconds))
+    if GEMINI_SHARED_LIMITER:
+        try:
+            import database as db
+            db.set_rate_cooldown(GEMINI_LIMITER_NAME, time.time() + max(1, seconds), GEMINI_BUCKET_CAPACITY)
+        except Exception as e:
+            logger.debug("공유 rate limiter cooldown 기록 실패: %s", str(e)[:200])
+
+
+def _interactive_reserve(capacity: int) -> int:
+    """interactive 수요가 있을 때 background가 건드리지 못하는 interactive 전용 토큰(슬롯) 수."""
+    if GEMINI_INTERACTIVE_SHARE <= 0:
+        return 0
+    return min(capacity, max(1, round(capacity * GEMINI_INTERACTIVE_SHARE)))
+
 
+def _interactive_active(now: float) -> bool:
+    """interactive 요청이 대기 중이거나 최근(GEMINI_INTERACTIVE_HOLD_SEC 이내)에 있었는지. _rate_lock 안에서 호출."""
+    if _lane_stats[LANE_INTERACTIVE]["waiting"] > 0:
+        return True
+    return _last_interactive_at is not None and now - _last_interactive_at < GEMINI_INTERACTIVE_HOLD_SEC
 
-def _acquire_request_slot(allow_wait: bool = True) -> bool:
+
+def _reserve_request_slot(lane: str = LANE_BACKGROUND) -> float:
     """
-    Gemini 요청 슬롯을 분당 제한(GEMINI_MAX_RPM)에 맞춰 획득.
-    - wait 모드: 제한 해제까지 대기
-    - skip 모드: 즉시 False 반환 (caller가 rule fallback)
+    슬롯이 비어 있으면 즉시 예약하고 0 반환, 아니면 필요한 대기 초 반환.
+    sync/async limiter가 공유하는 판정 로직.
+    GEMINI_SHARED_LIMITER면 DB token bucket(전 프로세스 공용)을 쓰고, DB 오류 시 로컬 윈도우로 대체.
+    background lane은 interactive 수요가 있을 때만 예약분을 남겨둔 채로 획득한다.
     """
-    wait_logged = False
-    started_at = time.monotonic()
+    if GEMINI_SHARED_LIMITER:
+        reserve = _interactive_reserve(GEMINI_BUCKET_CAPACITY) if lane == LANE_BACKGROUND else 0
+        try:
+            import database as db
+            return db.take_rate_token(GEMINI_LIMITER_NAME, GEMINI_BUCKET_CAPACITY, _refill_per_sec(),
+                                      reserve=reserve, interactive=lane == LANE_INTERACTIVE,
+                                      reserve_hold_sec=GEMINI_INTERACTIVE_HOLD_SEC)
+        except Exception as e:
+            logger.debug("공유 rate limiter 사용 실패, 로컬 limiter 사용: %s", str(e)[:200])
+    return _reserve_local_slot(lane)
 
-    while True:
-        wait_for = 0.0
-        now = time.monotonic()
-        with _rate_lock:
-            _prune_timestamps(now)
 
-            if now < _cooldown_until:
-                wait_for = max(wait_for, _cooldown_until - now)
+def _reserve_local_slot(lane: str = LANE_BACKGROUND) -> float:
+    """프로세스 로컬 슬라이딩 윈도우 (락은 짧게만 잡는다)."""
+    now = time.monotonic()
+    wait_for = 0.0
+    limit = GEMINI_MAX_RPM
+    with _rate_lock:
+        if lane == LANE_BACKGROUND and _interactive_active(now):
+            limit -= _interactive_reserve(GEMINI_MAX_RPM)
+        _prune_timestamps(now)
+
+        if now < _cooldown_until:
+            wait_for = max(wait_for, _cooldown_until - now)
+
+        if limit <= 0:
+            # 예약분이 윈도우 전체: interactive 수요가 끝날 때(최근 요청 후 HOLD 경과)까지 대기
+            held = now - (_last_interactive_at if _last_interactive_at is not None else now)
+            wait_for = max(wait_for, GEMINI_INTERACTIVE_HOLD_SEC - held, 0.5)
+        elif len(_request_timestamps) >= limit:
+            # 가장 오래된 기록부터 만료되므로, limit번째로 최근 기록이 빠질 때까지 대기
+            oldest_blocking = _request_timestamps[len(_request_timestamps) - limit]
+            window_wait = GEMINI_WINDOW_SEC - (now - oldest_blocking) + 0.05
+            wait_for = max(wait_for, window_wait)
+
+        if wait_for <= 0:
+            _request_timestamps.append(time.monotonic())
+            return 0.0
+    return wait_for
+
+
+def get_rate_limiter_status() -> dict:
+    """공유 bucket 상태(토큰/ cooldown 잔여) + 로컬 윈도우 사용량."""
+    now = time.monotonic()
+    with _rate_lock:
+        _prune_timestamps(now)
+        local = {
+            "window_used": len(_request_timestamps),
+            "interactive_active": _interactive_active(now),
+            "cooldown_remaining_sec": round(max(0.0, _cooldown_until - now), 2),
+        }
+    status = {
+        "shared": GEMINI_SHARED_LIMITER,
+        "max_rpm": GEMINI_MAX_RPM,
+        "window_sec": GEMINI_WINDOW_SEC,
+        "bucket_capacity": GEMINI_BUCKET_CAPACITY,
+        "refill_per_sec": round(_refill_per_sec(), 4),
+        "mode": GEMINI_RATE_MODE,
+        "interactive_share": GEMINI_INTERACTIVE_SHARE,
+        "interactive_reserve": _interactive_reserve(GEMINI_BUCKET_CAPACITY if GEMINI_SHARED_LIMITER else GEMINI_MAX_RPM),
+        "interactive_hold_sec": GEMINI_INTERACTIVE_HOLD_SEC,
+        "lanes": get_lane_stats(),
+        "local": local,
+        "bucket": None,
+    }
+    if GEMINI_SHARED_LIMITER:
+        try:
+            import database as db
+            session = db.SessionLocal()
+            try:
+                state = db.get_rate_limit_state(session, GEMINI_LIMITER_NAME)
+            finally:
+                session.close()
+            if state:
+                wall = time.time()
+                elapsed = max(0.0, wall - (state["updated_at"] or wall))
+                state["tokens_now"] = round(min(GEMINI_BUCKET_CAPACITY, state["tokens"] + elapsed * _refill_per_sec()), 3)
+                state["cooldown_remaining_sec"] = round(max(0.0, (state["cooldown_until"] or 0) - wall), 2)
+            status["bucket"] = state
+        except Exception as e:
+            status["error"] = str(e)[:200]
+    return status
+
 
-            if len(_request_timestamps) >= GEMINI_MAX_RPM:
-                window_wait = GEMINI_WINDOW_SEC - (now - _request_timestamps[0]) + 0.05
-                wait_for = max(wait_for, window_wait)
+def get_lane_stats() -> dict:
+    """lane별 현재 대기 수(queue depth), 요청/획득/포기 수, 평균·최대 대기 시간."""
+    with _rate_lock:
+        stats = {lane: dict(v) for lane, v in _lane_stats.items()}
+    for v in stats.values():
+        v["wait_avg_sec"] = round(v["wait_total_sec"] / v["granted"], 3) if v["granted"] else 0.0
+        v["wait_total_sec"] = round(v["wait_total_sec"], 3)
+        v["wait_max_sec"] = round(v["wait_max_sec"], 3)
+    return stats
 
-            if wait_for <= 0:
-                _request_timestamps.append(time.monotonic())
-                return True
 
-        if not allow_wait:
-            return False
+def _lane_enter(lane: str) -> None:
+    global _last_interactive_at
+    with _rate_lock:
+        if lane == LANE_INTERACTIVE:
+            _last_interactive_at = time.monotonic()
+        _lane_stats[lane]["waiting"] += 1
+        _lane_stats[lane]["requests"] += 1
 
-        if GEMINI_RATE_MODE == "skip":
-            logger.info(
-                "Gemini rate limit skip: mode=skip, rpm=%s, wait_for=%.2fs",
-                GEMINI_MAX_RPM, wait_for,
-            )
-            return False
 
-        elapsed = time.monotonic() - started_at
-        if GEMINI_MAX_WAIT_SEC > 0 and (elapsed + wait_for) > GEMINI_MAX_WAIT_SEC:
-            logger.warning(
-                "Gemini rate limit wait exceeded max_wait=%.1fs (needed=%.2fs). Rule fallback.",
-                GEMINI_MAX_WAIT_SEC, wait_for,
-            )
-            return False
+def _lane_exit(lane: str, granted: bool, waited: float) -> None:
+    with _rate_lock:
+        s = _lane_stats[lane]
+        s["waiting"] -= 1
+        if granted:
+            s["granted"] += 1
+            s["wait_total_sec"] += waited
+            s["wait_max_sec"] = max(s["wait_max_sec"], waited)
+        else:
+            s["rejected"] += 1
+
+
+def _should_keep_waiting(wait_for: float, started_at: float, allow_wait: bool) -> bool:
+    if not allow_wait:
+        return False
+
+    if GEMINI_RATE_MODE == "skip":
+        logger.info(
+            "Gemini rate limit skip: mode=skip, rpm=%s, wait_for=%.2fs",
+            GEMINI_MAX_RPM, wait_for,
+        )
+        return False
+
+    elapsed = time.monotonic() - started_at
+    if GEMINI_MAX_WAIT_SEC > 0 and (elapsed + wait_for) > GEMINI_MAX_WAIT_SEC:
+        logger.warning(
+            "Gemini rate limit wait exceeded max_wait=%.1fs (needed=%.2fs). Rule fallback.",
+            GEMINI_MAX_WAIT_SEC, wait_for,
+        )
+        return False
+    return True
+
+
+# 동기 래퍼가 만든 임시 이벤트 루프 안인지 표시 (grpc aio 클라이언트는 첫 루프에 묶이므로 이때는 동기 호출 사용)
+_sync_bridge = ContextVar("gemini_sync_bridge", default=False)
 
-        if not wait_logged:
-            logger.info(
-                "Gemini rate limiter active: rpm=%s, waiting %.2fs",
-                GEMINI_MAX_RPM, wait_for,
-            )
-            wait_logged = True
-        time.sleep(max(0.05, wait_for))
+
+def _run_sync(coro):
+    """
+    async 구현을 동기 호출자에서 실행 (하위호환 동기 래퍼용).
+    실행 중인 루프가 없으면 asyncio.run, 있으면(루프 안의 동기 코드) 별도 스레드의 새 루프에서 실행.
+    """
+    def _run():
+        token = _sync_bridge.set(True)
+        try:
+            return asyncio.run(coro)
+        finally:
+            _sync_bridge.reset(token)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _run()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(_run).result()
+
+
+def _acquire_request_slot(allow_wait: bool = True, lane: str = LANE_BACKGROUND) -> bool:
+    """_aacquire_request_slot의 동기 래퍼 (대기 동안 호출 스레드 블로킹)."""
+    return _run_sync(_aacquire_request_slot(allow_wait=allow_wait, lane=lane))
+
+
+async def _aacquire_request_slot(allow_wait: bool = True, lane: str = LANE_BACKGROUND) -> bool:
+    """
+    Gemini 요청 슬롯을 분당 제한(GEMINI_MAX_RPM)에 맞춰 획득. 대기 중에도 이벤트 루프를 막지 않는다.
+    - wait 모드: 제한 해제까지 대기
+    - skip 모드: 즉시 False 반환 (caller가 rule fallback)
+    """
+    wait_logged = False
+    started_at = time.monotonic()
+    granted = False
+    _lane_enter(lane)
+    try:
+        while True:
+            # 공유 limiter는 SQLite 쓰기 트랜잭션(busy_timeout까지 대기 가능)이라 스레드에서 실행
+            if GEMINI_SHARED_LIMITER:
+                wait_for = await asyncio.to_thread(_reserve_request_slot, lane)
+            else:
+                wait_for = _reserve_request_slot(lane)
+            if wait_for <= 0:
+                granted = True
+                return True
+            if not _should_keep_waiting(wait_for, started_at, allow_wait):
+                return False
+            if not wait_logged:
+                logger.info(
+                    "Gemini rate limiter active: lane=%s rpm=%s, waiting %.2fs",
+                    lane, GEMINI_MAX_RPM, wait_for,
+                )
+                wait_logged = True
+            await asyncio.sleep(max(0.05, wait_for))
+    finally:
+        _lane_exit(lane, granted, time.monotonic() - started_at)
 
 
 def _is_rate_limit_error(error: Exception) -> bool:
@@ -140,6 +364,52 @@ def _get_model():
         return None
 
 
+def _get_named_model(name: str):
+    """라우팅용: 지정 모델 인스턴스 (전역 failover 상태와 무관)."""
+    if name in _named_models:
+        return _named_models[name]
+    if _get_model() is None:
+        return None
+    try:
+        import google.generativeai as genai
+        _named_models[name] = genai.GenerativeModel(name)
+        return _named_models[name]
+    except Exception as e:
+        logger.warning("Gemini 모델 초기화 실패(%s): %s", name, e)
+        return None
+
+
+def _record_model_call(name: str, latency_ms: float, ok: bool) -> None:
+    with _rate_lock:
+        s = _model_stats.setdefault(name, {"calls": 0, "errors": 0, "latency_total_ms": 0.0, "latency_max_ms": 0.0})
+        s["calls"] += 1
+        if not ok:
+            s["errors"] += 1
+        s["latency_total_ms"] += latency_ms
+        s["latency_max_ms"] = max(s["latency_max_ms"], latency_ms)
+
+
+def get_model_routing_stats() -> dict:
+    """모델별 호출 수/오류/평균·최대 지연 + cascade 에스컬레이션 비율."""
+    with _rate_lock:
+        models = {name: dict(s) for name, s in _model_stats.items()}
+        routing = {"routed": _routing_stats["routed"], "escalated": _routing_stats["escalated"],
+                   "no_response": _routing_stats.get("no_response", 0),
+                   "reasons": dict(_routing_stats["reasons"]),
+                   "unavailable_models": sorted(_unavailable_models)}
+    for s in models.values():
+        s["latency_avg_ms"] = round(s["latency_total_ms"] / s["calls"], 1) if s["calls"] else 0.0
+        s["latency_total_ms"] = round(s["latency_total_ms"], 1)
+        s["latency_max_ms"] = round(s["latency_max_ms"], 1)
+    routing["escalation_rate"] = round(routing["escalated"] / routing["routed"], 4) if routing["routed"] else 0.0
+    return {"mode": GEMINI_ROUTING_MODE, "candidates": list(_MODEL_CANDIDATES), "models": models, "routing": routing}
+
+
+def is_gemini_configured() -> bool:
+    """API 키가 있고 모델 초기화가 가능한지 (큐 워커가 유휴 여부 판단에 사용)."""
+    return _get_model() is not None
+
+
 def _switch_to_next_model() -> bool:
     """
     현재 모델이 사용 불가일 때 다음 후보 모델로 전환.
@@ -173,47 +443,207 @@ def _extract_json_text(raw_text: str) -> str:
     return text.strip()
 
 
-def _generate_text_with_gemini(
+def _loads_json(text: Optional[str]):
+    """응답 텍스트 -> JSON 객체. 파싱 실패 시 None (로그 없음, 캐시 검증용)."""
+    if not text:
+        return None
+    try:
+        return json.loads(_extract_json_text(text))
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# 응답 캐시
+# ---------------------------------------------------------------------------
+
+def _cache_key(model_name: str, template: str, prompt: str, generation_config: dict) -> str:
+    version = PROMPT_TEMPLATE_VERSIONS.get(template, "v0")
+    payload = json.dumps(
+        [model_name, f"{template}:{version}", prompt, generation_config],
+        ensure_ascii=False, sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _bump_cache_stat(name: str, amount: int = 1) -> None:
+    with _cache_stats_lock:
+        _cache_stats[name] += amount
+
+
+def _cache_lookup(template: Optional[str], prompt: str, generation_config: dict,
+                  model_name: Optional[str] = None, validate: Callable[[str], bool] = None) -> Optional[str]:
+    """적중한 텍스트가 validate를 통과하지 못하면 항목을 지우고 미스로 처리."""
+    if not (GEMINI_CACHE_ENABLED and template):
+        return None
+    try:
+        import database as db
+        session = db.SessionLocal()
+        try:
+            key = _cache_key(model_name or _model_name or "", template, prompt, generation_config)
+            text = db.get_cached_gemini_response(session, key)
+            if text and validate is not None and not validate(text):
+                db.delete_cached_gemini_response(session, key)
+                _bump_cache_stat("invalid")
+                text = None
+        finally:
+            session.close()
+    except Exception as e:
+        _bump_cache_stat("errors")
+        logger.debug("Gemini 캐시 조회 실패: %s", str(e)[:200])
+        return None
+    _bump_cache_stat("hits" if text else "misses")
+    return text
+
+
+def _cache_store(template: Optional[str], prompt: str, generation_config: dict,
+                 model_name: str, text: str, validate: Callable[[str], bool] = None) -> None:
+    """validate(파싱+스키마 검증)를 통과한 응답만 저장. 잘리거나 깨진 응답이 캐시에 고정되지 않게 한다."""
+    if not (GEMINI_CACHE_ENABLED and template and text and validate is not None):
+        return
+    if not validate(text):
+        return
+    try:
+        import database as db
+        session = db.SessionLocal()
+        try:
+            evicted = db.save_gemini_response(
+                session, _cache_key(model_name, template, prompt, generation_config),
+                model_name, f"{template}:{PROMPT_TEMPLATE_VERSIONS.get(template, 'v0')}", text,
+                max_entries=GEMINI_CACHE_MAX_ENTRIES,
+            )
+        finally:
+            session.close()
+        _bump_cache_stat("stores")
+        if evicted:
+            _bump_cache_stat("evictions", evicted)
+    except Exception as e:
+        _bump_cache_stat("errors")
+        logger.debug("Gemini 캐시 저장 실패: %s", str(e)[:200])
+
+
+def get_response_cache_stats() -> dict:
+    """프로세스 기준 적중/미스 카운터 + DB 캐시 현황."""
+    with _cache_stats_lock:
+        stats = dict(_cache_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+    stats["enabled"] = GEMINI_CACHE_ENABLED
+    stats["max_entries"] = GEMINI_CACHE_MAX_ENTRIES
+    try:
+        import database as db
+        session = db.SessionLocal()
+        try:
+            stats.update(db.get_gemini_cache_summary(session))
+        finally:
+            session.close()
+    except Exception as e:
+        logger.debug("Gemini 캐시 통계 조회 실패: %s", str(e)[:200])
+    return stats
+
+
+def _set_outcome(outcome: Optional[dict], status: str) -> None:
+    """생성 결과 상태 기록. 항상 None을 반환해 `return _set_outcome(...)`으로 실패 반환에 쓴다."""
+    if outcome is not None:
+        outcome["status"] = status
+    return None
+
+
+def _should_retry_after_error(error: Exception, attempt: int, model_name: str,
+                              allow_switch: bool = True) -> bool:
+    """생성 실패 처리: 모델 전환/429 cooldown 반영 후 재시도 여부 반환. 라우팅 호출은 allow_switch=False."""
+    if allow_switch and _is_model_unavailable_error(error):
+        switched = _switch_to_next_model()
+        logger.warning(
+            "Gemini 모델 사용 불가(%s). fallback 모델 전환=%s next=%s",
+            model_name, switched, _model_name or "none",
+        )
+        if switched:
+            return True
+
+    if _is_rate_limit_error(error):
+        _mark_rate_cooldown()
+        logger.warning(
+            "Gemini rate-limit 감지(429/쿼터). cooldown=%ss attempt=%s",
+            GEMINI_COOLDOWN_SEC, attempt + 1,
+        )
+        if attempt == 0:
+            return True
+
+    logger.warning("Gemini API 호출 실패: %s", str(error)[:200])
+    return False
+
+
+def _generate_text_with_gemini(prompt: str, generation_config: dict, **kwargs) -> Optional[str]:
+    """_agenerate_text_with_gemini의 동기 래퍼. 인자는 동일."""
+    return _run_sync(_agenerate_text_with_gemini(prompt, generation_config, **kwargs))
+
+
+async def _agenerate_text_with_gemini(
     prompt: str,
     generation_config: dict,
     max_attempts: int = 3,
     allow_wait: bool = True,
+    template: Optional[str] = None,
+    lane: str = LANE_BACKGROUND,
+    model_name: Optional[str] = None,
+    validate: Callable[[str], bool] = None,
+    outcome: Optional[dict] = None,
 ) -> Optional[str]:
+    """
+    rate-limit 대기는 asyncio.sleep, 생성은 generate_content_async(없으면 스레드)로 수행.
+    template(PROMPT_TEMPLATE_VERSIONS 키)을 주면 응답 캐시를 먼저 조회하고, 적중 시 쿼터를 쓰지 않는다.
+    lane: LANE_INTERACTIVE(대시보드/사용자 요청)는 예약 슬롯을 쓸 수 있고, LANE_BACKGROUND는 남는 슬롯만 쓴다.
+    model_name: 지정 시 해당 모델만 사용 (라우팅). 미지정이면 우선순위 failover 모델.
+    validate: 응답 텍스트 검증 함수. 통과한 응답만 캐시에 저장하며, 없으면 캐시에 저장하지 않는다.
+    outcome: dict를 넘기면 outcome["status"]에 결과 기록 (라우팅 판단용)
+        ok / disabled / no_slot / rate_limited / model_unavailable / error
+    """
+    if _get_model() is None:
+        return _set_outcome(outcome, "disabled")
+    # 캐시 DB 조회/저장은 SQLite 동기 I/O라 스레드에서 실행 (이벤트 루프 비차단)
+    cached = await asyncio.to_thread(
+        _cache_lookup, template, prompt, generation_config, model_name=model_name, validate=validate,
+    )
+    if cached:
+        _set_outcome(outcome, "ok")
+        return cached
+
     for attempt in range(max_attempts):
-        if not _acquire_request_slot(allow_wait=allow_wait):
-            return None
+        if not await _aacquire_request_slot(allow_wait=allow_wait, lane=lane):
+            return _set_outcome(outcome, "no_slot")
 
-        model = _get_model()
+        model = _get_named_model(model_name) if model_name else _get_model()
         if model is None:
-            return None
-        current_model_name = _model_name or "unknown"
+            return _set_outcome(outcome, "model_unavailable")
+        current_model_name = model_name or _model_name or "unknown"
 
+        started = time.monotonic()
         try:
-            response = model.generate_content(prompt, generation_config=generation_config)
-            return (response.text or "").strip()
-        except Exception as e:
-            if _is_model_unavailable_error(e):
-                switched = _switch_to_next_model()
-                logger.warning(
-                    "Gemini 모델 사용 불가(%s). fallback 모델 전환=%s next=%s",
-                    current_model_name, switched, _model_name or "none",
-                )
-                if switched:
-                    continue
-
-            if _is_rate_limit_error(e):
-                _mark_rate_cooldown()
-                logger.warning(
-                    "Gemini rate-limit 감지(429/쿼터). cooldown=%ss attempt=%s",
-                    GEMINI_COOLDOWN_SEC, attempt + 1,
+            if hasattr(model, "generate_content_async") and not _sync_bridge.get():
+                response = await model.generate_content_async(prompt, generation_config=generation_config)
+            else:
+                response = await asyncio.to_thread(
+                    model.generate_content, prompt, generation_config=generation_config,
                 )
-                if attempt == 0:
-                    continue
-
-            logger.warning("Gemini API 호출 실패: %s", str(e)[:200])
-            return None
+            text = (response.text or "").strip()
+            _record_model_call(current_model_name, (time.monotonic() - started) * 1000, ok=True)
+            await asyncio.to_thread(
+                _cache_store, template, prompt, generation_config, current_model_name, text, validate=validate,
+            )
+            _set_outcome(outcome, "ok")
+            return text
+        except Exception as e:
+            _record_model_call(current_model_name, (time.monotonic() - started) * 1000, ok=False)
+            if model_name and _is_model_unavailable_error(e):
+                # 라우팅 호출: 전역 failover 대신 호출자(_arouted_generate)가 다음 후보로 넘어간다
+                logger.warning("Gemini 모델 사용 불가(%s): %s", model_name, str(e)[:200])
+                return _set_outcome(outcome, "model_unavailable")
+            if _should_retry_after_error(e, attempt, current_model_name, allow_switch=model_name is None):
+                continue
+            return _set_outcome(outcome, "rate_limited" if _is_rate_limit_error(e) else "error")
 
-    return None
+    return _set_outcome(outcome, "rate_limited")
 
 
 SYSTEM_PROMPT = """
@@ -261,33 +691,171 @@ SYSTEM_PROMPT = """
 """
 
 
-def enrich_with_gemini(extracted: dict, company: str = "") -> Optional[dict]:
-    """
-    Playwright 추출 결과를 Gemini에 보내 AI 인사이트를 얻는다.
+_ENRICH_GENERATION_CONFIG = {
+    "temperature": 0.25,
+    "top_p": 0.85,
+    "max_output_tokens": 2048,
+}
 
-    Args:
-        extracted: detail_extractor.extract_from_url() 반환값
-        company: 카드사명
 
-    Returns:
-        dict with keys from SYSTEM_PROMPT, or None if API unavailable
+# ---------------------------------------------------------------------------
+# 프롬프트 압축: 섹션/원문 중복 제거 + 마케팅 신호 순 선별 (토큰 예산 내)
+# ---------------------------------------------------------------------------
+
+# 이벤트 1건의 섹션+원문 영역에 쓸 입력 토큰 예산 (구조화 요약 헤더 제외)
+GEMINI_PROMPT_CONTEXT_TOKENS = max(200, int(os.getenv("GEMINI_PROMPT_CONTEXT_TOKENS", "900")))
+_NEAR_DUP_THRESHOLD = 0.8
+_MIN_LINE_LEN = 6
+
+_SIGNAL_PATTERNS = (
+    (re.compile(r"\d[\d,]*(?:\.\d+)?\s*(?:만\s*원|천\s*원|원|만\s*포인트|포인트|P\b|마일)"), 3.0),  # 금액/포인트
+    (re.compile(r"\d+(?:\.\d+)?\s*%"), 3.0),                                               # 비율
+    (re.compile(r"\d{2,4}[./-]\s*\d{1,2}[./-]\s*\d{1,2}|\d{1,2}월\s*\d{1,2}일|~"), 2.0),      # 기간
+    (re.compile(r"최대|최소|이상|이하|한도|선착순|\d+\s*(?:명|회|건|개월)"), 1.5),                # 조건/수량
+    (re.compile(r"캐시백|할인|적립|무이자|청구|경품|쿠폰|증정|리워드|혜택"), 1.5),                   # 혜택
+    (re.compile(r"대상|고객|회원|신규|기존|VIP|\d0대|전연령|법인|개인"), 1.0),                      # 타겟
+)
+
+_compaction_stats = {"calls": 0, "tokens_before": 0, "tokens_after": 0}
+
+
+def _dedup_key(line: str) -> str:
+    return re.sub(r"[\s\W_]+", "", line).lower()
+
+
+def _ngrams(key: str, n: int = 3) -> set:
+    return {key[i:i + n] for i in range(max(1, len(key) - n + 1))}
+
+
+def _is_near_duplicate(key: str, grams: set, kept: list) -> bool:
+    for other_key, other_grams in kept:
+        if key == other_key:
+            return True
+        shorter, longer = (key, other_key) if len(key) <= len(other_key) else (other_key, key)
+        if len(shorter) >= 10 and shorter in longer:
+            return True
+        if grams and other_grams:
+            overlap = len(grams & other_grams) / min(len(grams), len(other_grams))
+            if overlap >= _NEAR_DUP_THRESHOLD:
+                return True
+    return False
+
+
+def _marketing_signal(line: str) -> float:
+    score = 0.0
+    for pattern, weight in _SIGNAL_PATTERNS:
+        if pattern.search(line):
+            score += weight
+    return score
+
+
+def _candidate_lines(extracted: dict) -> list:
+    """(라벨, 문장) 목록. 섹션 항목이 먼저, 원문 줄이 뒤 (동점이면 섹션 우선)."""
+    lines = []
+    mc = extracted.get("marketing_content") or {}
+    if isinstance(mc, dict):
+        for key, items in mc.items():
+            if isinstance(items, list):
+                for item in items:
+                    text = " ".join(str(item).split())[:300]
+                    if len(text) >= _MIN_LINE_LEN:
+                        lines.append((key, text))
+    for raw_line in re.split(r"[\r\n]+|(?<=[.!?다])\s+(?=\S)", extracted.get("raw_text") or ""):
+        text = " ".join(raw_line.split())[:300]
+        if len(text) >= _MIN_LINE_LEN:
+            lines.append(("", text))
+    return lines
+
+
+def compact_event_context(extracted: dict, budget_tokens: int = None) -> tuple:
     """
-    title = extracted.get("title", "")
-    period = extracted.get("period", "")
-    benefit = extracted.get("benefit_value", "")
-    conditions = extracted.get("conditions", "")
-    target = extracted.get("target_segment", "")
-    mc = extracted.get("marketing_content", {})
-    raw = extracted.get("raw_text", "")
+    섹션 항목과 원문 줄을 합쳐 near-duplicate 제거 -> 마케팅 신호 점수순 선별 -> 원래 순서로 출력.
+    구조화 요약(제목/기간/혜택/조건/대상)과 겹치는 줄도 제외한다.
+    반환: (압축 텍스트, {"tokens_before", "tokens_after", "lines_in", "lines_kept"})
+    tokens_before는 압축 전 방식(섹션 20줄 + 원문 2500자) 기준 추정치.
+    """
+    budget_tokens = budget_tokens or GEMINI_PROMPT_CONTEXT_TOKENS
+    kept = [
+        (key, _ngrams(key)) for key in (
+            _dedup_key(str(extracted.get(f) or ""))
+            for f in ("title", "period", "benefit_value", "conditions", "target_segment")
+        ) if len(key) >= _MIN_LINE_LEN
+    ]
+
+    unique = []
+    candidates = _candidate_lines(extracted)
+    for order, (label, text) in enumerate(candidates):
+        key = _dedup_key(text)
+        if len(key) < _MIN_LINE_LEN:
+            continue
+        grams = _ngrams(key)
+        if _is_near_duplicate(key, grams, kept):
+            continue
+        kept.append((key, grams))
+        unique.append((order, label, text))
+
+    ranked = sorted(unique, key=lambda x: (-(_marketing_signal(x[2]) + (0.5 if x[1] else 0.0)), x[0]))
+    selected, used = [], 0
+    for order, label, text in ranked:
+        line = f"[{label}] {text}" if label else f"- {text}"
+        cost = estimate_tokens(line)
+        if used + cost > budget_tokens:
+            continue
+        selected.append((order, line))
+        used += cost
+    body = "\n".join(line for _, line in sorted(selected))
+
+    stats = {
+        "tokens_before": estimate_tokens(_legacy_context(extracted)),
+        "tokens_after": estimate_tokens(body),
+        "lines_in": len(candidates),
+        "lines_kept": len(selected),
+    }
+    return body, stats
 
-    # 마케팅 내용 섹션 요약
+
+def _legacy_context(extracted: dict) -> str:
+    """압축 전 방식의 섹션 20줄 + 원문 2500자 (절감량 비교 기준)."""
+    mc = extracted.get("marketing_content") or {}
     mc_lines = []
     if isinstance(mc, dict):
         for key, items in mc.items():
             if isinstance(items, list) and items:
                 mc_lines.append(f"[{key}] " + " / ".join(str(i)[:200] for i in items[:5]))
+    return "\n".join(mc_lines[:20]) + "\n" + (extracted.get("raw_text") or "")[:2500]
+
+
+def _record_compaction(stats: dict) -> None:
+    with _cache_stats_lock:
+        _compaction_stats["calls"] += 1
+        _compaction_stats["tokens_before"] += stats["tokens_before"]
+        _compaction_stats["tokens_after"] += stats["tokens_after"]
+
+
+def get_prompt_compaction_stats() -> dict:
+    with _cache_stats_lock:
+        stats = dict(_compaction_stats)
+    stats["tokens_saved"] = stats["tokens_before"] - stats["tokens_after"]
+    stats["avg_saved_per_call"] = round(stats["tokens_saved"] / stats["calls"], 1) if stats["calls"] else 0.0
+    stats["budget_tokens"] = GEMINI_PROMPT_CONTEXT_TOKENS
+    return stats
+
+
+def _build_enrich_event_block(extracted: dict, company: str = "", stats: dict = None) -> str:
+    """
+    이벤트 1건의 구조화 요약 + 압축된 핵심 콘텐츠 (단건/배치 프롬프트 공용).
+    stats(dict)를 넘기면 compact_event_context의 토큰 통계를 채워준다.
+    """
+    title = extracted.get("title", "")
+    period = extracted.get("period", "")
+    benefit = extracted.get("benefit_value", "")
+    conditions = extracted.get("conditions", "")
+    target = extracted.get("target_segment", "")
+    context, compaction = compact_event_context(extracted)
+    if stats is not None:
+        stats.update(compaction)
 
-    user_prompt = f"""
+    return f"""
 === 이벤트 핵심 요약 (구조화 추출 데이터) ===
 - 카드사: {company}
 - 이벤트명: {title}
@@ -296,37 +864,360 @@ def enrich_with_gemini(extracted: dict, company: str = "") -> Optional[dict]:
 - 주요 혜택: {benefit[:600] if benefit else '미추출'}
 - 참여 조건: {conditions[:500] if conditions else '미추출'}
 
-=== 추출된 마케팅 콘텐츠 (섹션별) ===
-{chr(10).join(mc_lines[:20]) if mc_lines else '(섹션 데이터 없음)'}
-
-=== 이벤트 페이지 원문 발췌 ===
-{raw[:2500]}
-
-위 구조화 요약과 원문을 모두 참고하여 분석하세요. 특히 '기간/대상/혜택/조건'에서 구체적 숫자와 금액을 최대한 반영하세요.
+=== 핵심 콘텐츠 (섹션+원문, 중복 제거 후 마케팅 신호순 선별) ===
+{context if context else '(추출 콘텐츠 없음)'}
 """
 
-    text = _generate_text_with_gemini(
-        f"{SYSTEM_PROMPT}\n\n{user_prompt}",
-        generation_config={
-            "temperature": 0.25,
-            "top_p": 0.85,
-            "max_output_tokens": 2048,
-        },
-        max_attempts=3,
-        allow_wait=True,
+
+def _build_enrich_prompt(extracted: dict, company: str = "") -> str:
+    stats = {}
+    block = _build_enrich_event_block(extracted, company, stats=stats)
+    _record_compaction(stats)
+    logger.info(
+        "Gemini 프롬프트 압축: %s -> %s tokens (절감 %s, %s/%s줄)",
+        stats["tokens_before"], stats["tokens_after"], stats["tokens_before"] - stats["tokens_after"],
+        stats["lines_kept"], stats["lines_in"],
     )
+    user_prompt = (
+        block
+        + "\n위 구조화 요약과 원문을 모두 참고하여 분석하세요. "
+        "특히 '기간/대상/혜택/조건'에서 구체적 숫자와 금액을 최대한 반영하세요.\n"
+    )
+    return f"{SYSTEM_PROMPT}\n\n{user_prompt}"
+
+
+def _valid_enrich_text(text: str) -> bool:
+    return _is_valid_enrich_item(_loads_json(text))
+
+
+def _parse_enrich_response(text: Optional[str], title: str = "") -> Optional[dict]:
     if not text:
         return None
-
     try:
         result = json.loads(_extract_json_text(text))
-        logger.info("Gemini 인사이트 생성 완료: %s", title[:40])
+        logger.info("Gemini 인사이트 생성 완료: %s", (title or "")[:40])
         return result
     except Exception:
         logger.warning("Gemini 응답 JSON 파싱 실패: %s", text[:200])
         return None
 
 
+# ---------------------------------------------------------------------------
+# 모델 라우팅 (cascade): 저렴한 모델 우선, 필요할 때만 상위 모델로 에스컬레이션
+# ---------------------------------------------------------------------------
+
+_THREAT_LEVELS = ("High", "Mid", "Low")
+_BENEFIT_RANK = {"낮음": 1, "보통": 2, "중상": 3, "높음": 4}
+# 비어 있으면 상위 모델로 재분석할 서술 필드
+_ENRICH_KEY_FIELDS = ("threat_reason", "benefit_detail", "target_profile", "conditions_summary")
+
+
+def _routing_enabled() -> bool:
+    return GEMINI_ROUTING_MODE == "cascade" and len(_MODEL_CANDIDATES) > 1
+
+
+def _route_candidates(after: Optional[str] = None) -> list:
+    """
+    라우팅 후보 (우선순위 순, 사용 불가 판정 모델 제외).
+    after를 주면 에스컬레이션용: 그 모델보다 뒤에 있는 마지막 후보(상위 모델)만.
+    """
+    if after is None:
+        return [m for m in _MODEL_CANDIDATES if m not in _unavailable_models]
+    stronger = _MODEL_CANDIDATES[-1]
+    if after == stronger or stronger in _unavailable_models:
+        return []
+    return [stronger]
+
+
+# 이 상태가 아닌 생성 실패(슬롯/쿼터 부족, 모든 후보 사용 불가)는 에스컬레이션하지 않는다 (상위 모델도 같은 쿼터를 쓴다)
+_ROUTE_OK = "ok"
+
+
+async def _arouted_generate(prompt: str, models: list, **kwargs) -> tuple:
+    """
+    models를 순서대로 시도하되 사용 불가(404/폐기) 모델은 기록 후 다음 후보로 failover.
+    (text, status, 사용 모델) 반환. status는 _agenerate_text_with_gemini의 outcome.
+    """
+    for name in models:
+        outcome = {}
+        text = await _agenerate_text_with_gemini(prompt, model_name=name, outcome=outcome, **kwargs)
+        status = outcome.get("status", "error")
+        if status != "model_unavailable":
+            return text, status, name
+        _unavailable_models.add(name)
+    return None, "model_unavailable", None
+
+
+def _record_no_response(status: str) -> None:
+    with _rate_lock:
+        _routing_stats["no_response"] = _routing_stats.get("no_response", 0) + 1
+    logger.info("Gemini 라우팅 응답 없음(%s): 에스컬레이션 생략", status)
+
+
+def _rule_hint(extracted: dict) -> Optional[dict]:
+    try:
+        from modules.insights import generate_rule_insight
+        return generate_rule_insight(extracted)
+    except Exception:
+        return None
+
+
+def _disagrees_with_rule(result: dict, rule: dict) -> bool:
+    """
+    혜택 수준이 2단계 이상 차이나거나, 위협도가 rule 혜택 수준과 정반대면 큰 불일치.
+    (rule 엔진은 threat_level을 만들지 않으므로 혜택 수준만 기준으로 삼는다)
+    """
+    ai_rank = _BENEFIT_RANK.get(str(result.get("benefit_level") or "").strip())
+    rule_rank = _BENEFIT_RANK.get(str(rule.get("benefit_level") or "").strip())
+    if ai_rank and rule_rank and abs(ai_rank - rule_rank) >= 2:
+        return True
+    threat = str(result.get("threat_level") or "").strip().capitalize()
+    return bool(rule_rank) and ((threat == "High" and rule_rank == 1) or (threat == "Low" and rule_rank == 4))
+
+
+def _escalation_reason(result, rule_hint: Optional[dict] = None) -> Optional[str]:
+    """상위 모델 재분석 사유 (schema / empty_fields / rule_disagreement) 또는 None."""
+    if not _is_valid_enrich_item(result):
+        return "schema"
+    if any(not str(result.get(k) or "").strip() for k in _ENRICH_KEY_FIELDS):
+        return "empty_fields"
+    if rule_hint and _disagrees_with_rule(result, rule_hint):
+        return "rule_disagreement"
+    return None
+
+
+def _record_route(reason: Optional[str]) -> None:
+    with _rate_lock:
+        _routing_stats["routed"] += 1
+        if reason:
+            _routing_stats["escalated"] += 1
+            _routing_stats["reasons"][reason] = _routing_stats["reasons"].get(reason, 0) + 1
+
+
+def _pick_routed(first, second):
+    """상위 모델 결과가 스키마를 통과하면 채택, 아니면 1차 결과(스키마 통과 시)."""
+    if _is_valid_enrich_item(second):
+        return second
+    return first if _is_valid_enrich_item(first) else None
+
+
+def enrich_with_gemini(extracted: dict, company: str = "", lane: str = LANE_BACKGROUND) -> Optional[dict]:
+    """aenrich_with_gemini의 동기 래퍼 (하위호환)."""
+    return _run_sync(aenrich_with_gemini(extracted, company=company, lane=lane))
+
+
+async def aenrich_with_gemini(extracted: dict, company: str = "", lane: str = LANE_BACKGROUND) -> Optional[dict]:
+    """
+    Playwright 추출 결과를 Gemini에 보내 AI 인사이트를 얻는다.
+    rate-limit 대기 중에도 이벤트 루프를 막지 않는다.
+    GEMINI_ROUTING_MODE=cascade면 1차 모델 결과를 검증해 필요 시 상위 모델로 재분석.
+
+    Args:
+        extracted: detail_extractor.extract_from_url() 반환값
+        company: 카드사명
+
+    Returns:
+        dict with keys from SYSTEM_PROMPT, or None if API unavailable
+    """
+    prompt = _build_enrich_prompt(extracted, company)
+    title = extracted.get("title", "")
+    kwargs = dict(generation_config=_ENRICH_GENERATION_CONFIG, template="enrich",
+                  max_attempts=3, allow_wait=True, lane=lane, validate=_valid_enrich_text)
+    if not _routing_enabled():
+        return _parse_enrich_response(await _agenerate_text_with_gemini(prompt, **kwargs), title)
+
+    text, status, used = await _arouted_generate(prompt, _route_candidates(), **kwargs)
+    if status != _ROUTE_OK:
+        _record_no_response(status)
+        return None
+    first = _parse_enrich_response(text, title)
+    reason = _escalation_reason(first, _rule_hint(extracted))
+    _record_route(reason)
+    stronger = _route_candidates(after=used)
+    if reason is None or not stronger:
+        return None if reason == "schema" else first
+    logger.info("Gemini 에스컬레이션(%s): %s -> %s %s", reason, used, stronger[0], title[:40])
+    text, _status, _used = await _arouted_generate(prompt, stronger, **kwargs)
+    return _pick_routed(first, _parse_enrich_response(text, title))
+
+
+# ---------------------------------------------------------------------------
+# 배치 인사이트: 여러 이벤트를 한 요청으로 분석 (RPM 절약)
+# ---------------------------------------------------------------------------
+
+# 배치 1건당 입력 토큰 예산 / 최대 이벤트 수. 출력은 이벤트당 _BATCH_OUTPUT_TOKENS_PER_ITEM 기준.
+GEMINI_BATCH_TOKEN_BUDGET = max(1000, int(os.getenv("GEMINI_BATCH_TOKEN_BUDGET", "12000")))
+GEMINI_BATCH_MAX_ITEMS = max(1, int(os.getenv("GEMINI_BATCH_MAX_ITEMS", "5")))
+_BATCH_OUTPUT_TOKENS_PER_ITEM = 1536
+_BATCH_MAX_OUTPUT_TOKENS = 8192
+_ENRICH_REQUIRED_KEYS = ("one_line_summary", "category", "threat_level", "benefit_level")
+
+BATCH_INSTRUCTION = """
+[배치 모드]
+아래에 여러 이벤트가 "### event_id=<번호>" 구분자로 주어집니다.
+이벤트마다 위 JSON 객체를 하나씩 만들고, 각 객체에 "event_id"(구분자의 번호, 정수)를 추가하세요.
+응답은 JSON 배열 [ {...}, {...} ] 하나만 출력하세요. 이벤트끼리 내용을 섞지 말고 각자 독립적으로 분석하세요.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적 토큰 수 추정 (한글 위주 텍스트 기준 2자 ≈ 1토큰). 배치 크기 산정용."""
+    return len(text or "") // 2 + 1
+
+
+def estimate_enrich_tokens(extracted: dict, company: str = "") -> int:
+    """배치 프롬프트에 이 이벤트 1건이 차지하는 입력 토큰 추정치."""
+    return estimate_tokens(_build_enrich_event_block(extracted, company)) + 16
+
+
+def _build_enrich_batch_prompt(items: list) -> str:
+    blocks = []
+    before = after = 0
+    for event_id, extracted, company in items:
+        stats = {}
+        blocks.append(f"### event_id={event_id}\n{_build_enrich_event_block(extracted, company, stats=stats)}")
+        _record_compaction(stats)
+        before += stats["tokens_before"]
+        after += stats["tokens_after"]
+    logger.info("Gemini 배치 프롬프트 압축: %s건 %s -> %s tokens (절감 %s)", len(items), before, after, before - after)
+    return f"{SYSTEM_PROMPT}\n{BATCH_INSTRUCTION}\n" + "\n".join(blocks)
+
+
+def _batch_generation_config(count: int) -> dict:
+    config = dict(_ENRICH_GENERATION_CONFIG)
+    config["max_output_tokens"] = min(_BATCH_MAX_OUTPUT_TOKENS, _BATCH_OUTPUT_TOKENS_PER_ITEM * max(1, count))
+    return config
+
+
+def _iter_json_objects(text: str):
+    """
+    JSON 배열 텍스트에서 최상위 객체를 하나씩 디코딩.
+    중간 객체가 깨졌거나 출력이 잘려도 나머지 객체는 살린다.
+    """
+    decoder = json.JSONDecoder()
+    start = text.find("[")
+    pos = start + 1 if start != -1 else 0
+    while True:
+        pos = text.find("{", pos)
+        if pos == -1:
+            return
+        try:
+            obj, end = decoder.raw_decode(text, pos)
+        except ValueError:
+            pos += 1
+            continue
+        yield obj
+        pos = end
+
+
+def _is_valid_enrich_item(obj) -> bool:
+    """필수 필드 존재 + 위협도/혜택 수준이 스키마 값 범위 안인지."""
+    if not isinstance(obj, dict):
+        return False
+    if not all(str(obj.get(k) or "").strip() for k in _ENRICH_REQUIRED_KEYS):
+        return False
+    return (str(obj["threat_level"]).strip().capitalize() in _THREAT_LEVELS
+            and str(obj["benefit_level"]).strip() in _BENEFIT_RANK)
+
+
+def _parse_enrich_batch_response(text: Optional[str], event_ids: list) -> dict:
+    """배치 응답 -> {event_id: dict|None}. 원소별로 검증해 실패한 이벤트만 None."""
+    results = {event_id: None for event_id in event_ids}
+    if not text:
+        return results
+    for obj in _iter_json_objects(text):
+        if not isinstance(obj, dict):
+            continue
+        try:
+            event_id = int(obj.get("event_id"))
+        except (TypeError, ValueError):
+            continue
+        if event_id not in results or results[event_id] is not None:
+            continue
+        if _is_valid_enrich_item(obj):
+            results[event_id] = obj
+    missing = [k for k, v in results.items() if v is None]
+    if missing:
+        logger.warning("Gemini 배치 응답 중 %s/%s건 검증 실패: %s", len(missing), len(results), missing[:10])
+    else:
+        logger.info("Gemini 배치 인사이트 생성 완료: %s건", len(results))
+    return results
+
+
+def _batch_validator(event_ids: list) -> Callable[[str], bool]:
+    """배치 응답 캐시 검증: 요청한 이벤트 전부가 스키마를 통과해야 저장."""
+    wanted = set(event_ids)
+
+    def _validate(text: str) -> bool:
+        valid = set()
+        for obj in _iter_json_objects(text or ""):
+            if isinstance(obj, dict) and _is_valid_enrich_item(obj):
+                try:
+                    valid.add(int(obj.get("event_id")))
+                except (TypeError, ValueError):
+                    continue
+        return wanted <= valid
+
+    return _validate
+
+
+def _batch_escalations(items: list, first: dict) -> list:
+    """1차 배치 결과 중 상위 모델로 재분석할 항목."""
+    escalate = []
+    for item in items:
+        event_id, extracted, _company = item
+        reason = _escalation_reason(first.get(event_id), _rule_hint(extracted))
+        _record_route(reason)
+        if reason:
+            escalate.append(item)
+    return escalate
+
+
+async def aenrich_batch_with_gemini(items: list) -> dict:
+    """
+    여러 이벤트를 한 요청으로 분석.
+    cascade 라우팅이면 1차 모델로 배치 분석 후, 에스컬레이션 대상만 모아 상위 모델로 다시 배치 분석.
+
+    Args:
+        items: [(event_id, extracted, company), ...]
+
+    Returns:
+        {event_id: dict(SYSTEM_PROMPT 스키마 + event_id) 또는 None}. None인 건은 caller가 rule fallback.
+    """
+    if not items:
+        return {}
+    event_ids = [event_id for event_id, _, _ in items]
+    kwargs = dict(template="enrich_batch", max_attempts=3, allow_wait=True, validate=_batch_validator(event_ids))
+    if not _routing_enabled():
+        text = await _agenerate_text_with_gemini(
+            _build_enrich_batch_prompt(items), generation_config=_batch_generation_config(len(items)), **kwargs,
+        )
+        return _parse_enrich_batch_response(text, event_ids)
+
+    text, status, used = await _arouted_generate(
+        _build_enrich_batch_prompt(items), _route_candidates(),
+        generation_config=_batch_generation_config(len(items)), **kwargs,
+    )
+    if status != _ROUTE_OK:
+        _record_no_response(status)
+        return {event_id: None for event_id in event_ids}
+    results = _parse_enrich_batch_response(text, event_ids)
+    escalate = _batch_escalations(items, results)
+    stronger = _route_candidates(after=used)
+    if escalate and stronger:
+        logger.info("Gemini 배치 에스컬레이션: %s/%s건 %s -> %s", len(escalate), len(items), used, stronger[0])
+        escalate_ids = [event_id for event_id, _, _ in escalate]
+        text, _status, _used = await _arouted_generate(
+            _build_enrich_batch_prompt(escalate), stronger,
+            generation_config=_batch_generation_config(len(escalate)),
+            **{**kwargs, "validate": _batch_validator(escalate_ids)},
+        )
+        second = _parse_enrich_batch_response(text, escalate_ids)
+        for event_id, _, _ in escalate:
+            results[event_id] = _pick_routed(results.get(event_id), second.get(event_id))
+    return results
+
+
 COMPANY_BRIEF_PROMPT = """
 당신은 신한카드 마케팅팀의 경쟁사 분석 전문가다.
 입력된 카드사의 현재 이벤트 현황 스냅샷을 분석하고, 신한카드 마케터가 즉시 활용할 수 있는 전략 브리핑을 작성하라.
@@ -346,6 +1237,11 @@ COMPANY_BRIEF_PROMPT = """
 
 
 def summarize_company_status(company: str, snapshot: dict) -> Optional[dict]:
+    """asummarize_company_status의 동기 래퍼 (하위호환)."""
+    return _run_sync(asummarize_company_status(company, snapshot))
+
+
+async def asummarize_company_status(company: str, snapshot: dict) -> Optional[dict]:
     """
     메인 대시보드용 카드사 상태 개요를 Gemini로 생성.
     대시보드 체감 성능을 위해 allow_wait=False로 동작하며,
@@ -354,17 +1250,31 @@ def summarize_company_status(company: str, snapshot: dict) -> Optional[dict]:
     if not snapshot:
         return None
 
-    payload = json.dumps(snapshot, ensure_ascii=False)
-    text = _generate_text_with_gemini(
-        f"{COMPANY_BRIEF_PROMPT}\n\n[회사명]\n{company}\n\n[스냅샷]\n{payload}",
-        generation_config={
-            "temperature": 0.25,
-            "top_p": 0.85,
-            "max_output_tokens": 1024,
-        },
+    text = await _agenerate_text_with_gemini(
+        _build_company_brief_prompt(company, snapshot),
+        generation_config=_BRIEF_GENERATION_CONFIG,
+        template="company_brief",
+        validate=_valid_company_brief_text,
         max_attempts=2,
         allow_wait=False,
+        lane=LANE_INTERACTIVE,
     )
+    return _parse_company_brief(text)
+
+
+_BRIEF_GENERATION_CONFIG = {
+    "temperature": 0.25,
+    "top_p": 0.85,
+    "max_output_tokens": 1024,
+}
+
+
+def _build_company_brief_prompt(company: str, snapshot: dict) -> str:
+    payload = json.dumps(snapshot, ensure_ascii=False)
+    return f"{COMPANY_BRIEF_PROMPT}\n\n[회사명]\n{company}\n\n[스냅샷]\n{payload}"
+
+
+def _parse_company_brief(text: Optional[str]) -> Optional[dict]:
     if not text:
         return None
 
@@ -399,6 +1309,10 @@ def summarize_company_status(company: str, snapshot: dict) -> Optional[dict]:
     }
 
 
+def _valid_company_brief_text(text: str) -> bool:
+    return _parse_company_brief(text) is not None
+
+
 QUAL_COMPARISON_PROMPT = """
 당신은 카드사 마케팅 분석가다.
 입력된 카드사별 스냅샷으로 4개 고정 지표의 비교표를 만든다.
@@ -444,6 +1358,11 @@ QUAL_COMPARISON_PROMPT = """
 
 
 def infer_qualitative_comparison(company_snapshots: list) -> Optional[dict]:
+    """ainfer_qualitative_comparison의 동기 래퍼 (하위호환)."""
+    return _run_sync(ainfer_qualitative_comparison(company_snapshots))
+
+
+async def ainfer_qualitative_comparison(company_snapshots: list) -> Optional[dict]:
     """
     카드사 간 정성+정량 비교표를 Gemini로 생성.
     대시보드 응답성을 위해 allow_wait=False로 동작.
@@ -451,17 +1370,35 @@ def infer_qualitative_comparison(company_snapshots: list) -> Optional[dict]:
     if not isinstance(company_snapshots, list) or not company_snapshots:
         return None
 
-    payload = json.dumps(company_snapshots, ensure_ascii=False)
-    text = _generate_text_with_gemini(
-        f"{QUAL_COMPARISON_PROMPT}\n\n[입력 스냅샷]\n{payload}",
-        generation_config={
-            "temperature": 0.2,
-            "top_p": 0.8,
-            "max_output_tokens": 1024,
-        },
+    text = await _agenerate_text_with_gemini(
+        _build_qualitative_prompt(company_snapshots),
+        generation_config=_QUAL_GENERATION_CONFIG,
+        template="qualitative",
+        validate=_valid_qualitative_text,
         max_attempts=2,
         allow_wait=False,
+        lane=LANE_INTERACTIVE,
     )
+    return _parse_qualitative_comparison(text)
+
+
+_QUAL_GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "top_p": 0.8,
+    "max_output_tokens": 1024,
+}
+
+
+def _build_qualitative_prompt(company_snapshots: list) -> str:
+    payload = json.dumps(company_snapshots, ensure_ascii=False)
+    return f"{QUAL_COMPARISON_PROMPT}\n\n[입력 스냅샷]\n{payload}"
+
+
+def _valid_qualitative_text(text: str) -> bool:
+    return _parse_qualitative_comparison(text) is not None
+
+
+def _parse_qualitative_comparison(text: Optional[str]) -> Optional[dict]:
     if not text:
         return None
 
@@ -532,10 +1469,35 @@ JSON만 반환하세요.
 
 
 def compare_event_texts(company_texts: dict) -> Optional[dict]:
+    """acompare_event_texts의 동기 래퍼 (하위호환)."""
+    return _run_sync(acompare_event_texts(company_texts))
+
+
+async def acompare_event_texts(company_texts: dict) -> Optional[dict]:
     """
     카드사별 추출 텍스트를 Gemini로 비교 분석.
     company_texts: {"삼성카드": "텍스트...", "KB국민카드": "텍스트...", ...}
     """
+    prompt = _build_text_compare_prompt(company_texts)
+    if not prompt:
+        return None
+
+    raw = await _agenerate_text_with_gemini(
+        prompt,
+        generation_config=_TEXT_COMPARE_GENERATION_CONFIG,
+        template="text_compare",
+        validate=_valid_text_compare_text,
+        max_attempts=2,
+        allow_wait=True,
+        lane=LANE_INTERACTIVE,
+    )
+    return _parse_text_comparison(raw)
+
+
+_TEXT_COMPARE_GENERATION_CONFIG = {"temperature": 0.25, "top_p": 0.8, "max_output_tokens": 1024}
+
+
+def _build_text_compare_prompt(company_texts: dict) -> Optional[str]:
     if not GEMINI_API_KEY:
         return None
 
@@ -546,14 +1508,14 @@ def compare_event_texts(company_texts: dict) -> Optional[dict]:
     if len(text_block.strip()) < 50:
         return None
 
-    prompt = TEXT_COMPARE_PROMPT.replace("{text_block}", text_block)
+    return TEXT_COMPARE_PROMPT.replace("{text_block}", text_block)
 
-    raw = _generate_text_with_gemini(
-        prompt,
-        generation_config={"temperature": 0.25, "top_p": 0.8, "max_output_tokens": 1024},
-        max_attempts=2,
-        allow_wait=True,
-    )
+
+def _valid_text_compare_text(text: str) -> bool:
+    return isinstance(_loads_json(text), dict)
+
+
+def _parse_text_comparison(raw: Optional[str]) -> Optional[dict]:
     if not raw:
         return None
 
@@ -0,0 +1,351 @@
+"""
+공유 Chromium 브라우저 풀.
+URL마다 브라우저를 띄우지 않고, 하나의 브라우저 프로세스에서
+stealth가 적용된 context/page를 빌려주고 돌려받는다.
+- page는 N회 사용 후 또는 crash/예외 발생 시 폐기 후 재생성
+- 브라우저 연결이 끊기면 다음 acquire 시 자동 재기동
+- context마다 리소스 차단 프로필(이미지/미디어/폰트/분석 호스트) 적용, page별 트래픽 집계
+"""
+
+import asyncio
+import json
+import logging
+import os
+import weakref
+from contextlib import asynccontextmanager
+from typing import Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+)
+VIEWPORT = {"width": 1920, "height": 1080}
+
+BROWSER_POOL_SIZE = max(1, int(os.getenv("BROWSER_POOL_SIZE", "4")))
+BROWSER_PAGE_MAX_USES = max(1, int(os.getenv("BROWSER_PAGE_MAX_USES", "25")))
+
+# ---------------------------------------------------------------------------
+# 리소스 차단 프로필
+# ---------------------------------------------------------------------------
+
+BROWSER_BLOCK_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "1").strip().lower() not in ("0", "false", "no")
+BLOCK_RESOURCE_TYPES = frozenset(
+    t.strip() for t in os.getenv("BLOCK_RESOURCE_TYPES", "image,media,font").split(",") if t.strip()
+)
+BLOCK_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "googleadservices.com", "facebook.net", "connect.facebook.com", "analytics.tiktok.com",
+    "wcs.naver.net", "wcs.naver.com", "t1.daumcdn.net/kas", "analytics.kakao.com",
+    "criteo.com", "criteo.net", "adnxs.com", "scorecardresearch.com", "hotjar.com",
+    "clarity.ms", "mixpanel.com", "amplitude.com", "appsflyer.com", "adbrix.io",
+)
+# 페이지 도메인별 허용 목록: 리소스 타입("image") 또는 호스트 일부("static.kbcard.com")
+# 본문이 iframe/XHR/이미지로 그려지는 사이트만 등록. 예: BLOCK_ALLOWLIST='{"kbcard.com": ["image"]}'
+try:
+    BLOCK_ALLOWLIST = {k: tuple(v) for k, v in json.loads(os.getenv("BLOCK_ALLOWLIST", "") or "{}").items()}
+except (ValueError, AttributeError, TypeError):
+    logger.warning("BLOCK_ALLOWLIST 파싱 실패 — 빈 목록 사용")
+    BLOCK_ALLOWLIST = {}
+
+
+def _host_of(url: str) -> str:
+    try:
+        return (urlsplit(url or "").hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+def should_block(resource_type: str, request_url: str, page_url: str = "",
+                 block_types=None, block_hosts=None, allowlist=None) -> bool:
+    """요청 차단 여부. 페이지 도메인 허용 목록에 걸리면 타입/호스트와 무관하게 통과."""
+    block_types = BLOCK_RESOURCE_TYPES if block_types is None else block_types
+    block_hosts = BLOCK_HOSTS if block_hosts is None else block_hosts
+    allowlist = BLOCK_ALLOWLIST if allowlist is None else allowlist
+
+    page_host = _host_of(page_url)
+    lowered = (request_url or "").lower()
+    for domain, allowed in allowlist.items():
+        if page_host == domain or page_host.endswith("." + domain):
+            if resource_type in allowed or any(a in lowered for a in allowed if "." in a):
+                return False
+
+    if resource_type in block_types:
+        return True
+    req_host = _host_of(request_url)
+    for pattern in block_hosts:
+        host, _, path = pattern.partition("/")
+        if (req_host == host or req_host.endswith("." + host)) and (not path or f"/{path}" in lowered):
+            return True
+    return False
+
+
+class NetworkStats:
+    """
+    page 1회 사용(lease) 동안의 요청/차단/전송 바이트 집계.
+    바이트는 requestfinished 후 비동기로 합산되므로 읽기 전에 settle()로 대기한다.
+    """
+
+    SETTLE_TIMEOUT_SEC = 2.0
+
+    def __init__(self):
+        self._pending = set()
+        self.reset()
+
+    def reset(self):
+        # 이전 lease에서 끝나지 않은 합산은 다음 이벤트로 넘어가지 않도록 취소
+        for task in self._pending:
+            task.cancel()
+        self._pending = set()
+        self.requests = 0
+        self.blocked = 0
+        self.bytes = 0
+
+    def track(self, task) -> None:
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def settle(self, timeout: float = None) -> None:
+        """진행 중인 바이트 합산 task 완료 대기 (timeout 초과분은 집계에서 제외)."""
+        if self._pending:
+            await asyncio.wait(set(self._pending),
+                               timeout=self.SETTLE_TIMEOUT_SEC if timeout is None else timeout)
+
+    def as_dict(self) -> dict:
+        return {"requests": self.requests, "blocked": self.blocked, "bytes": self.bytes}
+
+
+_PAGE_STATS = weakref.WeakKeyDictionary()
+
+
+def page_network_stats(page) -> NetworkStats:
+    stats = _PAGE_STATS.get(page)
+    if stats is None:
+        stats = _PAGE_STATS[page] = NetworkStats()
+    return stats
+
+
+def _stats_for_request(request) -> Optional[NetworkStats]:
+    try:
+        return page_network_stats(request.frame.page)
+    except Exception:
+        return None
+
+
+async def _count_finished(request, stats: NetworkStats):
+    try:
+        sizes = await request.sizes()
+        stats.bytes += int(sizes.get("responseBodySize") or 0) + int(sizes.get("responseHeadersSize") or 0)
+    except Exception:
+        pass
+
+
+async def _route_request(route):
+    request = route.request
+    try:
+        page_url = request.frame.page.url
+    except Exception:
+        page_url = ""
+    stats = _stats_for_request(request)
+    if stats is not None:
+        stats.requests += 1
+    if should_block(request.resource_type, request.url, page_url):
+        if stats is not None:
+            stats.blocked += 1
+        await route.abort()
+        return
+    await route.continue_()
+
+
+async def install_resource_blocking(context):
+    """context 전체 요청에 차단 프로필 적용 + page별 전송 바이트 집계"""
+    def _on_finished(request):
+        stats = _stats_for_request(request)
+        if stats is not None:
+            stats.track(asyncio.ensure_future(_count_finished(request, stats)))
+
+    context.on("requestfinished", _on_finished)
+    await context.route("**/*", _route_request)
+
+
+async def new_stealth_context(browser, block_resources: bool = None):
+    """
+    stealth가 적용된 BrowserContext 생성. playwright_stealth 2.x만 사용(미설치 시 stealth 생략).
+    block_resources(None이면 BROWSER_BLOCK_RESOURCES)가 켜져 있으면 리소스 차단 프로필 적용.
+    """
+    try:
+        from playwright_stealth import Stealth
+    except ImportError:
+        Stealth = None
+
+    context = await browser.new_context(user_agent=USER_AGENT, viewport=VIEWPORT)
+    if Stealth is not None:
+        await Stealth().apply_stealth_async(context)
+    if BROWSER_BLOCK_RESOURCES if block_resources is None else block_resources:
+        await install_resource_blocking(context)
+    return context
+
+
+class _PageSlot:
+    """풀이 관리하는 context+page 한 쌍과 사용 횟수."""
+
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.broken = False
+        page.on("crash", lambda _page: self._mark_broken())
+
+    def _mark_broken(self):
+        self.broken = True
+
+    def reusable(self, max_uses: int) -> bool:
+        if self.broken or self.uses >= max_uses:
+            return False
+        try:
+            return not self.page.is_closed()
+        except Exception:
+            return False
+
+    async def close(self):
+        try:
+            await self.context.close()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """
+    장수(long-lived) 브라우저 풀.
+    사용:
+        async with pool.page() as page:
+            await page.goto(url)
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE, max_uses: int = BROWSER_PAGE_MAX_USES, headless: bool = True):
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.headless = headless
+        self._pw = None
+        self._browser = None
+        self._idle = []
+        self._slots = None
+        self._start_lock = None
+        self.stats = {"launches": 0, "pages_created": 0, "pages_recycled": 0, "pages_crashed": 0, "leases": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def start(self):
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        async with self._start_lock:
+            if self.running:
+                return self
+            await self._shutdown_browser()
+            from playwright.async_api import async_playwright
+            self._pw = await async_playwright().start()
+            self._browser = await self._pw.chromium.launch(headless=self.headless)
+            self.stats["launches"] += 1
+            logger.info("브라우저 풀 기동: size=%s max_uses=%s", self.size, self.max_uses)
+        return self
+
+    async def close(self):
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            await self._shutdown_browser()
+
+    async def _shutdown_browser(self):
+        idle, self._idle = self._idle, []
+        for slot in idle:
+            await slot.close()
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        if self._pw:
+            try:
+                await self._pw.stop()
+            except Exception:
+                pass
+        self._browser = None
+        self._pw = None
+
+    async def new_context(self):
+        """풀 브라우저에서 stealth context를 직접 생성 (호출자가 context.close() 책임)."""
+        await self.start()
+        return await new_stealth_context(self._browser)
+
+    async def _take_slot(self) -> _PageSlot:
+        while self._idle:
+            slot = self._idle.pop()
+            if slot.reusable(self.max_uses):
+                return slot
+            await slot.close()
+        context = await self.new_context()
+        page = await context.new_page()
+        self.stats["pages_created"] += 1
+        return _PageSlot(context, page)
+
+    async def _return_slot(self, slot: _PageSlot, failed: bool):
+        slot.uses += 1
+        if slot.broken:
+            self.stats["pages_crashed"] += 1
+        if failed or not self.running or not slot.reusable(self.max_uses):
+            self.stats["pages_recycled"] += 1
+            await slot.close()
+            return
+        self._idle.append(slot)
+
+    @asynccontextmanager
+    async def page(self):
+        """stealth 적용된 page를 빌려준다. 블록 안에서 예외가 나면 해당 page는 폐기."""
+        await self.start()
+        async with self._slots:
+            slot = await self._take_slot()
+            self.stats["leases"] += 1
+            page_network_stats(slot.page).reset()
+            failed = False
+            try:
+                yield slot.page
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                await self._return_slot(slot, failed)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+# ---------------------------------------------------------------------------
+# 프로세스 공유 풀 (파이프라인/라우트 공용)
+# ---------------------------------------------------------------------------
+
+_SHARED_POOL: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """공유 풀 반환. 브라우저는 첫 page() 호출 시 지연 기동."""
+    global _SHARED_POOL
+    if _SHARED_POOL is None:
+        _SHARED_POOL = BrowserPool()
+    return _SHARED_POOL
+
+
+async def close_browser_pool():
+    """공유 풀 종료 (앱 종료 시 호출)."""
+    global _SHARED_POOL
+    pool, _SHARED_POOL = _SHARED_POOL, None
+    if pool is not None:
+        await pool.close()
@@ -0,0 +1,69 @@
+"""
+데이터 버전 기반 분석 캐시.
+- 항목은 (키, 데이터 버전)으로 유효성 판단: 버전이 같으면 TTL 없이 계속 재사용,
+  이벤트/인사이트가 바뀌어 버전이 오르면 다음 조회 때 재계산
+- 최대 항목 수를 넘으면 가장 오래 안 쓴 항목부터 제거 (LRU)
+- hit/miss/stale/eviction 집계
+"""
+
+import os
+from collections import OrderedDict
+from threading import Lock
+
+ANALYTICS_CACHE_MAX_ENTRIES = max(1, int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "256")))
+
+
+class VersionedCache:
+    """
+    사용:
+        data = cache.get_or_build("strategy_map", version, lambda: build_strategy_map(session))
+    """
+
+    def __init__(self, max_entries: int = ANALYTICS_CACHE_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._entries = OrderedDict()  # key -> (version, value)
+        self._lock = Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+
+    def get(self, key, version):
+        """버전이 일치하는 값 또는 None. 버전이 다르면 stale로 집계하고 항목 제거."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self._stats["stale"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key, version, value) -> None:
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_or_build(self, key, version, builder):
+        value = self.get(key, version)
+        if value is None:
+            value = builder()
+            self.put(key, version, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
@@ -200,6 +200,18 @@ class BaseConnector(ABC):
             raw_text=clean_raw_text,
         )
 
+    def load_state(self, state: Optional[dict]) -> None:
+        """이전 수집 상태(DB connector_state) 주입. 증분 수집을 하지 않는 커넥터는 무시."""
+        self.state = dict(state or {})
+
+    def dump_state(self) -> Optional[dict]:
+        """crawl 후 저장할 상태. None이면 저장하지 않음."""
+        return None
+
+    def confirm_persisted(self, urls) -> None:
+        """crawl 결과가 DB에 커밋된 뒤 호출. urls: 저장(신규/기존)이 확인된 이벤트 URL."""
+        return None
+
     @abstractmethod
     async def crawl(self, page) -> List[RawEvent]:
         """
@@ -1,9 +1,12 @@
 """
-삼성카드 커넥터 — cms_id 순차 크롤링 방식
+삼성카드 커넥터 — cms_id 순차 탐색 방식 (page 풀 병렬 probe, 순서 보장 조기 종료)
+탐색 상태(frontier)는 connector_state에 저장되어 다음 수집은 새 ID 위주로만 탐색한다.
 """
 
 import asyncio
-from typing import List
+from collections import deque
+from datetime import datetime, timedelta
+from typing import List, Optional
 from bs4 import BeautifulSoup
 from .base import BaseConnector, RawEvent
 
@@ -13,58 +16,281 @@ class SamsungConnector(BaseConnector):
     list_url = "https://www.samsungcard.com/personal/event/ing/UHPPBE1403M0.jsp"
     BASE_DETAIL = "https://www.samsungcard.com/personal/event/ing/UHPPBE1403M0.jsp?cms_id="
 
-    # cms_id 탐색 범위 (2026년 기준)
+    # cms_id 탐색 범위 (2026년 기준). 병렬 탐색이라 창을 넓혀도 소요 시간은 거의 늘지 않는다.
+    # CMS_START/CMS_END는 저장된 frontier가 없을 때(최초 수집)만 사용한다.
     CMS_START = 3733000
-    CMS_END = 3740000
+    CMS_END = 3745000
     MAX_CONSECUTIVE_FAIL = 60
+    # 동시에 여는 page 수 / 앞서 예약해 두는 cms_id 수 (page 수의 배수)
+    PROBE_CONCURRENCY = 4
+    PROBE_LOOKAHEAD = 3
+    PROBE_SETTLE_SEC = 1.5
+    # 1차 HTTP probe (브라우저 렌더링 없이 정적 HTML 판정). 판정 불가 시에만 stealth page로 승격
+    HTTP_FAST_PATH = True
+    HTTP_TIMEOUT_MS = 8000
+    STATIC_MIN_TEXT_LEN = 200
+    # 증분 수집: frontier 이전 재확인 폭 / frontier 이후 최대 탐색 폭 / 기존 유효 ID 재확인 주기
+    LOOKBACK_IDS = 200
+    SCAN_AHEAD_IDS = 5000
+    RECHECK_INTERVAL_DAYS = 7
+    # state에 보관하는 유효 ID 상한 (cms_id는 순차 발급이라 최신 ID부터 유지). 넘친 오래된 ID는 재확인 대상에서 빠진다.
+    # 죽은 ID는 따로 저장하지 않는다: lookback 아래는 어차피 다시 probe하지 않고, lookback 안은 늦은 게시를 잡기 위해 매번 probe한다.
+    MAX_TRACKED_VALID_IDS = 1000
 
     async def crawl(self, page) -> List[RawEvent]:
-        events: List[RawEvent] = []
-        consecutive_fail = 0
+        extra_pages = []
+        pages = asyncio.Queue()
+        pages.put_nowait(page)
+        try:
+            for _ in range(self.PROBE_CONCURRENCY - 1):
+                extra = await page.context.new_page()
+                extra_pages.append(extra)
+                pages.put_nowait(extra)
+        except Exception:
+            pass  # 추가 page 생성 실패 시 가능한 개수로 진행
+
+        # context.request는 context 쿠키를 공유하는 keep-alive HTTP 클라이언트 (브라우저 렌더링 없음)
+        http = page.context.request if self.HTTP_FAST_PATH else None
+        probe_paths = {}
+
+        async def _probe_browser(url: str):
+            probe_page = await pages.get()
+            try:
+                await probe_page.goto(url, wait_until="domcontentloaded", timeout=12000)
+                await asyncio.sleep(self.PROBE_SETTLE_SEC)
+                html = await probe_page.content()
+            finally:
+                pages.put_nowait(probe_page)
+            return self._classify_html(html, url)
 
-        for cms_id in range(self.CMS_START, self.CMS_END):
+        async def _probe(cms_id: int):
             url = f"{self.BASE_DETAIL}{cms_id}"
+            if http is not None:
+                try:
+                    resp = await http.get(url, timeout=self.HTTP_TIMEOUT_MS)
+                    html = await resp.text() if resp.ok else ""
+                except Exception:
+                    html = ""
+                if html:
+                    status, event, escalate = self._classify_static_html(html, url)
+                    if not escalate:
+                        probe_paths[cms_id] = "http"
+                        return status, event
+            probe_paths[cms_id] = "browser"
+            return await _probe_browser(url)
+
+        now = datetime.now()
+        plan = self._plan_scan(now)
+        statuses = {}
+
+        def _record(cms_id, status):
+            statuses[cms_id] = status
+
+        concurrency = pages.qsize()
+        events: List[RawEvent] = []
+        try:
+            if plan["recheck"]:
+                events += await self._scan(_probe, plan["recheck"], concurrency,
+                                           early_stop=False, on_result=_record)
+            if plan["lookback"]:
+                events += await self._scan(_probe, plan["lookback"], concurrency,
+                                           early_stop=False, on_result=_record)
+            events += await self._scan(_probe, plan["forward"], concurrency, on_result=_record)
+        finally:
+            for extra in extra_pages:
+                try:
+                    await extra.close()
+                except Exception:
+                    pass
+
+        # state는 수집 결과가 DB에 커밋된 뒤 confirm_persisted()에서 확정
+        self._pending_scan = (plan, statuses, now, probe_paths)
+        return events
+
+    def confirm_persisted(self, urls) -> None:
+        """
+        저장이 확인된 URL만 유효 ID로 반영해 state를 확정한다.
+        limit으로 잘렸거나 저장되지 않은 hit은 미탐색으로 취급해 다음 수집에서 다시 probe.
+        """
+        pending = getattr(self, "_pending_scan", None)
+        if pending is None:
+            return
+        plan, statuses, now, probe_paths = pending
+        urls = set(urls or ())
+        statuses = {i: s for i, s in statuses.items()
+                    if s != "hit" or f"{self.BASE_DETAIL}{i}" in urls}
+        self._update_state(plan, statuses, now, probe_paths)
+        self._pending_scan = None
+
+    # -- 증분 수집 상태 --
+
+    def _plan_scan(self, now: datetime) -> dict:
+        """
+        저장된 state로 이번 탐색 대상을 정한다.
+        - forward: frontier(최대 유효 cms_id) 다음부터 조기 종료 규칙으로 전진 탐색
+        - lookback: frontier 직전 LOOKBACK_IDS 구간 (늦게 게시된 이벤트 포착, 조기 종료 없음)
+        - recheck: 기존 유효 ID (RECHECK_INTERVAL_DAYS 주기로만)
+        lookback 구간의 기존 유효 ID는 재확인 주기가 아니면 건너뛴다.
+        """
+        state = getattr(self, "state", None) or {}
+        max_valid = state.get("max_valid_id")
+        valid_ids = set(state.get("valid_ids") or [])
+        if not max_valid:
+            return {"full": True, "recheck": [], "lookback": [],
+                    "forward": range(self.CMS_START, self.CMS_END)}
+
+        last_recheck = state.get("last_recheck_at")
+        recheck_due = True
+        if last_recheck:
             try:
-                await page.goto(url, wait_until="domcontentloaded", timeout=12000)
-                await asyncio.sleep(1.5)
-                html = await page.content()
+                recheck_due = now - datetime.fromisoformat(last_recheck) >= timedelta(days=self.RECHECK_INTERVAL_DAYS)
+            except ValueError:
+                recheck_due = True
 
-                if "조회 결과가 없습니다" in html:
-                    consecutive_fail += 1
-                    if consecutive_fail >= self.MAX_CONSECUTIVE_FAIL:
-                        break
-                    continue
-
-                consecutive_fail = 0
-                soup = BeautifulSoup(html, "lxml")
-                title = self._extract_title(soup) or ""
-                if not title or len(title) < 3:
-                    continue
-                # 앱 리다이렉트/안내 페이지 제거
-                if any(junk in title for junk in self._JUNK_TITLES):
-                    consecutive_fail += 1
-                    if consecutive_fail >= self.MAX_CONSECUTIVE_FAIL:
+        lookback_start = max(self.CMS_START, max_valid - self.LOOKBACK_IDS)
+        lookback = [i for i in range(lookback_start, max_valid + 1)
+                    if recheck_due or i not in valid_ids]
+        recheck = sorted(i for i in valid_ids if i < lookback_start) if recheck_due else []
+        forward = range(max_valid + 1, max(self.CMS_END, max_valid + 1 + self.SCAN_AHEAD_IDS))
+        return {"full": False, "recheck": recheck, "lookback": lookback,
+                "forward": forward, "recheck_due": recheck_due}
+
+    def _update_state(self, plan: dict, statuses: dict, now: datetime, probe_paths: dict = None) -> None:
+        """
+        탐색 결과(cms_id -> status)를 state에 반영: 유효 ID(최신 MAX_TRACKED_VALID_IDS개), frontier, 시각.
+        miss만 유효 ID에서 제거하며, error(probe 예외)는 기존 state를 그대로 둔다.
+        probe_paths(cms_id -> "http"/"browser")가 있으면 HTTP fast path 적중률과 브라우저로 넘긴 ID를 기록.
+        """
+        state = dict(getattr(self, "state", None) or {})
+        valid_ids = set(state.get("valid_ids") or [])
+        hits = {i for i, s in statuses.items() if s == "hit"}
+        dead = {i for i, s in statuses.items() if s == "miss"}
+        valid_ids = (valid_ids - dead) | hits
+
+        if valid_ids:
+            state["max_valid_id"] = max(valid_ids)
+        if statuses:
+            state["scanned_to"] = max(state.get("scanned_to") or 0, max(statuses))
+        state["valid_ids"] = sorted(valid_ids)[-self.MAX_TRACKED_VALID_IDS:]
+        state.pop("dead_ranges", None)  # 이전 버전 state의 미사용 필드 정리
+        state["last_scan_at"] = now.isoformat()
+        state["last_scan_probes"] = len(statuses)
+        state["last_scan_hits"] = len(hits)
+        if plan.get("full") or plan.get("recheck_due"):
+            state["last_recheck_at"] = now.isoformat()
+        if probe_paths is not None:
+            escalated = sorted(i for i, path in probe_paths.items() if path == "browser")
+            state["last_scan_fast_path"] = {
+                "http": len(probe_paths) - len(escalated),
+                "browser": len(escalated),
+                "hit_rate": round((len(probe_paths) - len(escalated)) / len(probe_paths), 3) if probe_paths else 0,
+                "escalated_ids": escalated,
+            }
+        self.state = state
+
+    def dump_state(self) -> Optional[dict]:
+        return getattr(self, "state", None) or None
+
+    async def _scan(self, probe, cms_ids, concurrency: int, early_stop: bool = True,
+                    on_result=None) -> List[RawEvent]:
+        """
+        cms_id들을 concurrency개씩 병렬로 probe하되, 결과는 cms_id 순서대로 소비한다.
+        연속 실패(MAX_CONSECUTIVE_FAIL) 조기 종료는 순서가 보장된 결과 스트림 기준이다.
+        probe(cms_id) -> (status, RawEvent|None), status: hit / miss / junk / no_title
+        probe가 예외를 내면 error (state는 건드리지 않고, 조기 종료 집계에만 포함)
+        on_result(cms_id, status): 결과 소비 시마다 호출 (state 기록용)
+        """
+        events: List[RawEvent] = []
+        consecutive_fail = 0
+        ids = iter(cms_ids)
+        window = max(1, concurrency) * self.PROBE_LOOKAHEAD
+        inflight = deque()
+
+        def _fill():
+            while len(inflight) < window:
+                cms_id = next(ids, None)
+                if cms_id is None:
+                    return
+                inflight.append((cms_id, asyncio.ensure_future(probe(cms_id))))
+
+        try:
+            _fill()
+            while inflight:
+                cms_id, task = inflight.popleft()
+                try:
+                    status, event = await task
+                except Exception:
+                    status, event = "error", None
+                if on_result:
+                    on_result(cms_id, status)
+
+                if status == "hit":
+                    consecutive_fail = 0
+                    events.append(event)
+                elif status == "no_title":
+                    consecutive_fail = 0
+                else:
+                    # miss(조회 결과 없음), error(네트워크 등 probe 예외), junk(앱 리다이렉트/안내 페이지)
+                    consecutive_fail = 1 if status == "junk" else consecutive_fail + 1
+                    if early_stop and consecutive_fail >= self.MAX_CONSECUTIVE_FAIL:
                         break
-                    continue
-
-                period = self._extract_period(soup)
-                events.append(RawEvent(
-                    url=url,
-                    company=self.company_name,
-                    title=title,
-                    period=period,
-                    category=self.infer_category(title),
-                    threat_level=self.infer_threat(title),
-                    one_line_summary=title,
-                    raw_text=soup.get_text(separator=" ", strip=True)[:800],
-                ))
-            except Exception:
-                consecutive_fail += 1
-                if consecutive_fail >= self.MAX_CONSECUTIVE_FAIL:
-                    break
+                _fill()
+        finally:
+            for _, task in inflight:
+                task.cancel()
+            if inflight:
+                await asyncio.gather(*(t for _, t in inflight), return_exceptions=True)
 
         return events
 
+    def _classify_static_html(self, html: str, url: str):
+        """
+        HTTP로 받은 정적 HTML 판정 -> (status, RawEvent|None, escalate).
+        제목이 없거나 스크립트 렌더링 페이지로 보이면 escalate=True (브라우저로 재확인).
+        """
+        if "조회 결과가 없습니다" in html:
+            return "miss", None, False
+        status, event = self._classify_html(html, url)
+        if status == "no_title":
+            return status, event, True
+        if status == "hit" and self._looks_script_rendered(html):
+            return status, event, True
+        return status, event, False
+
+    def _looks_script_rendered(self, html: str) -> bool:
+        """본문 텍스트가 거의 없고 스크립트 비중이 큰 HTML (클라이언트 렌더링) 여부"""
+        soup = BeautifulSoup(html, "lxml")
+        script_count = len(soup.find_all("script"))
+        for tag in soup(["script", "style", "noscript"]):
+            tag.decompose()
+        text_len = len(soup.get_text(separator=" ", strip=True))
+        return text_len < self.STATIC_MIN_TEXT_LEN or (script_count >= 10 and text_len < self.STATIC_MIN_TEXT_LEN * 3)
+
+    def _classify_html(self, html: str, url: str):
+        """상세 페이지 HTML 판정 -> (status, RawEvent|None)"""
+        if "조회 결과가 없습니다" in html:
+            return "miss", None
+
+        soup = BeautifulSoup(html, "lxml")
+        title = self._extract_title(soup) or ""
+        if not title or len(title) < 3:
+            return "no_title", None
+        # 앱 리다이렉트/안내 페이지 제거
+        if any(junk in title for junk in self._JUNK_TITLES):
+            return "junk", None
+
+        period = self._extract_period(soup)
+        return "hit", RawEvent(
+            url=url,
+            company=self.company_name,
+            title=title,
+            period=period,
+            category=self.infer_category(title),
+            threat_level=self.infer_threat(title),
+            one_line_summary=title,
+            raw_text=soup.get_text(separator=" ", strip=True)[:800],
+        )
+
     # -- 헬퍼 --
     _HEADER_NOISE = ("삼성카드", "삼성 카드", "로그인", "마이페이지", "이벤트 목록")
     _NOTIFICATION = ("이벤트에 응모되었습니다", "이벤트에 응모 되었습니다")
@@ -1,7 +1,7 @@
 """
 상세 페이지 추출 모듈.
 기존 detail_extractor.py를 모듈화한 래퍼.
-Playwright로 URL을 열고 마케팅 내용을 구조화한다.
+공유 브라우저 풀(modules.browser)에서 page를 빌려 URL을 열고 마케팅 내용을 구조화한다.
 """
 
 import time
@@ -11,17 +11,24 @@ from typing import Optional
 logger = logging.getLogger(__name__)
 
 
-async def extract_detail(url: str, wait_sec: float = 3) -> dict:
+async def extract_detail(url: str, wait_sec: float = 3, pool=None) -> dict:
     """
     URL에서 상세 내용 추출.
+    pool이 없으면 프로세스 공유 브라우저 풀을 사용한다.
     Returns: detail_extractor.extract_from_url() 결과와 동일한 dict
-             + extraction_latency_ms 추가
+             + extraction_latency_ms, network({requests, blocked, bytes}) 추가
     """
     import detail_extractor
+    from modules.browser import get_browser_pool, page_network_stats
 
+    pool = pool or get_browser_pool()
     start = time.time()
     try:
-        result = await detail_extractor.extract_from_url(url, wait_sec=wait_sec)
+        async with pool.page() as page:
+            result = await detail_extractor.extract_from_url(url, wait_sec=wait_sec, page=page)
+            stats = page_network_stats(page)
+            await stats.settle()
+            result["network"] = stats.as_dict()
     except Exception as e:
         logger.warning("추출 실패 %s: %s", url[:80], str(e)[:200])
         return {
@@ -52,53 +52,70 @@ def generate_rule_insight(extracted: dict) -> dict:
 
 
 def generate_gemini_insight(extracted: dict, company: str = "") -> Optional[dict]:
+    """agenerate_gemini_insight의 동기 래퍼 (하위호환)."""
+    from gemini_insight import _run_sync
+    return _run_sync(agenerate_gemini_insight(extracted, company))
+
+
+async def agenerate_gemini_insight(extracted: dict, company: str = "", lane: str = "background") -> Optional[dict]:
     """
-    Gemini AI 인사이트 생성.
+    Gemini AI 인사이트 생성 (rate-limit 대기 중 이벤트 루프 비차단).
     실패 시 None 반환 -> caller가 rule fallback 사용.
+    lane="interactive"면 사용자 요청용 예약 슬롯을 사용.
     """
     try:
-        from gemini_insight import enrich_with_gemini
-        result = enrich_with_gemini(extracted, company=company)
-        if not result:
-            return None
-        # 표준 스키마로 매핑
-        benefit_level = result.get("benefit_level", "보통")
-        return {
-            "benefit_level": benefit_level,
-            "benefit_score": BENEFIT_SCORE_MAP.get(benefit_level, 2.0),
-            "target_clarity": result.get("target_clarity", "보통"),
-            "competitive_points": result.get("competitive_points", []),
-            "weaknesses": result.get("weaknesses", []),
-            "promo_strategies": result.get("promo_strategies", []),
-            "objective_tags": result.get("objective_tags", []),
-            "target_tags": result.get("target_tags", []),
-            "channel_tags": result.get("channel_tags", []),
-            "threat_level": result.get("threat_level"),
-            "threat_reason": result.get("threat_reason"),
-            "benefit_detail": result.get("benefit_detail"),
-            "target_profile": result.get("target_profile"),
-            "conditions_summary": result.get("conditions_summary"),
-            "event_duration_type": result.get("event_duration_type"),
-            "shinhan_response": result.get("shinhan_response"),
-            "marketing_takeaway": result.get("marketing_takeaway"),
-            "evidence": result.get("evidence", []),
-            "insight_confidence": 0.85,
-            "section_coverage": _calc_section_coverage(extracted),
-            # Gemini 부가 필드
-            "one_line_summary": result.get("one_line_summary"),
-            "category": result.get("category"),
-        }
+        from gemini_insight import aenrich_with_gemini
+        result = await aenrich_with_gemini(extracted, company=company, lane=lane)
+        return _to_gemini_schema(result, extracted)
     except Exception as e:
         logger.debug("Gemini 인사이트 실패: %s", str(e)[:200])
         return None
 
 
+def _to_gemini_schema(result: Optional[dict], extracted: dict) -> Optional[dict]:
+    """Gemini 응답 -> 표준 인사이트 스키마. 응답이 없으면 None."""
+    if not result:
+        return None
+    benefit_level = result.get("benefit_level", "보통")
+    return {
+        "benefit_level": benefit_level,
+        "benefit_score": BENEFIT_SCORE_MAP.get(benefit_level, 2.0),
+        "target_clarity": result.get("target_clarity", "보통"),
+        "competitive_points": result.get("competitive_points", []),
+        "weaknesses": result.get("weaknesses", []),
+        "promo_strategies": result.get("promo_strategies", []),
+        "objective_tags": result.get("objective_tags", []),
+        "target_tags": result.get("target_tags", []),
+        "channel_tags": result.get("channel_tags", []),
+        "threat_level": result.get("threat_level"),
+        "threat_reason": result.get("threat_reason"),
+        "benefit_detail": result.get("benefit_detail"),
+        "target_profile": result.get("target_profile"),
+        "conditions_summary": result.get("conditions_summary"),
+        "event_duration_type": result.get("event_duration_type"),
+        "shinhan_response": result.get("shinhan_response"),
+        "marketing_takeaway": result.get("marketing_takeaway"),
+        "evidence": result.get("evidence", []),
+        "insight_confidence": 0.85,
+        "section_coverage": _calc_section_coverage(extracted),
+        # Gemini 부가 필드
+        "one_line_summary": result.get("one_line_summary"),
+        "category": result.get("category"),
+    }
+
+
 def generate_hybrid_insight(extracted: dict, company: str = "") -> dict:
+    """agenerate_hybrid_insight의 동기 래퍼 (하위호환)."""
+    from gemini_insight import _run_sync
+    return _run_sync(agenerate_hybrid_insight(extracted, company))
+
+
+async def agenerate_hybrid_insight(extracted: dict, company: str = "", lane: str = "background") -> dict:
     """
     하이브리드: Gemini 시도 -> 실패 시 rule fallback.
     반환: (insight_dict, source_str)
     """
-    gemini = generate_gemini_insight(extracted, company)
+    gemini = await agenerate_gemini_insight(extracted, company, lane=lane)
     if gemini:
         return gemini, "gemini"
 
@@ -106,6 +123,35 @@ def generate_hybrid_insight(extracted: dict, company: str = "") -> dict:
     return rule, "rule"
 
 
+async def agenerate_hybrid_insights_batch(items: list) -> dict:
+    """
+    배치 하이브리드: 여러 이벤트를 Gemini 1회 요청으로 분석, 검증 실패 건만 개별 rule fallback.
+    items: [(event_id, extracted, company), ...]
+    반환: {event_id: (insight_dict, source_str)}
+    """
+    if not items:
+        return {}
+    if len(items) == 1:
+        event_id, extracted, company = items[0]
+        return {event_id: await agenerate_hybrid_insight(extracted, company)}
+
+    try:
+        from gemini_insight import aenrich_batch_with_gemini
+        batch = await aenrich_batch_with_gemini(items)
+    except Exception as e:
+        logger.debug("Gemini 배치 인사이트 실패: %s", str(e)[:200])
+        batch = {}
+
+    results = {}
+    for event_id, extracted, _company in items:
+        gemini = _to_gemini_schema(batch.get(event_id), extracted)
+        if gemini:
+            results[event_id] = (gemini, "gemini")
+        else:
+            results[event_id] = (generate_rule_insight(extracted), "rule")
+    return results
+
+
 # ---------------------------------------------------------------------------
 # 내부 헬퍼
 # ---------------------------------------------------------------------------
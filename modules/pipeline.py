@@ -10,18 +10,37 @@ import os
 import logging
 from datetime import datetime
 from typing import Optional
+from urllib.parse import urlsplit
 
 # 프로젝트 루트를 path에 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import database as db
+from modules.browser import get_browser_pool
 from modules.connectors import CONNECTORS
 from modules.extraction import extract_detail
 from modules.normalization import normalize_extracted
-from modules.insights import generate_hybrid_insight
+from modules.insights import agenerate_hybrid_insights_batch, generate_rule_insight
+from gemini_insight import (
+    GEMINI_BATCH_MAX_ITEMS, GEMINI_BATCH_TOKEN_BUDGET, estimate_enrich_tokens, is_gemini_configured,
+)
 
 logger = logging.getLogger(__name__)
 
+# 상세 추출 동시성: 전체 동시 추출 수 / 카드사 도메인별 상한
+EXTRACT_CONCURRENCY = max(1, int(os.getenv("EXTRACT_CONCURRENCY", "4")))
+EXTRACT_PER_DOMAIN = max(1, int(os.getenv("EXTRACT_PER_DOMAIN", "2")))
+EXTRACT_DOMAIN_LIMITS = {
+    "samsungcard.com": EXTRACT_PER_DOMAIN,
+    "kbcard.com": EXTRACT_PER_DOMAIN,
+    "hyundaicard.com": EXTRACT_PER_DOMAIN,
+    "shinhancard.com": EXTRACT_PER_DOMAIN,
+}
+
+# Gemini 업그레이드 워커: 대기열이 비었을 때 재확인 간격 / 항목당 최대 시도 횟수
+ENRICH_WORKER_IDLE_SEC = max(1.0, float(os.getenv("ENRICH_WORKER_IDLE_SEC", "30")))
+ENRICH_MAX_ATTEMPTS = max(1, int(os.getenv("ENRICH_MAX_ATTEMPTS", "3")))
+
 # 전체 파이프라인 진행 상태 (GET /api/pipeline/progress에서 조회)
 _PIPELINE_PROGRESS = {
     "running": False,
@@ -73,74 +92,85 @@ def set_full_extract_started():
     })
 
 
-async def _get_stealth_page():
-    """stealth가 적용된 Playwright page 반환. 호출자가 browser.close() 책임. 2.x만 사용(stealth_async 미사용)."""
-    from playwright.async_api import async_playwright
-    try:
-        from playwright_stealth import Stealth
-    except ImportError:
-        Stealth = None
-
-    pw = await async_playwright().start()
-    browser = await pw.chromium.launch(headless=True)
-    context = await browser.new_context(
-        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-        viewport={"width": 1920, "height": 1080},
-    )
-    if Stealth is not None:
-        await Stealth().apply_stealth_async(context)
-    page = await context.new_page()
-    return pw, browser, page
-
-
 # ===========================================================================
 # 1단계: 수집 (ingest)
 # ===========================================================================
 
-async def run_ingest(company: str = None, limit_per_company: int = 200) -> dict:
+async def _ingest_company(pool, comp_name: str, ConnectorClass, limit_per_company: int) -> dict:
+    """
+    카드사 1곳 수집. 전용 세션/잡/브라우저 context를 사용해 다른 카드사와 격리된다.
+    실패해도 예외를 올리지 않고 결과 dict에 failed=True로 표시.
+    """
+    session = db.SessionLocal()
+    context = None
+    out = {"company": comp_name, "ingested": 0, "skipped": 0, "failed": False}
+    job_id = db.create_job(session, "ingest", company=comp_name, status="running")
+    try:
+        context = await pool.new_context()
+        page = await context.new_page()
+        connector = ConnectorClass()
+        connector.load_state(db.get_connector_state(session, comp_name))
+        raw_events = await connector.crawl(page)
+        print(f"[수집] {comp_name}: {len(raw_events)}건 크롤링됨")
+        batch = raw_events[:limit_per_company]
+        bulk = db.insert_events_bulk(session, [raw.to_dict() for raw in batch])
+
+        # 이벤트 커밋 후에만 state 저장: 저장(신규/기존)된 URL만 유효 ID로 확정
+        connector.confirm_persisted({raw.url for raw in batch if raw.url})
+        state = connector.dump_state()
+        if state is not None:
+            db.save_connector_state(session, comp_name, state)
+        count = bulk["inserted"]
+        out["ingested"] = count
+        out["skipped"] = len(raw_events) - count
+        db.update_job(session, job_id, "success")
+        print(f"[수집] {comp_name}: {count}건 신규 저장")
+    except Exception as e:
+        session.rollback()
+        db.update_job(session, job_id, "failed", error=str(e)[:500])
+        out["failed"] = True
+        print(f"[수집] {comp_name} 실패: {str(e)[:150]}")
+    finally:
+        if context is not None:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        session.close()
+    return out
+
+
+async def run_ingest(company: str = None, limit_per_company: int = 200, pool=None) -> dict:
     """
     카드사별 이벤트 목록 수집 -> DB 저장.
-    company가 None이면 전사 수집.
+    company가 None이면 전사 수집. 카드사별 커넥터는 하나의 브라우저 프로세스에서
+    각자 독립 context로 동시에 실행되므로, 전체 소요 시간은 가장 느린 카드사에 수렴한다.
     """
     targets = {company: CONNECTORS[company]} if company and company in CONNECTORS else CONNECTORS
     result = {"ingested": 0, "skipped": 0, "failed_companies": []}
     _PIPELINE_PROGRESS["ingest_total"] = len(targets)
     _PIPELINE_PROGRESS["ingest_done"] = 0
+    pool = pool or get_browser_pool()
 
-    session = db.SessionLocal()
-    pw = browser = page = None
-    try:
-        pw, browser, page = await _get_stealth_page()
+    async def _run(comp_name, ConnectorClass):
+        try:
+            return await _ingest_company(pool, comp_name, ConnectorClass, limit_per_company)
+        finally:
+            _PIPELINE_PROGRESS["ingest_done"] += 1
 
-        for idx, (comp_name, ConnectorClass) in enumerate(targets.items(), 1):
-            job_id = db.create_job(session, "ingest", company=comp_name)
-            db.update_job(session, job_id, "running")
-            try:
-                connector = ConnectorClass()
-                raw_events = await connector.crawl(page)
-                print(f"[수집] {comp_name}: {len(raw_events)}건 크롤링됨")
-
-                count = 0
-                for raw in raw_events[:limit_per_company]:
-                    eid = db.insert_event(session, raw.to_dict())
-                    if eid:
-                        count += 1
-                result["ingested"] += count
-                result["skipped"] += len(raw_events) - count
-                db.update_job(session, job_id, "success")
-                _PIPELINE_PROGRESS["ingest_done"] = idx
-                print(f"[수집] {comp_name}: {count}건 신규 저장")
-            except Exception as e:
-                db.update_job(session, job_id, "failed", error=str(e)[:500])
-                result["failed_companies"].append(comp_name)
-                _PIPELINE_PROGRESS["ingest_done"] = idx
-                print(f"[수집] {comp_name} 실패: {str(e)[:150]}")
-    finally:
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-        session.close()
+    outcomes = await asyncio.gather(
+        *(_run(comp_name, ConnectorClass) for comp_name, ConnectorClass in targets.items()),
+        return_exceptions=True,
+    )
+    for comp_name, outcome in zip(targets, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"[수집] {comp_name} 실패: {str(outcome)[:150]}")
+            result["failed_companies"].append(comp_name)
+            continue
+        result["ingested"] += outcome["ingested"]
+        result["skipped"] += outcome["skipped"]
+        if outcome["failed"]:
+            result["failed_companies"].append(comp_name)
 
     global _LAST_INGEST_AT, _LAST_INGEST_RESULT
     _LAST_INGEST_AT = datetime.now().isoformat()
@@ -152,105 +182,288 @@ async def run_ingest(company: str = None, limit_per_company: int = 200) -> dict:
 # 2단계: 상세 추출 + 정규화 + 인사이트 (extract -> normalize -> insight)
 # ===========================================================================
 
-async def run_extract_and_enrich(limit: int = 20, on_progress=None) -> dict:
+def _domain_of(url: str) -> str:
+    """URL -> 카드사 도메인 키 (EXTRACT_DOMAIN_LIMITS 키와 동일). 미매칭이면 호스트명."""
+    host = (urlsplit(url or "").hostname or "").lower()
+    for domain in EXTRACT_DOMAIN_LIMITS:
+        if host == domain or host.endswith("." + domain):
+            return domain
+    return host
+
+
+async def _extract_one(event, pool, job_id: int) -> dict:
+    """
+    이벤트 1건 상세추출 -> 정규화 -> rule 인사이트. DB 저장은 호출자가 순서대로 수행.
+    Gemini 분석은 enrichment_queue를 통해 run_enrichment_queue가 따로 수행한다.
+    """
+    extracted = await extract_detail(event.url, wait_sec=3, pool=pool)
+    update_data = normalize_extracted(extracted, existing_event=event)
+    return {"job_id": job_id, "extracted": extracted, "update_data": update_data,
+            "insight_data": generate_rule_insight(extracted), "source": "rule"}
+
+
+def _persist_extraction(session, event, outcome: dict, job_status: str = None, enqueue: bool = False) -> None:
+    """
+    _extract_one 결과(+insight_data/source)를 이벤트/섹션/인사이트/스냅샷(+잡 상태, 대기열 등록)으로
+    한 트랜잭션에 저장.
+    """
+    extracted = outcome["extracted"]
+    update_data = outcome["update_data"]
+    insight_data = outcome["insight_data"]
+    source = outcome["source"]
+
+    if source == "gemini":
+        # Gemini 부가 필드 반영
+        if insight_data.get("one_line_summary"):
+            update_data["one_line_summary"] = insight_data["one_line_summary"]
+        if insight_data.get("category"):
+            update_data["category"] = insight_data["category"]
+        if insight_data.get("threat_level"):
+            update_data["threat_level"] = insight_data["threat_level"]
+
+    # 이벤트 업데이트
+    # marketing_insights에 통합 저장 (하위호환)
+    update_data["marketing_insights"] = insight_data
+    network = extracted.get("network") or {}
+    db.persist_enrichment_result(
+        session, event.id,
+        update_data=update_data,
+        sections=extracted.get("marketing_content") or {},
+        insight_data=insight_data,
+        insight_source=source,
+        snapshot={
+            "raw_text": extracted.get("raw_text"),
+            "extracted_json": extracted,
+            "latency_ms": extracted.get("extraction_latency_ms"),
+            "readiness_wait_ms": extracted.get("readiness_wait_ms"),
+            "bytes_transferred": network.get("bytes"),
+            "requests_blocked": network.get("blocked"),
+        },
+        job_id=outcome.get("job_id"),
+        job_status=job_status,
+        enqueue=enqueue,
+    )
+
+
+async def run_extract_and_enrich(limit: int = 20, on_progress=None, pool=None,
+                                 concurrency: int = None) -> dict:
     """
     미추출 이벤트에 대해 상세추출 -> 정규화 -> 인사이트 생성.
     on_progress(processed, total, succeeded, failed) 호출로 진행률 알림.
+    pool: 상세 추출에 쓸 BrowserPool (None이면 공유 풀). 브라우저는 run 간에 재사용된다.
+    concurrency: 동시 추출 수 (None이면 EXTRACT_CONCURRENCY). 카드사 도메인별로는
+        EXTRACT_DOMAIN_LIMITS 이하로 제한되며, DB 저장/진행률 갱신은 대상 순서대로 이뤄진다.
+    인사이트는 rule 결과를 즉시 저장하고 Gemini 업그레이드 대기열에 등록한다
+    (크롤링 처리량이 LLM 쿼터에 묶이지 않도록).
     """
+    pool = pool or get_browser_pool()
+    concurrency = max(1, concurrency or EXTRACT_CONCURRENCY)
     session = db.SessionLocal()
-    result = {"processed": 0, "succeeded": 0, "failed": 0, "gemini_enriched": 0}
+    result = {"processed": 0, "succeeded": 0, "failed": 0, "enqueued": 0}
 
+    def _notify():
+        if on_progress:
+            on_progress(result["succeeded"] + result["failed"], total, result["succeeded"], result["failed"])
+
+    global_sem = asyncio.Semaphore(concurrency)
+    domain_sems = {}
+
+    async def _run(event):
+        domain = _domain_of(event.url)
+        if domain not in domain_sems:
+            domain_sems[domain] = asyncio.Semaphore(EXTRACT_DOMAIN_LIMITS.get(domain, EXTRACT_PER_DOMAIN))
+        # 도메인 슬롯을 먼저 잡아, 한 사이트 대기 건이 전체 슬롯을 점유하지 않게 한다
+        async with domain_sems[domain]:
+            async with global_sem:
+                job_id = db.create_job(session, "extract", event_id=event.id, company=event.company,
+                                       status="running")
+                try:
+                    return await _extract_one(event, pool, job_id)
+                except Exception as e:
+                    return {"job_id": job_id, "error": e}
+
+    def _finish(event, outcome: dict):
+        job_id = outcome["job_id"]
+        try:
+            if outcome.get("error") is not None:
+                raise outcome["error"]
+            _persist_extraction(session, event, outcome, job_status="success", enqueue=True)
+            result["enqueued"] += 1
+            result["succeeded"] += 1
+            _notify()
+            print(f"[파이프라인] OK id={event.id} src={outcome['source']} {(event.title or '')[:40]}")
+
+        except Exception as e:
+            session.rollback()
+            db.update_job(session, job_id, "failed", error=str(e)[:500])
+            result["failed"] += 1
+            _notify()
+            print(f"[파이프라인] FAIL id={event.id}: {str(e)[:120]}")
+
+    tasks = []
     try:
         pending = db.get_events_pending_extraction(session, limit=limit)
         result["processed"] = total = len(pending)
-        if on_progress:
-            on_progress(0, total, 0, 0)
+        _notify()
         if not pending:
             print("[파이프라인] 미추출 이벤트 없음")
             return result
 
-        print(f"[파이프라인] 미추출 {len(pending)}건 추출+인사이트 시작")
+        print(f"[파이프라인] 미추출 {len(pending)}건 추출+인사이트 시작 (동시 {concurrency})")
 
+        # 스킵 대상은 순서 유지를 위해 사유 문자열로 자리표시
         for event in pending:
             if not event.url or not event.url.startswith("http"):
+                tasks.append("invalid_url")
+            elif db.is_event_locked(session, event.id):
+                tasks.append("locked")
+            else:
+                tasks.append(asyncio.create_task(_run(event)))
+
+        for event, task in zip(pending, tasks):
+            if task == "invalid_url":
                 result["failed"] += 1
-                if on_progress:
-                    on_progress(result["succeeded"] + result["failed"], total, result["succeeded"], result["failed"])
+                _notify()
                 continue
-
-            # 잠금된 이벤트는 재추출 스킵
-            if db.is_event_locked(session, event.id):
+            if task == "locked":
+                # 잠금된 이벤트는 재추출 스킵
                 result["succeeded"] += 1  # 잠금 건은 성공으로 카운트 (이미 확정됨)
-                if on_progress:
-                    on_progress(result["succeeded"] + result["failed"], total, result["succeeded"], result["failed"])
+                _notify()
                 # job에 스킵 사유 기록
                 skip_job_id = db.create_job(session, "extract", event_id=event.id, company=event.company)
                 db.update_job(session, skip_job_id, "success", error="skipped (locked)")
                 print(f"[파이프라인] SKIP (locked) id={event.id}")
                 continue
 
-            job_id = db.create_job(session, "extract", event_id=event.id, company=event.company)
-            db.update_job(session, job_id, "running")
-
-            try:
-                # 상세 추출
-                extracted = await extract_detail(event.url, wait_sec=3)
-
-                # 정규화
-                update_data = normalize_extracted(extracted, existing_event=event)
-
-                # 인사이트 (하이브리드)
-                insight_data, source = generate_hybrid_insight(extracted, company=event.company or "")
-                if source == "gemini":
-                    result["gemini_enriched"] += 1
-                    # Gemini 부가 필드 반영
-                    if insight_data.get("one_line_summary"):
-                        update_data["one_line_summary"] = insight_data["one_line_summary"]
-                    if insight_data.get("category"):
-                        update_data["category"] = insight_data["category"]
-                    if insight_data.get("threat_level"):
-                        update_data["threat_level"] = insight_data["threat_level"]
-
-                # 이벤트 업데이트
-                # marketing_insights에 통합 저장 (하위호환)
-                update_data["marketing_insights"] = insight_data
-                db.update_event(session, event.id, update_data)
-
-                # 정규화 테이블 저장
-                mc = extracted.get("marketing_content") or {}
-                if mc:
-                    db.save_sections(session, event.id, mc)
-                db.save_insight(session, event.id, insight_data, source=source)
-
-                # 스냅샷 저장
-                db.save_snapshot(
-                    session, event.id,
-                    raw_text=extracted.get("raw_text"),
-                    extracted_json=extracted,
-                    latency_ms=extracted.get("extraction_latency_ms"),
-                )
-
-                db.update_job(session, job_id, "success")
-                result["succeeded"] += 1
-                if on_progress:
-                    on_progress(result["succeeded"] + result["failed"], total, result["succeeded"], result["failed"])
-                print(f"[파이프라인] OK id={event.id} src={source} {(event.title or '')[:40]}")
-
-            except Exception as e:
-                db.update_job(session, job_id, "failed", error=str(e)[:500])
-                result["failed"] += 1
-                if on_progress:
-                    on_progress(result["succeeded"] + result["failed"], total, result["succeeded"], result["failed"])
-                print(f"[파이프라인] FAIL id={event.id}: {str(e)[:120]}")
+            _finish(event, await task)
 
     finally:
+        for task in tasks:
+            if isinstance(task, asyncio.Task) and not task.done():
+                task.cancel()
         session.close()
 
     print(f"[파이프라인] 완료: 처리={result['processed']} 성공={result['succeeded']} "
-          f"실패={result['failed']} gemini={result['gemini_enriched']}")
+          f"실패={result['failed']} gemini대기열={result['enqueued']}")
+    return result
+
+
+# ===========================================================================
+# Gemini 업그레이드 워커 (enrichment_queue 소비)
+# ===========================================================================
+
+def _apply_gemini_insight(session, event_id: int, insight_data: dict) -> None:
+    """
+    rule로 저장된 이벤트를 Gemini 결과로 업그레이드 (부가 필드 + marketing_insights + 인사이트 행)하고
+    대기열 항목을 done 처리. 한 트랜잭션.
+    """
+    update_data = {"marketing_insights": insight_data}
+    for key in ("one_line_summary", "category", "threat_level"):
+        if insight_data.get(key):
+            update_data[key] = insight_data[key]
+    if not db.persist_enrichment_result(session, event_id, update_data=update_data,
+                                        insight_data=insight_data, insight_source="gemini",
+                                        queue_status="done"):
+        raise RuntimeError("이벤트 없음")
+
+
+async def run_enrichment_queue(max_items: int = None) -> dict:
+    """
+    enrichment_queue의 pending 항목을 Gemini로 분석해 source="gemini"로 업그레이드.
+    최근 스냅샷의 추출 결과를 입력으로 GEMINI_BATCH_TOKEN_BUDGET/GEMINI_BATCH_MAX_ITEMS 단위 배치 요청.
+    요청 속도는 async rate limiter(GEMINI_MAX_RPM)가 맞춘다. 실패 건은 ENRICH_MAX_ATTEMPTS까지 재시도.
+    """
+    result = {"claimed": 0, "upgraded": 0, "retry": 0, "failed": 0, "skipped": 0, "batches": 0}
+    if not is_gemini_configured():
+        return result
+
+    session = db.SessionLocal()
+    attempted = set()  # 이번 회차에 시도한 항목은 재시도로 돌아와도 다시 잡지 않음
+    try:
+        while max_items is None or result["claimed"] < max_items:
+            want = GEMINI_BATCH_MAX_ITEMS
+            if max_items is not None:
+                want = min(want, max_items - result["claimed"])
+            rows = db.claim_enrichment_batch(session, want, exclude_ids=attempted)
+            if not rows:
+                break
+            result["claimed"] += len(rows)
+
+            items, tokens = [], 0
+            for row in rows:
+                event = db.get_event_by_id(session, row.event_id)
+                extracted = db.get_latest_extracted(session, row.event_id) if event else None
+                if not event or not extracted or db.is_event_locked(session, row.event_id):
+                    db.finish_enrichment(session, row.event_id, "done", error="skipped (no snapshot or locked)")
+                    result["skipped"] += 1
+                    continue
+                cost = estimate_enrich_tokens(extracted, event.company or "")
+                if items and tokens + cost > GEMINI_BATCH_TOKEN_BUDGET:
+                    # 예산 초과분은 시도 횟수 차감 없이 다음 배치로 미룸
+                    db.release_enrichment(session, row.event_id)
+                    result["claimed"] -= 1
+                    continue
+                items.append((row.event_id, extracted, event.company or ""))
+                attempted.add(row.event_id)
+                tokens += cost
+            if not items:
+                continue
+
+            insights = await agenerate_hybrid_insights_batch(items)
+            result["batches"] += 1
+            attempts = {row.event_id: row.attempts or 1 for row in rows}
+            batch_upgraded = 0
+            for event_id, _extracted, _company in items:
+                insight_data, source = insights[event_id]
+                try:
+                    if source != "gemini":
+                        raise RuntimeError("Gemini 분석 실패 (rule fallback)")
+                    _apply_gemini_insight(session, event_id, insight_data)
+                    result["upgraded"] += 1
+                    batch_upgraded += 1
+                except Exception as e:
+                    session.rollback()
+                    if attempts.get(event_id, 1) >= ENRICH_MAX_ATTEMPTS:
+                        db.finish_enrichment(session, event_id, "failed", error=str(e)[:500])
+                        result["failed"] += 1
+                    else:
+                        db.finish_enrichment(session, event_id, "pending", error=str(e)[:500])
+                        result["retry"] += 1
+            if not batch_upgraded:
+                # 전부 실패한 배치 (쿼터 소진 등) -> 이번 회차 중단, 다음 주기에 재시도
+                break
+    finally:
+        session.close()
+
+    if result["claimed"]:
+        print(f"[Gemini 워커] 업그레이드={result['upgraded']} 재시도={result['retry']} "
+              f"실패={result['failed']} 스킵={result['skipped']} 배치={result['batches']}")
     return result
 
 
+async def enrichment_worker_loop(stop_event: asyncio.Event = None):
+    """앱 수명 동안 대기열을 계속 소비. 비었거나 진척이 없으면(미설정/쿼터 소진) ENRICH_WORKER_IDLE_SEC 대기."""
+    session = db.SessionLocal()
+    try:
+        db.reset_running_enrichment(session)
+    finally:
+        session.close()
+
+    stop_event = stop_event or asyncio.Event()
+    while not stop_event.is_set():
+        try:
+            drained = await run_enrichment_queue(max_items=GEMINI_BATCH_MAX_ITEMS * 4)
+        except Exception as e:
+            logger.warning("Gemini 워커 오류: %s", str(e)[:200])
+            drained = {"upgraded": 0}
+        if drained["upgraded"]:
+            continue
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=ENRICH_WORKER_IDLE_SEC)
+        except asyncio.TimeoutError:
+            pass
+
+
 # ===========================================================================
 # 전체 파이프라인
 # ===========================================================================
@@ -286,7 +499,7 @@ async def run_full_pipeline(company: str = None, extract_limit: int = 500):
         _PIPELINE_PROGRESS["extract_result"] = extract_result
 
         print("=" * 60)
-        print(f"[전체 추출] 완료 - 추출 {extract_result['succeeded']}건, Gemini {extract_result['gemini_enriched']}건")
+        print(f"[전체 추출] 완료 - 추출 {extract_result['succeeded']}건, Gemini 대기열 {extract_result['enqueued']}건")
         print("=" * 60)
         return {"ingest": None, "extract": extract_result}
     except Exception as e:
@@ -53,6 +53,8 @@ async def run_extract_once():
             print("  설치: pip install playwright  후  playwright install chromium")
             return True  # 플로우 자체는 성공으로 처리
         raise
+    from modules.browser import close_browser_pool
+
     print("\n[추출 테스트] 삼성 이벤트 URL에서 상세 추출 중... (약 10초)")
     try:
         result = await detail_extractor.extract_from_url(SAMSUNG_REAL_URL, wait_sec=3)
@@ -61,6 +63,8 @@ async def run_extract_once():
         if "Executable" in str(e) or "playwright" in str(e).lower():
             print("  → Playwright 브라우저: playwright install chromium")
         return False
+    finally:
+        await close_browser_pool()
 
     title = result.get("title") or "(없음)"
     period = result.get("period") or "(없음)"
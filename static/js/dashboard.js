@@ -12,6 +12,9 @@ let TRENDS = null;     // trends
 let BRIEFINGS = null;  // company-briefings
 let QUAL_COMPARE = null; // qualitative-comparison
 let CURRENT_ID = null; // 상세 모달 이벤트 ID
+let STATS = null;      // stats
+let PROGRESS = null;   // pipeline progress (bootstrap 시점)
+let BOOT_VERSIONS = {}; // bootstrap 섹션별 버전 (known=으로 재전송)
 
 // ============ 초기화 ============
 document.addEventListener('DOMContentLoaded', async () => {
@@ -23,27 +26,30 @@ document.addEventListener('DOMContentLoaded', async () => {
 
 async function loadAll() {
   try {
-    const [evR, stR, ovR, bmR, smR, trR, brR, qcR, progR] = await Promise.all([
-      fetch('/api/events'), fetch('/api/stats'),
-      fetch('/api/analytics/company-overview'),
-      fetch('/api/analytics/benefit-benchmark'),
-      fetch('/api/analytics/strategy-map'),
-      fetch('/api/analytics/trends'),
-      fetch('/api/analytics/company-briefings'),
-      fetch('/api/analytics/qualitative-comparison'),
-      fetch('/api/pipeline/progress'),
-    ]);
-    ALL = await evR.json();
-    const prog = progR.ok ? await progR.json().catch(() => ({})) : {};
+    // 대시보드 묶음 응답 1회. 보유 중인 섹션 버전을 보내면 바뀐 섹션만 data가 온다.
+    const known = Object.entries(BOOT_VERSIONS).map(([k, v]) => `${k}:${v}`).join(',');
+    const r = await fetchJSON('/api/dashboard/bootstrap' + (known ? `?known=${encodeURIComponent(known)}` : ''));
+    if (!r.ok) throw new Error(`bootstrap HTTP ${r.status}`);
+    const boot = r.data;
+    const section = (name, current) => {
+      const s = (boot.sections || {})[name];
+      if (!s || s.error) { delete BOOT_VERSIONS[name]; return null; }
+      BOOT_VERSIONS[name] = s.version;
+      return s.unchanged ? current : s.data;
+    };
+    ALL = section('events', ALL) || [];
+    PROGRESS = section('progress', PROGRESS);
+    const prog = PROGRESS || {};
     updateLastRunSummary(prog);
     updateLastIngestSummary(prog);
-    const stats = await stR.json();
-    OVERVIEW = ovR.ok ? await ovR.json() : null;
-    BENCHMARK = bmR.ok ? await bmR.json() : null;
-    STRATEGY = smR.ok ? await smR.json() : null;
-    TRENDS = trR.ok ? await trR.json() : null;
-    BRIEFINGS = brR.ok ? await brR.json() : null;
-    QUAL_COMPARE = qcR.ok ? await qcR.json() : null;
+    STATS = section('stats', STATS);
+    const stats = STATS || {};
+    OVERVIEW = section('overview', OVERVIEW);
+    BENCHMARK = section('benchmark', BENCHMARK);
+    STRATEGY = section('strategy', STRATEGY);
+    TRENDS = section('trends', TRENDS);
+    BRIEFINGS = section('briefings', BRIEFINGS);
+    QUAL_COMPARE = section('qual_compare', QUAL_COMPARE);
 
     updateHeaderStats(stats);
     try { renderActionCards(); } catch(_){}
@@ -495,6 +501,7 @@ function renderWeeklyChanges() {
 
 // ============ 최근 경쟁 이벤트 피드 ============
 function isExtracted(e) {
+  if (typeof e.extracted === 'boolean') return e.extracted;  // fields=summary 응답
   const raw = e.raw_text && String(e.raw_text).trim();
   const mi = pjson(e.marketing_insights);
   return !!(raw && raw.length > 20) || (mi && (typeof mi === 'object' ? Object.keys(mi).length > 0 : mi.length > 0));
@@ -759,9 +766,9 @@ async function loadCompareMatrix() {
   const axis = (document.getElementById('matrixAxis') || {}).value || 'category';
   el.innerHTML = '<p class="text-slate-400 text-xs">로딩 중...</p>';
   try {
-    const r = await fetch('/api/analytics/compare-matrix?axis=' + axis);
+    const r = await fetchJSON('/api/analytics/compare-matrix?axis=' + axis);
     if (!r.ok) throw new Error('API 오류');
-    const d = await r.json();
+    const d = r.data;
     renderCompareMatrix(d, el);
   } catch (e) { el.innerHTML = '<p class="text-rose-500 text-xs">매트릭스 로드 실패</p>'; }
 }
@@ -795,9 +802,9 @@ async function loadShinhanGap() {
   const el = document.getElementById('shinhanGapView');
   if (!el) return;
   try {
-    const r = await fetch('/api/analytics/shinhan-gap');
+    const r = await fetchJSON('/api/analytics/shinhan-gap');
     if (!r.ok) throw new Error('API 오류');
-    const d = await r.json();
+    const d = r.data;
     renderShinhanGap(d, el);
   } catch (e) { el.innerHTML = '<p class="text-rose-500 text-xs">갭 분석 로드 실패</p>'; }
 }
@@ -834,9 +841,9 @@ async function loadGapTrend() {
   const canvas = document.getElementById('chartGapTrend');
   if (!canvas) return;
   try {
-    const r = await fetch('/api/analytics/shinhan-gap-trend?weeks=8');
+    const r = await fetchJSON('/api/analytics/shinhan-gap-trend?weeks=8');
     if (!r.ok) return;
-    const d = await r.json();
+    const d = r.data;
     if (_gapTrendChart) _gapTrendChart.destroy();
     _gapTrendChart = new Chart(canvas, {
       type: 'line',
@@ -870,9 +877,9 @@ async function loadTextComparison() {
   if (btn) { btn.disabled = true; btn.innerHTML = '<i class="fas fa-spinner fa-spin mr-1"></i>분석 중...'; }
   el.innerHTML = '<p class="text-slate-400 text-xs">Gemini 분석 중... (최대 30초 소요)</p>';
   try {
-    const r = await fetch('/api/analytics/text-comparison');
-    if (!r.ok) throw new Error((await r.json().catch(()=>({}))).detail || 'API 오류');
-    const d = await r.json();
+    const r = await fetchJSON('/api/analytics/text-comparison');
+    if (!r.ok) throw new Error(r.data.detail || 'API 오류');
+    const d = r.data;
     renderTextComparison(d, el);
   } catch (e) { el.innerHTML = '<p class="text-rose-500 text-xs">텍스트 비교 분석 실패: ' + esc(e.message) + '</p>'; }
   finally { if (btn) { btn.disabled = false; btn.innerHTML = '<i class="fas fa-wand-magic-sparkles mr-1"></i>비교 분석 실행'; } }
@@ -1043,8 +1050,8 @@ async function openDetail(id) {
   // intelligence API 호출
   document.getElementById('mp-intelligence').innerHTML = '<p class="text-slate-400">로딩 중…</p>';
   try {
-    const r = await fetch(`/api/events/${id}/intelligence`);
-    const d = await r.json();
+    const r = await fetchJSON(`/api/events/${id}/intelligence`);
+    const d = r.data;
     _currentLocked = d.locked || false;
     _currentSections = d.sections || [];
     updateLockUI();
@@ -1435,12 +1442,10 @@ function updateExtractProgressFromApi(p) {
 
 async function pollExtractProgress() {
   try {
-    const r = await fetch('/api/pipeline/progress');
-    let p = {};
-    try {
-      p = r.ok ? await r.json() : {};
-    } catch (_) { p = {}; }
-    if (typeof p !== 'object') p = {};
+    // 800ms 폴링: 진행 상태가 그대로면 304 (본문 없음)
+    const r = await fetchJSON('/api/pipeline/progress');
+    let p = r.ok ? r.data : {};
+    if (!p || typeof p !== 'object') p = {};
     if (p.running === true) _extractHasSeenRunning = true;
     updateExtractProgressFromApi(p);
     if (p.running === false && _extractHasSeenRunning) {
@@ -1586,9 +1591,9 @@ async function refreshCompanyBriefings(force = true) {
     btn.innerHTML = '<i class="fas fa-spinner fa-spin mr-1"></i>재생성 중…';
   }
   try {
-    const r = await fetch(`/api/analytics/company-briefings?force=${force ? 'true' : 'false'}`);
+    const r = await fetchJSON(`/api/analytics/company-briefings?force=${force ? 'true' : 'false'}`);
     if (!r.ok) throw new Error('브리핑 API 호출 실패');
-    BRIEFINGS = await r.json();
+    BRIEFINGS = r.data;
     renderCompanyBriefings();
   } catch (e) {
     console.error(e);
@@ -1608,9 +1613,9 @@ async function refreshQualitativeComparison(force = true) {
     btn.innerHTML = '<i class="fas fa-spinner fa-spin mr-1"></i>추론 중…';
   }
   try {
-    const r = await fetch(`/api/analytics/qualitative-comparison?force=${force ? 'true' : 'false'}`);
+    const r = await fetchJSON(`/api/analytics/qualitative-comparison?force=${force ? 'true' : 'false'}`);
     if (!r.ok) throw new Error('정성 비교 API 호출 실패');
-    QUAL_COMPARE = await r.json();
+    QUAL_COMPARE = r.data;
     renderQualitativeComparison();
   } catch (e) {
     console.error(e);
@@ -1662,8 +1667,8 @@ async function openCompareModal() {
   // 각 이벤트의 intelligence 데이터 로드
   const details = await Promise.all(selected.map(async ev => {
     try {
-      const r = await fetch(`/api/events/${ev.id}/intelligence`);
-      return r.ok ? await r.json() : null;
+      const r = await fetchJSON(`/api/events/${ev.id}/intelligence`);
+      return r.ok ? r.data : null;
     } catch { return null; }
   }));
 
@@ -1720,9 +1725,9 @@ async function loadAllEvents() {
   const btn = document.getElementById('btnLoadMore');
   if (btn) { btn.disabled = true; btn.innerHTML = '<i class="fas fa-spinner fa-spin mr-1"></i>로딩 중...'; }
   try {
-    const r = await fetch('/api/events?size=1000');
+    const r = await fetchJSON('/api/events?size=1000&fields=summary&include_total=false');
     if (r.ok) {
-      ALL = await r.json();
+      ALL = r.data;
       ALL_LOADED = true;
       renderEvents();
       populateFilters();
@@ -1747,6 +1752,17 @@ function exportExcel() {
 }
 
 // ============ 유틸 ============
+// ETag 조건부 요청: URL별 직전 응답(ETag+JSON)을 보관하고 If-None-Match로 재검증, 304면 보관본 재사용
+const _ETAG_CACHE = new Map();
+async function fetchJSON(url) {
+  const prev = _ETAG_CACHE.get(url);
+  const r = await fetch(url, {cache: 'no-store', headers: prev ? {'If-None-Match': prev.etag} : {}});
+  if (r.status === 304 && prev) return {ok: true, status: 304, data: prev.data};
+  const data = await r.json().catch(() => ({}));
+  const etag = r.headers.get('ETag');
+  if (r.ok && etag) _ETAG_CACHE.set(url, {etag, data}); else _ETAG_CACHE.delete(url);
+  return {ok: r.ok, status: r.status, data};
+}
 function esc(s) { if(s==null)return''; const d=document.createElement('div'); d.textContent=s; return d.innerHTML; }
 function isActive(e) {
   if (e.status === 'active') return true;
@@ -0,0 +1,44 @@
+"""단위 테스트: 데이터 버전 기반 분석 캐시 (LRU, 무효화, 통계)"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.cache import VersionedCache
+
+
+def test_entry_valid_until_version_changes():
+    cache = VersionedCache(max_entries=4)
+    calls = []
+
+    def build():
+        calls.append(1)
+        return {"n": len(calls)}
+
+    assert cache.get_or_build("k", 1, build) == {"n": 1}
+    assert cache.get_or_build("k", 1, build) == {"n": 1}
+    assert cache.get_or_build("k", 2, build) == {"n": 2}
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["stale"] == 1
+    assert stats["hit_rate"] == round(1 / 3, 3)
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = VersionedCache(max_entries=2)
+    cache.put("a", 1, "A")
+    cache.put("b", 1, "B")
+    assert cache.get("a", 1) == "A"      # a 최근 사용
+    cache.put("c", 1, "C")               # b 제거
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == "A" and cache.get("c", 1) == "C"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 2
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  PASS {name}")
+            except AssertionError as e:
+                print(f"  FAIL {name}: {e}")
+    print("Done.")
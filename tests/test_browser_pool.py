@@ -0,0 +1,193 @@
+"""단위 테스트: 브라우저 풀 page 재사용/폐기, 리소스 차단 프로필"""
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.browser import BrowserPool, NetworkStats, _count_finished, should_block
+
+
+class _FakePage:
+    def __init__(self):
+        self.closed = False
+        self._handlers = {}
+
+    def on(self, event, handler):
+        self._handlers[event] = handler
+
+    def crash(self):
+        self._handlers["crash"](self)
+
+    def is_closed(self):
+        return self.closed
+
+
+class _FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def new_page(self):
+        return _FakePage()
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def is_connected(self):
+        return True
+
+
+class _FakePool(BrowserPool):
+    async def start(self):
+        self._browser = _FakeBrowser()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        return self
+
+    async def new_context(self):
+        return _FakeContext()
+
+
+def test_page_reused_until_max_uses():
+    async def run():
+        pool = _FakePool(size=1, max_uses=2)
+        seen = []
+        for _ in range(3):
+            async with pool.page() as page:
+                seen.append(page)
+        return pool, seen
+
+    pool, seen = asyncio.run(run())
+    assert seen[0] is seen[1]
+    assert seen[2] is not seen[0]
+    assert pool.stats["pages_created"] == 2
+    assert pool.stats["pages_recycled"] == 1
+
+
+def test_page_discarded_on_crash_or_error():
+    async def run():
+        pool = _FakePool(size=1, max_uses=10)
+        async with pool.page() as page:
+            page.crash()
+        first = page
+        try:
+            async with pool.page() as page:
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+        second = page
+        async with pool.page() as page:
+            third = page
+        return pool, first, second, third
+
+    pool, first, second, third = asyncio.run(run())
+    assert first is not second
+    assert second is not third
+    assert pool.stats["pages_crashed"] == 1
+    assert pool.stats["pages_created"] == 3
+
+
+def test_extract_detail_discards_page_on_load_failure():
+    from modules.extraction import extract_detail
+
+    class _FailingPage(_FakePage):
+        async def goto(self, url, **kwargs):
+            raise RuntimeError("net::ERR_CONNECTION_RESET")
+
+    class _FailingContext(_FakeContext):
+        async def new_page(self):
+            return _FailingPage()
+
+    class _FailingPool(_FakePool):
+        async def new_context(self):
+            return _FailingContext()
+
+    pool = _FailingPool(size=1, max_uses=10)
+    result = asyncio.run(extract_detail("https://www.kbcard.com/e/1", wait_sec=0, pool=pool))
+    assert result["raw_text"].startswith("추출 실패")
+    assert pool.stats["pages_recycled"] == 1
+    assert pool._idle == []
+
+
+def test_extract_from_url_without_page_borrows_from_shared_pool(monkeypatch):
+    import detail_extractor
+
+    class _FailingPage(_FakePage):
+        async def goto(self, url, **kwargs):
+            raise RuntimeError("net::ERR_NAME_NOT_RESOLVED")
+
+    class _FailingContext(_FakeContext):
+        async def new_page(self):
+            return _FailingPage()
+
+    class _FailingPool(_FakePool):
+        async def new_context(self):
+            return _FailingContext()
+
+    pool = _FailingPool(size=1, max_uses=10)
+    monkeypatch.setattr(detail_extractor, "get_browser_pool", lambda: pool)
+    result = asyncio.run(detail_extractor.extract_from_url("https://www.kbcard.com/e/1", wait_sec=0))
+    assert result["raw_text"].startswith("로드 실패")
+    assert pool.stats["leases"] == 1 and pool.stats["pages_recycled"] == 1
+    assert pool._idle == []
+
+
+class _FakeRequest:
+    def __init__(self, body, delay):
+        self.body = body
+        self.delay = delay
+
+    async def sizes(self):
+        await asyncio.sleep(self.delay)
+        return {"responseBodySize": self.body, "responseHeadersSize": 0}
+
+
+def test_network_stats_settle_waits_for_pending_bytes():
+    async def run():
+        stats = NetworkStats()
+        for body in (100, 250):
+            stats.track(asyncio.ensure_future(_count_finished(_FakeRequest(body, 0.01), stats)))
+        await stats.settle()
+        settled = stats.bytes
+        # 다음 lease로 reset되면 남은 합산은 취소되어 새 집계에 섞이지 않음
+        stats.track(asyncio.ensure_future(_count_finished(_FakeRequest(999, 0.05), stats)))
+        stats.reset()
+        await asyncio.sleep(0.06)
+        return settled, stats.bytes
+
+    settled, after_reset = asyncio.run(run())
+    assert settled == 350
+    assert after_reset == 0
+
+
+def test_should_block_types_and_analytics_hosts():
+    page = "https://www.samsungcard.com/personal/event/ing/UHPPBE1403M0.jsp?cms_id=1"
+    assert should_block("image", "https://static.samsungcard.com/banner.png", page)
+    assert should_block("font", "https://fonts.gstatic.com/x.woff2", page)
+    assert should_block("script", "https://www.googletagmanager.com/gtm.js", page)
+    assert should_block("script", "https://t1.daumcdn.net/kas/static/ba.min.js", page)
+    assert not should_block("script", "https://t1.daumcdn.net/other.js", page)
+    assert not should_block("document", page, page)
+    assert not should_block("xhr", "https://www.samsungcard.com/api/event", page)
+
+
+def test_should_block_respects_domain_allowlist():
+    allow = {"kbcard.com": ("image", "img.kbcard.com")}
+    kb_page = "https://m.kbcard.com/BON/DVIEW/x.cms"
+    assert not should_block("image", "https://cdn.example.com/a.png", kb_page, allowlist=allow)
+    assert should_block("image", "https://cdn.example.com/a.png", "https://www.hyundaicard.com/", allowlist=allow)
+    assert not should_block("font", "https://img.kbcard.com/f.woff", kb_page, allowlist=allow)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  PASS {name}")
+            except AssertionError as exc:
+                print(f"  FAIL {name}: {exc}")
+                raise
+    print("Done.")
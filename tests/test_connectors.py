@@ -1,12 +1,15 @@
 """단위 테스트: 카드사 커넥터 파싱/정규화 헬퍼"""
+import asyncio
 import sys
 import os
+from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from modules.connectors.base import BaseConnector
 from modules.connectors.hyundai import HyundaiConnector
 from modules.connectors.kb import KBConnector
+from modules.connectors.samsung import SamsungConnector
 from modules.connectors.shinhan import ShinhanConnector
 
 
@@ -76,6 +79,116 @@ def test_kb_parse_events_from_html():
     assert "eventNum=1000096" in events[0].url
 
 
+def test_samsung_classify_html():
+    connector = SamsungConnector()
+    assert connector._classify_html("<p>조회 결과가 없습니다</p>", "u")[0] == "miss"
+    html = "<main><h2>봄맞이 5만원 캐시백</h2><p>2026.03.01~2026.03.31</p></main>"
+    status, event = connector._classify_html(html, "https://x?cms_id=1")
+    assert status == "hit"
+    assert event.period == "2026.03.01~2026.03.31"
+
+
+def test_samsung_scan_keeps_order_and_stops_on_consecutive_miss():
+    connector = SamsungConnector()
+    connector.MAX_CONSECUTIVE_FAIL = 3
+    hits = {1, 2, 5}
+    probed = []
+
+    async def probe(cms_id):
+        probed.append(cms_id)
+        # 뒤 번호가 먼저 끝나도 결과는 cms_id 순서로 소비되어야 함
+        await asyncio.sleep(0.001 * (10 - cms_id % 10))
+        if cms_id in hits:
+            return "hit", cms_id
+        return "miss", None
+
+    events = asyncio.run(connector._scan(probe, range(1, 100), concurrency=2))
+    assert events == [1, 2, 5]
+    assert max(probed) < 20
+
+
+def test_samsung_plan_scan_uses_frontier():
+    connector = SamsungConnector()
+    connector.load_state(None)
+    assert connector._plan_scan(datetime.now())["full"] is True
+
+    now = datetime(2026, 3, 1)
+    connector.load_state({
+        "max_valid_id": 3736000,
+        "valid_ids": [3733100, 3735950, 3736000],
+        "last_recheck_at": (now - timedelta(days=1)).isoformat(),
+    })
+    plan = connector._plan_scan(now)
+    assert plan["recheck"] == []
+    assert plan["lookback"][0] == 3736000 - connector.LOOKBACK_IDS
+    assert 3735950 not in plan["lookback"]
+    assert plan["forward"][0] == 3736001
+
+    connector.state["last_recheck_at"] = (now - timedelta(days=30)).isoformat()
+    assert connector._plan_scan(now)["recheck"] == [3733100]
+
+
+def test_samsung_update_state_tracks_frontier_and_keeps_errors():
+    connector = SamsungConnector()
+    connector.load_state({"max_valid_id": 10, "valid_ids": [7, 10], "dead_ranges": [[1, 9]]})
+    statuses = {11: "miss", 12: "miss", 13: "hit", 5: "hit", 7: "error"}
+    connector._update_state({"full": False}, statuses, datetime(2026, 3, 1))
+    state = connector.dump_state()
+    assert state["max_valid_id"] == 13
+    assert state["valid_ids"] == [5, 7, 10, 13]  # probe 예외(error)는 기존 유효 ID 유지
+    assert "dead_ranges" not in state
+    assert state["last_scan_at"].startswith("2026-03-01")
+
+
+def test_samsung_update_state_caps_tracked_valid_ids(monkeypatch):
+    connector = SamsungConnector()
+    monkeypatch.setattr(SamsungConnector, "MAX_TRACKED_VALID_IDS", 3)
+    connector.load_state({"max_valid_id": 10, "valid_ids": [2, 4, 6, 8, 10]})
+    connector._update_state({"full": False}, {11: "hit", 4: "miss"}, datetime(2026, 3, 1))
+    state = connector.dump_state()
+    assert state["valid_ids"] == [8, 10, 11]  # 오래된 ID부터 제외
+    assert state["max_valid_id"] == 11
+
+
+def test_samsung_scan_records_probe_exception_as_error():
+    connector = SamsungConnector()
+    statuses = {}
+
+    async def probe(cms_id):
+        if cms_id == 2:
+            raise TimeoutError("blip")
+        return "hit", cms_id
+
+    events = asyncio.run(connector._scan(probe, [1, 2, 3], concurrency=2, early_stop=False,
+                                         on_result=statuses.__setitem__))
+    assert events == [1, 3]
+    assert statuses == {1: "hit", 2: "error", 3: "hit"}
+
+
+def test_samsung_state_confirms_only_persisted_hits():
+    connector = SamsungConnector()
+    connector.load_state({"max_valid_id": 10, "valid_ids": [10]})
+    url = lambda i: f"{connector.BASE_DETAIL}{i}"
+    connector._pending_scan = ({"full": False}, {11: "hit", 12: "hit", 13: "miss"},
+                               datetime(2026, 3, 1), None)
+    connector.confirm_persisted({url(11)})  # 12는 limit으로 잘려 저장되지 않음
+    state = connector.dump_state()
+    assert state["valid_ids"] == [10, 11]
+    assert state["max_valid_id"] == 11
+    assert connector._plan_scan(datetime(2026, 3, 1))["forward"][0] == 12
+
+
+def test_samsung_static_html_escalation():
+    connector = SamsungConnector()
+    assert connector._classify_static_html("<p>조회 결과가 없습니다</p>", "u") == ("miss", None, False)
+    # 제목 없는 스크립트 렌더링 페이지 -> 브라우저로 승격
+    shell = "<html><body><div id='app'></div>" + "<script>x()</script>" * 12 + "</body></html>"
+    assert connector._classify_static_html(shell, "u")[2] is True
+    body = "<main><h2>봄맞이 5만원 캐시백</h2><p>" + "혜택 안내 " * 60 + "</p></main>"
+    status, event, escalate = connector._classify_static_html(body, "u")
+    assert status == "hit" and escalate is False
+
+
 if __name__ == "__main__":
     for name, fn in list(globals().items()):
         if name.startswith("test_") and callable(fn):
@@ -0,0 +1,79 @@
+"""단위 테스트: 상세 페이지 적응형 준비 대기"""
+import asyncio
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import detail_extractor
+from detail_extractor import _scroll_until_stable, _wait_for_content_ready
+
+
+class _FakePage:
+    """evaluate 호출마다 미리 정한 (본문 길이, 높이)를 차례로 돌려준다. 마지막 값은 유지."""
+
+    def __init__(self, measures):
+        self.measures = list(measures)
+        self.scrolls = 0
+
+    async def evaluate(self, script, *args):
+        if script.startswith("window.scrollTo"):
+            self.scrolls += 1
+            return None
+        if len(self.measures) > 1:
+            return self.measures.pop(0)
+        return self.measures[0]
+
+
+def _fast_timing(monkeypatch):
+    monkeypatch.setattr(detail_extractor, "READY_POLL_SEC", 0.01)
+    monkeypatch.setattr(detail_extractor, "READY_QUIET_SEC", 0.03)
+    monkeypatch.setattr(detail_extractor, "SCROLL_MAX_WAIT_SEC", 0.1)
+
+
+def test_ready_returns_early_once_content_is_stable(monkeypatch):
+    _fast_timing(monkeypatch)
+    page = _FakePage([(0, 500), (120, 900), (400, 1200)])
+    waited = asyncio.run(_wait_for_content_ready(page, "samsungcard.com", max_wait=3))
+    assert waited < 1
+
+
+def test_ready_caps_at_max_wait_when_body_stays_empty(monkeypatch):
+    _fast_timing(monkeypatch)
+    page = _FakePage([(0, 500)])
+    waited = asyncio.run(_wait_for_content_ready(page, "samsungcard.com", max_wait=0.1))
+    assert 0.08 <= waited < 0.5
+
+
+def test_scroll_stops_when_height_stops_growing(monkeypatch):
+    _fast_timing(monkeypatch)
+    page = _FakePage([(400, 1200)])
+    asyncio.run(_scroll_until_stable(page, "samsungcard.com"))
+    assert page.scrolls == 1
+
+
+def test_domain_key_matches_selector_table():
+    assert detail_extractor._detect_domain_key(
+        "https://www.samsungcard.com/personal/event/ing/UHPPBE1403M0.jsp?cms_id=1") == "samsungcard.com"
+    assert detail_extractor._detect_domain_key("https://m.kbcard.com/BON/DVIEW/x.cms") == "kbcard.com"
+
+
+class _FakeFrame:
+    def __init__(self, measures):
+        self.measures = list(measures)
+
+    async def evaluate(self, script, *args):
+        if len(self.measures) > 1:
+            return self.measures.pop(0)
+        return self.measures[0]
+
+
+def test_kb_iframe_content_counts_toward_readiness():
+    page = _FakePage([(300, 800)])
+    page.main_frame = object()
+    # iframe 본문이 늦게 채워지면 그 전까지는 미준비(본문 0)로 측정
+    page.frames = [page.main_frame, _FakeFrame([(0, 0), (0, 0), (900, 2000)])]
+    measure = detail_extractor._measure_content
+    assert asyncio.run(measure(page, "kbcard.com")) == (0, 800)
+    assert asyncio.run(measure(page, "kbcard.com")) == (0, 800)
+    assert asyncio.run(measure(page, "kbcard.com")) == (1200, 2800)
+    # iframe을 쓰지 않는 도메인은 frame 무시
+    assert asyncio.run(measure(page, "samsungcard.com")) == (300, 800)
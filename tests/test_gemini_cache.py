@@ -0,0 +1,79 @@
+"""단위 테스트: Gemini 응답 캐시 (키 구성, LRU 제거)"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import database as db
+import gemini_insight
+
+
+def _memory_session():
+    engine = create_engine("sqlite://")
+    db.GeminiResponseCache.__table__.create(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_cache_key_depends_on_model_template_version_and_prompt(monkeypatch):
+    cfg = {"temperature": 0.2}
+    base = gemini_insight._cache_key("m1", "enrich", "prompt", cfg)
+    assert base == gemini_insight._cache_key("m1", "enrich", "prompt", dict(cfg))
+    assert base != gemini_insight._cache_key("m2", "enrich", "prompt", cfg)
+    assert base != gemini_insight._cache_key("m1", "enrich", "prompt!", cfg)
+    assert base != gemini_insight._cache_key("m1", "company_brief", "prompt", cfg)
+    monkeypatch.setitem(gemini_insight.PROMPT_TEMPLATE_VERSIONS, "enrich", "v-next")
+    assert base != gemini_insight._cache_key("m1", "enrich", "prompt", cfg)
+
+
+def test_cache_hit_updates_lru_and_evicts_oldest():
+    session = _memory_session()
+    for i in range(3):
+        db.save_gemini_response(session, f"k{i}", "m", "enrich:v1", f"text{i}", max_entries=3)
+    # k0을 최근 사용으로 만들고 나머지는 과거로
+    old = datetime.now() - timedelta(minutes=5)
+    session.query(db.GeminiResponseCache).update({"last_used_at": old})
+    session.commit()
+    assert db.get_cached_gemini_response(session, "k0") == "text0"
+
+    evicted = db.save_gemini_response(session, "k3", "m", "enrich:v1", "text3", max_entries=3)
+    assert evicted == 1
+    keys = {r.cache_key for r in session.query(db.GeminiResponseCache).all()}
+    assert "k0" in keys and "k3" in keys and len(keys) == 3
+    assert db.get_cached_gemini_response(session, "missing") is None
+    assert db.get_gemini_cache_summary(session)["stored_hits"] == 1
+
+
+def test_cache_hit_touches_at_most_once_per_interval():
+    session = _memory_session()
+    db.save_gemini_response(session, "k", "m", "enrich:v1", "text")
+    old = datetime.now() - timedelta(minutes=5)
+    session.query(db.GeminiResponseCache).update({"last_used_at": old})
+    session.commit()
+    for _ in range(3):
+        assert db.get_cached_gemini_response(session, "k", touch_interval_sec=60) == "text"
+    assert db.get_gemini_cache_summary(session)["stored_hits"] == 1
+
+
+def test_only_validated_responses_are_cached(monkeypatch):
+    session = _memory_session()
+    factory = lambda: session
+    monkeypatch.setattr(db, "SessionLocal", factory)
+    monkeypatch.setattr(session, "close", lambda: None)
+    cfg = {"temperature": 0.2}
+    valid = lambda text: gemini_insight._loads_json(text) is not None
+
+    gemini_insight._cache_store("enrich", "p", cfg, "m", '{"one_line_summary": "잘린 응', validate=valid)
+    gemini_insight._cache_store("enrich", "p", cfg, "m", '{"ok": 1}')  # validate 없으면 저장 안 함
+    assert session.query(db.GeminiResponseCache).count() == 0
+
+    gemini_insight._cache_store("enrich", "p", cfg, "m", '{"ok": 1}', validate=valid)
+    assert gemini_insight._cache_lookup("enrich", "p", cfg, model_name="m", validate=valid) == '{"ok": 1}'
+
+    # 이전에 저장된 불량 응답은 조회 시 검증 실패로 제거되고 미스 처리
+    key = gemini_insight._cache_key("m", "enrich", "p2", cfg)
+    db.save_gemini_response(session, key, "m", "enrich:v1", "not json")
+    assert gemini_insight._cache_lookup("enrich", "p2", cfg, model_name="m", validate=valid) is None
+    assert session.query(db.GeminiResponseCache).filter_by(cache_key=key).count() == 0
@@ -0,0 +1,208 @@
+"""단위 테스트: Gemini 요청 슬롯 limiter (sync/async 공용 판정)"""
+import asyncio
+import time
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import deque
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import database as db
+import gemini_insight
+
+
+def _reset_limiter(monkeypatch, rpm=1, window=60, max_wait=180.0, mode="wait"):
+    monkeypatch.setattr(gemini_insight, "GEMINI_MAX_RPM", rpm)
+    monkeypatch.setattr(gemini_insight, "GEMINI_WINDOW_SEC", window)
+    monkeypatch.setattr(gemini_insight, "GEMINI_MAX_WAIT_SEC", max_wait)
+    monkeypatch.setattr(gemini_insight, "GEMINI_RATE_MODE", mode)
+    monkeypatch.setattr(gemini_insight, "GEMINI_SHARED_LIMITER", False)
+    monkeypatch.setattr(gemini_insight, "_request_timestamps", deque())
+    monkeypatch.setattr(gemini_insight, "_cooldown_until", 0.0)
+    monkeypatch.setattr(gemini_insight, "_last_interactive_at", None)
+    monkeypatch.setattr(gemini_insight, "_lane_stats", {
+        lane: {"waiting": 0, "requests": 0, "granted": 0, "rejected": 0, "wait_total_sec": 0.0, "wait_max_sec": 0.0}
+        for lane in (gemini_insight.LANE_INTERACTIVE, gemini_insight.LANE_BACKGROUND)
+    })
+
+
+def test_reserve_slot_returns_wait_when_window_full(monkeypatch):
+    _reset_limiter(monkeypatch, rpm=1, window=60)
+    assert gemini_insight._reserve_request_slot() == 0.0
+    assert gemini_insight._reserve_request_slot() > 59
+
+
+def test_async_acquire_does_not_block_event_loop(monkeypatch):
+    _reset_limiter(monkeypatch, rpm=1, window=1)
+    gemini_insight._reserve_request_slot()
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.monotonic()
+        ok = await gemini_insight._aacquire_request_slot(allow_wait=True)
+        elapsed = time.monotonic() - started
+        task.cancel()
+        return ok, elapsed, ticks
+
+    ok, elapsed, ticks = asyncio.run(run())
+    assert ok
+    assert elapsed >= 0.9
+    assert ticks >= 10
+
+
+def test_async_acquire_gives_up_beyond_max_wait(monkeypatch):
+    _reset_limiter(monkeypatch, rpm=1, window=60, max_wait=1.0)
+    gemini_insight._reserve_request_slot()
+    assert asyncio.run(gemini_insight._aacquire_request_slot(allow_wait=True)) is False
+    assert asyncio.run(gemini_insight._aacquire_request_slot(allow_wait=False)) is False
+
+
+def _memory_engine(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    db.RateLimitState.__table__.create(bind=engine)
+    monkeypatch.setattr(db, "engine", engine)
+    return engine
+
+
+def test_shared_bucket_refills_at_rpm(monkeypatch):
+    _memory_engine(monkeypatch)
+    # 용량 2, 분당 6회 -> 10초에 1토큰
+    assert db.take_rate_token("t", 2, 0.1, now=1000.0) == 0
+    assert db.take_rate_token("t", 2, 0.1, now=1000.0) == 0
+    assert abs(db.take_rate_token("t", 2, 0.1, now=1000.0) - 10.0) < 1e-6
+    assert db.take_rate_token("t", 2, 0.1, now=1010.0) == 0
+    # 오래 쉬어도 용량 이상 쌓이지 않음
+    assert db.take_rate_token("t", 2, 0.1, now=5000.0) == 0
+    assert db.take_rate_token("t", 2, 0.1, now=5000.0) == 0
+    assert db.take_rate_token("t", 2, 0.1, now=5000.0) > 0
+
+
+def test_shared_cooldown_blocks_all_callers(monkeypatch):
+    _memory_engine(monkeypatch)
+    now = time.time()
+    db.set_rate_cooldown("t", now + 30, capacity=5)
+    wait_for = db.take_rate_token("t", 5, 1.0, now=now)
+    assert 29 < wait_for <= 30
+    assert db.take_rate_token("t", 5, 1.0, now=now + 31) == 0
+
+
+def test_background_lane_leaves_interactive_reserve(monkeypatch):
+    _memory_engine(monkeypatch)
+    # 용량 3, 예약 1: 최근 interactive 요청이 있으면 background는 예약분을 남기고, interactive는 예약분 사용 가능
+    assert db.take_rate_token("t", 3, 0.1, now=1000.0, interactive=True) == 0
+    assert db.take_rate_token("t", 3, 0.1, now=1000.0, reserve=1, reserve_hold_sec=60) == 0
+    assert db.take_rate_token("t", 3, 0.1, now=1000.0, reserve=1, reserve_hold_sec=60) > 0
+    assert db.take_rate_token("t", 3, 0.1, now=1000.0, interactive=True) == 0
+    assert db.take_rate_token("t", 3, 0.1, now=1000.0, interactive=True) > 0
+
+
+def test_shared_bucket_background_uses_full_capacity_when_interactive_idle(monkeypatch):
+    _memory_engine(monkeypatch)
+    # interactive 요청이 없었으면 예약 없이 용량 전체
+    assert db.take_rate_token("t", 2, 0.1, now=1000.0, reserve=1, reserve_hold_sec=60) == 0
+    assert db.take_rate_token("t", 2, 0.1, now=1000.0, reserve=1, reserve_hold_sec=60) == 0
+    # interactive 대기(거절 포함)가 기록되면 background는 예약분을 남긴다
+    assert db.take_rate_token("t", 2, 0.1, now=1000.0, interactive=True) > 0
+    assert db.take_rate_token("t", 2, 0.1, now=1020.0, reserve=1, reserve_hold_sec=60) == 0
+    assert db.take_rate_token("t", 2, 0.1, now=1020.0, reserve=1, reserve_hold_sec=60) > 0
+    # HOLD가 지나면 다시 용량 전체
+    assert db.take_rate_token("t", 2, 0.1, now=1100.0, reserve=1, reserve_hold_sec=60) == 0
+    assert db.take_rate_token("t", 2, 0.1, now=1100.0, reserve=1, reserve_hold_sec=60) == 0
+
+
+def test_lane_stats_track_depth_and_rejections(monkeypatch):
+    _reset_limiter(monkeypatch, rpm=4, window=60, mode="wait")
+    monkeypatch.setattr(gemini_insight, "GEMINI_INTERACTIVE_SHARE", 0.5)
+    bg, ia = gemini_insight.LANE_BACKGROUND, gemini_insight.LANE_INTERACTIVE
+    assert gemini_insight._acquire_request_slot(allow_wait=False, lane=ia)
+    # 최근 interactive 요청 -> RPM 4 중 2는 interactive 예약: background 두 번째는 거절, interactive는 통과
+    assert gemini_insight._acquire_request_slot(allow_wait=False, lane=bg)
+    assert not gemini_insight._acquire_request_slot(allow_wait=False, lane=bg)
+    assert gemini_insight._acquire_request_slot(allow_wait=False, lane=ia)
+
+    stats = gemini_insight.get_lane_stats()
+    assert stats[bg]["granted"] == 1 and stats[bg]["rejected"] == 1
+    assert stats[ia]["granted"] == 2
+    assert stats[bg]["waiting"] == 0 and stats[ia]["waiting"] == 0
+
+
+def test_background_uses_full_local_window_when_interactive_idle(monkeypatch):
+    _reset_limiter(monkeypatch, rpm=5, window=60, mode="wait")
+    monkeypatch.setattr(gemini_insight, "GEMINI_INTERACTIVE_SHARE", 0.5)
+    monkeypatch.setattr(gemini_insight, "GEMINI_INTERACTIVE_HOLD_SEC", 60.0)
+    bg = gemini_insight.LANE_BACKGROUND
+    assert all(gemini_insight._reserve_local_slot(bg) == 0 for _ in range(5))
+    assert gemini_insight._reserve_local_slot(bg) > 0
+
+    # 오래전 interactive 요청은 예약을 만들지 않는다
+    _reset_limiter(monkeypatch, rpm=5, window=60, mode="wait")
+    monkeypatch.setattr(gemini_insight, "_last_interactive_at", time.monotonic() - 3600)
+    assert all(gemini_insight._reserve_local_slot(bg) == 0 for _ in range(5))
+
+
+def test_interactive_waiting_holds_whole_window_at_capacity_one(monkeypatch):
+    _reset_limiter(monkeypatch, rpm=1, window=60, mode="wait")
+    monkeypatch.setattr(gemini_insight, "GEMINI_INTERACTIVE_SHARE", 0.5)
+    monkeypatch.setattr(gemini_insight, "GEMINI_INTERACTIVE_HOLD_SEC", 60.0)
+    gemini_insight._lane_enter(gemini_insight.LANE_INTERACTIVE)  # interactive 대기 중
+    assert gemini_insight._reserve_local_slot(gemini_insight.LANE_BACKGROUND) > 0
+    assert gemini_insight._reserve_local_slot(gemini_insight.LANE_INTERACTIVE) == 0
+
+
+def test_async_shared_limiter_runs_db_off_event_loop(monkeypatch):
+    _reset_limiter(monkeypatch)
+    monkeypatch.setattr(gemini_insight, "GEMINI_SHARED_LIMITER", True)
+
+    def slow_take(*args, **kwargs):
+        time.sleep(0.3)  # busy_timeout 대기 중인 SQLite 쓰기 트랜잭션 흉내
+        return 0.0
+
+    monkeypatch.setattr(db, "take_rate_token", slow_take)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        ok = await gemini_insight._aacquire_request_slot(allow_wait=False)
+        task.cancel()
+        return ok, ticks
+
+    ok, ticks = asyncio.run(run())
+    assert ok
+    assert ticks >= 5
+
+
+def test_sync_wrapper_runs_async_generator_inside_and_outside_loop(monkeypatch):
+    _reset_limiter(monkeypatch, rpm=10)
+    monkeypatch.setattr(gemini_insight, "GEMINI_CACHE_ENABLED", False)
+
+    class FakeModel:
+        def generate_content(self, prompt, generation_config=None):
+            return type("Response", (), {"text": f" {prompt} "})()
+
+        async def generate_content_async(self, prompt, generation_config=None):
+            raise AssertionError("동기 래퍼의 임시 루프에서는 aio 클라이언트를 쓰지 않는다")
+
+    monkeypatch.setattr(gemini_insight, "_get_model", lambda: FakeModel())
+    assert gemini_insight._generate_text_with_gemini("outside", {}, allow_wait=False) == "outside"
+
+    async def inside():
+        return gemini_insight._generate_text_with_gemini("inside", {}, allow_wait=False)
+
+    assert asyncio.run(inside()) == "inside"
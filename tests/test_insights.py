@@ -2,7 +2,14 @@
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from modules.insights import generate_rule_insight, _infer_objective_tags, _calc_section_coverage
+import asyncio
+import json
+
+import gemini_insight
+from gemini_insight import _parse_enrich_batch_response, compact_event_context
+from modules.insights import (
+    agenerate_hybrid_insights_batch, generate_rule_insight, _infer_objective_tags, _calc_section_coverage,
+)
 
 
 def test_rule_insight_basic():
@@ -35,6 +42,180 @@ def test_section_coverage_empty():
     assert _calc_section_coverage({"marketing_content": {}}) == 0.0
 
 
+def _gemini_item(event_id, **extra):
+    item = {"event_id": event_id, "one_line_summary": "요약", "category": "쇼핑",
+            "threat_level": "Mid", "benefit_level": "보통"}
+    item.update(extra)
+    return item
+
+
+def test_batch_response_validates_each_item():
+    text = "```json\n" + json.dumps([
+        _gemini_item(1),
+        _gemini_item(2, threat_level=""),   # 필수 필드 누락 -> 해당 건만 실패
+        _gemini_item(99),                    # 요청하지 않은 id는 무시
+    ], ensure_ascii=False) + "\n```"
+    parsed = _parse_enrich_batch_response(text, [1, 2, 3])
+    assert parsed[1]["category"] == "쇼핑"
+    assert parsed[2] is None
+    assert parsed[3] is None
+    assert 99 not in parsed
+
+
+def test_batch_response_survives_truncated_tail():
+    good = json.dumps(_gemini_item(1), ensure_ascii=False)
+    text = f'[{good}, {{"event_id": 2, "one_line_summary": "잘린 응답'
+    parsed = _parse_enrich_batch_response(text, [1, 2])
+    assert parsed[1] is not None
+    assert parsed[2] is None
+
+
+def test_batch_hybrid_falls_back_to_rule_per_item(monkeypatch):
+    async def fake_batch(items):
+        return {1: _gemini_item(1), 2: None}
+
+    monkeypatch.setattr(gemini_insight, "aenrich_batch_with_gemini", fake_batch)
+    items = [(1, {"title": "A", "raw_text": "신규 가입"}, "삼성카드"),
+             (2, {"title": "B", "raw_text": "앱 결제"}, "KB국민카드")]
+    results = asyncio.run(agenerate_hybrid_insights_batch(items))
+    assert results[1][1] == "gemini"
+    assert results[1][0]["category"] == "쇼핑"
+    assert results[2][1] == "rule"
+
+
+def test_compaction_dedupes_sections_against_raw_text():
+    raw = "\n".join([
+        "해외 호텔 30만원 이상 결제 시 5만원 캐시백",
+        "해외 호텔 30만원 이상 결제 시 5만원 캐시백 제공",
+        "로그인 | 회원가입 | 고객센터",
+    ] * 3)
+    extracted = {
+        "title": "여름 여행 이벤트",
+        "raw_text": raw,
+        "marketing_content": {"혜택_상세": ["해외 호텔 30만원 이상 결제 시 5만원 캐시백"]},
+    }
+    body, stats = compact_event_context(extracted, budget_tokens=500)
+    assert body.count("5만원 캐시백") == 1
+    assert body.startswith("[혜택_상세]")
+    assert stats["tokens_after"] < stats["tokens_before"]
+
+
+def test_compaction_keeps_high_signal_lines_within_budget():
+    filler = [f"일반 안내 문구 번호 {i} 입니다" for i in range(30)]
+    extracted = {"raw_text": "\n".join(filler + ["최대 10% 청구할인, 선착순 1만명"])}
+    body, stats = compact_event_context(extracted, budget_tokens=40)
+    assert "최대 10% 청구할인" in body
+    assert stats["tokens_after"] <= 40
+
+
+def _full_item(event_id=None, **extra):
+    item = _gemini_item(event_id, threat_reason="이유", benefit_detail="5% 할인",
+                        target_profile="2030", conditions_summary="전월 30만원")
+    if event_id is None:
+        item.pop("event_id")
+    item.update(extra)
+    return item
+
+
+def _route_fake(monkeypatch, responses, candidates=("fast", "strong")):
+    """
+    모델명별 응답을 돌려주는 가짜 generate. 호출된 모델 순서를 기록.
+    응답이 문자열 상태("model_unavailable", "no_slot" 등)면 텍스트 없이 그 outcome을 돌려준다.
+    """
+    calls = []
+
+    async def fake_generate(prompt, generation_config, max_attempts, allow_wait,
+                            template=None, lane=None, model_name=None, validate=None, outcome=None):
+        calls.append(model_name)
+        response = responses[model_name]
+        if isinstance(response, str):
+            outcome["status"] = response
+            return None
+        outcome["status"] = "ok"
+        return json.dumps(response, ensure_ascii=False)
+
+    monkeypatch.setattr(gemini_insight, "_MODEL_CANDIDATES", list(candidates))
+    monkeypatch.setattr(gemini_insight, "_unavailable_models", set())
+    monkeypatch.setattr(gemini_insight, "GEMINI_ROUTING_MODE", "cascade")
+    monkeypatch.setattr(gemini_insight, "_agenerate_text_with_gemini", fake_generate)
+    monkeypatch.setattr(gemini_insight, "_routing_stats",
+                        {"routed": 0, "escalated": 0, "no_response": 0, "reasons": {}})
+    return calls
+
+
+def test_routing_keeps_confident_fast_answer(monkeypatch):
+    calls = _route_fake(monkeypatch, {"fast": _full_item(), "strong": _full_item(category="여행")})
+    result = asyncio.run(gemini_insight.aenrich_with_gemini({"title": "A", "raw_text": "5% 할인"}))
+    assert calls == ["fast"]
+    assert result["category"] == "쇼핑"
+    assert gemini_insight._routing_stats["escalated"] == 0
+
+
+def test_routing_escalates_on_schema_and_empty_fields(monkeypatch):
+    calls = _route_fake(monkeypatch, {"fast": _full_item(threat_level="Severe"),
+                                      "strong": _full_item(category="여행")})
+    result = asyncio.run(gemini_insight.aenrich_with_gemini({"title": "A", "raw_text": "5% 할인"}))
+    assert calls == ["fast", "strong"]
+    assert result["category"] == "여행"
+
+    calls = _route_fake(monkeypatch, {"fast": _full_item(benefit_detail=""), "strong": {"oops": 1}})
+    result = asyncio.run(gemini_insight.aenrich_with_gemini({"title": "A", "raw_text": "5% 할인"}))
+    assert calls == ["fast", "strong"]
+    assert result["category"] == "쇼핑"  # 상위 모델이 스키마 위반이면 1차 결과 유지
+    assert gemini_insight._routing_stats["reasons"] == {"empty_fields": 1}
+
+
+def test_routing_escalates_only_disagreeing_batch_items(monkeypatch):
+    # rule은 "최대 50만원 캐시백"을 높음으로 보는데 fast 모델은 1번을 낮음으로 판단
+    calls = _route_fake(monkeypatch, {
+        "fast": [_full_item(1, benefit_level="낮음"), _full_item(2)],
+        "strong": [_full_item(1, benefit_level="높음")],
+    })
+    items = [(1, {"title": "A", "raw_text": "최대 50만원 캐시백"}, "삼성카드"),
+             (2, {"title": "B", "raw_text": "앱 결제 안내"}, "KB국민카드")]
+    results = asyncio.run(gemini_insight.aenrich_batch_with_gemini(items))
+    assert calls == ["fast", "strong"]
+    assert results[1]["benefit_level"] == "높음"
+    assert results[2]["benefit_level"] == "보통"
+    stats = gemini_insight._routing_stats
+    assert stats["routed"] == 2 and stats["escalated"] == 1
+    assert stats["reasons"] == {"rule_disagreement": 1}
+
+
+def test_routing_fails_over_unavailable_model_without_escalation(monkeypatch):
+    # 1차 모델이 폐기(404)되면 다음 후보로 넘어가고, 스키마 에스컬레이션으로 오인하지 않는다
+    calls = _route_fake(monkeypatch, {"retired": "model_unavailable", "mid": _full_item(),
+                                      "strong": _full_item(category="여행")},
+                        candidates=("retired", "mid", "strong"))
+    result = asyncio.run(gemini_insight.aenrich_with_gemini({"title": "A", "raw_text": "5% 할인"}))
+    assert calls == ["retired", "mid"]
+    assert result["category"] == "쇼핑"
+    assert gemini_insight._routing_stats["escalated"] == 0
+    assert gemini_insight._unavailable_models == {"retired"}
+
+    # 이후 호출은 사용 불가 모델을 건너뛴다
+    calls.clear()
+    asyncio.run(gemini_insight.aenrich_with_gemini({"title": "B", "raw_text": "5% 할인"}))
+    assert calls == ["mid"]
+
+
+def test_routing_does_not_escalate_without_slot(monkeypatch):
+    calls = _route_fake(monkeypatch, {"fast": "no_slot", "strong": _full_item()})
+    assert asyncio.run(gemini_insight.aenrich_with_gemini({"title": "A", "raw_text": "5% 할인"})) is None
+    items = [(1, {"title": "A", "raw_text": "5% 할인"}, "삼성카드")]
+    assert asyncio.run(gemini_insight.aenrich_batch_with_gemini(items)) == {1: None}
+    assert calls == ["fast", "fast"]
+    stats = gemini_insight._routing_stats
+    assert stats["no_response"] == 2 and stats["escalated"] == 0 and stats["reasons"] == {}
+
+
+def test_disagreement_uses_only_rule_benefit_level():
+    # rule dict에 threat_level이 있어도 비교하지 않는다 (rule 엔진은 혜택 수준만 산출)
+    rule = {"benefit_level": "높음", "threat_level": "Low"}
+    assert gemini_insight._disagrees_with_rule({"benefit_level": "높음", "threat_level": "High"}, rule) is False
+    assert gemini_insight._disagrees_with_rule({"benefit_level": "낮음", "threat_level": "Medium"}, rule) is True
+
+
 if __name__ == "__main__":
     for name, fn in list(globals().items()):
         if name.startswith("test_") and callable(fn):
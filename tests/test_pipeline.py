@@ -0,0 +1,263 @@
+"""단위 테스트: 파이프라인 헬퍼"""
+import asyncio
+import sys, os
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import database as db
+from modules import pipeline
+from modules.pipeline import _domain_of
+
+
+def test_domain_of_card_company():
+    assert _domain_of("https://www.samsungcard.com/personal/event/ing/UHPPBE1403M0.jsp?cms_id=1") == "samsungcard.com"
+    assert _domain_of("https://m.kbcard.com/BON/DVIEW/x.cms?eventNum=1") == "kbcard.com"
+
+
+def test_domain_of_unknown_host():
+    assert _domain_of("https://example.com/evt") == "example.com"
+    assert _domain_of("") == ""
+
+
+def _memory_db(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    db.Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(db, "SessionLocal", factory)
+    return factory
+
+
+def test_bulk_insert_skips_known_and_duplicate_urls(monkeypatch):
+    factory = _memory_db(monkeypatch)
+    session = factory()
+    db.insert_event(session, {"url": "https://www.kbcard.com/e0", "company": "KB국민카드", "title": "기존"})
+    batch = [{"url": f"https://www.kbcard.com/e{n}", "company": "KB국민카드", "title": f"이벤트{n}",
+              "period": "2026.01.01 ~ 2026.12.31"} for n in range(3)]
+    batch.append(dict(batch[1]))          # 배치 내 중복
+    batch.append({"company": "KB국민카드", "title": "URL 없음"})
+
+    assert db.insert_events_bulk(session, batch) == {"inserted": 2, "skipped": 3}
+    assert db.insert_events_bulk(session, batch) == {"inserted": 0, "skipped": 5}
+    event = session.query(db.CardEvent).filter(db.CardEvent.url == "https://www.kbcard.com/e1").one()
+    assert event.period_end is not None and event.created_at is not None
+    session.close()
+
+
+def test_persist_enrichment_result_is_all_or_nothing(monkeypatch):
+    factory = _memory_db(monkeypatch)
+    session = factory()
+    event_id = db.insert_event(session, {"url": "https://www.kbcard.com/e0", "company": "KB국민카드", "title": "원래"})
+    job_id = db.create_job(session, "extract", event_id=event_id, status="running")
+
+    try:
+        db.persist_enrichment_result(session, event_id, update_data={"title": "변경"},
+                                     sections={"혜택_상세": ["5% 할인"]}, insight_data={"benefit_level": "보통"},
+                                     snapshot={"bogus_field": 1}, job_id=job_id, job_status="success")
+    except TypeError:
+        pass
+    session.expire_all()
+    assert db.get_event_by_id(session, event_id).title == "원래"
+    assert db.get_sections(session, event_id) == []
+    assert db.get_latest_insight(session, event_id) is None
+
+    assert db.persist_enrichment_result(session, event_id, update_data={"title": "변경"},
+                                        sections={"혜택_상세": ["5% 할인"]}, insight_data={"benefit_level": "보통"},
+                                        snapshot={"raw_text": "본문"}, job_id=job_id, job_status="success",
+                                        enqueue=True)
+    session.expire_all()
+    assert db.get_event_by_id(session, event_id).title == "변경"
+    assert len(db.get_sections(session, event_id)) == 1
+    assert len(db.get_snapshots(session, event_id)) == 1
+    assert db.get_jobs(session)[0].status == "success"
+    assert db.get_enrichment_queue_stats(session)["pending"] == 1
+    assert not db.persist_enrichment_result(session, 999, update_data={"title": "x"})
+    session.close()
+
+
+def test_visibility_flag_maintained_on_write_and_backfill(monkeypatch):
+    factory = _memory_db(monkeypatch)
+    session = factory()
+    hidden = db.insert_event(session, {"url": "https://www.kbcard.com/e0", "company": "KB국민카드",
+                                       "title": "정보 없음"})
+    shown = db.insert_event(session, {"url": "https://www.kbcard.com/e1", "company": "KB국민카드",
+                                      "title": "주유 할인", "period": "2026.01.01 ~ 2026.12.31"})
+    db.insert_events_bulk(session, [{"url": "https://www.kbcard.com/e2", "company": "KB국민카드", "title": "-"}])
+    assert [e.id for e in db.get_all_events(session)] == [shown]
+
+    db.update_event(session, hidden, {"title": "여행 캐시백", "period": "2026.03.01 ~ 2026.03.31"})
+    assert {e.id for e in db.get_all_events(session)} == {hidden, shown}
+
+    session.query(db.CardEvent).update({db.CardEvent.is_visible: None})
+    session.commit()
+    assert db.backfill_visibility() == 3
+    session.expire_all()
+    assert {e.id for e in db.get_all_events(session)} == {hidden, shown}
+    session.close()
+
+
+def test_list_events_keyset_pages_cover_all_rows(monkeypatch):
+    from datetime import datetime
+    factory = _memory_db(monkeypatch)
+    session = factory()
+    same_ts = datetime(2026, 5, 1, 9, 0, 0)
+    db.insert_events_bulk(session, [
+        {"url": f"https://www.kbcard.com/e{n}", "company": "KB국민카드" if n % 2 else "삼성카드",
+         "title": f"이벤트{n}", "period": "2026.01.01 ~ 2026.12.31",
+         "created_at": same_ts if n < 4 else datetime(2026, 5, 2, 9, 0, n)}
+        for n in range(7)
+    ])
+    seen, cursor = [], None
+    while True:
+        rows, cursor = db.list_events(session, limit=3, cursor=cursor)
+        seen.extend(r.id for r in rows)
+        if not cursor:
+            break
+    assert seen == [e.id for e in sorted(session.query(db.CardEvent).all(),
+                                         key=lambda e: (e.created_at, e.id), reverse=True)]
+    assert db.count_events(session, {"company": "KB국민카드"}) == 3
+    rows, cursor = db.list_events(session, {"company": "KB국민카드"}, limit=5)
+    assert len(rows) == 3 and cursor is None
+    try:
+        db.list_events(session, cursor="!!")
+        assert False, "잘못된 커서는 ValueError"
+    except ValueError:
+        pass
+    session.close()
+
+
+def test_list_events_projection_skips_heavy_columns(monkeypatch):
+    import json
+    factory = _memory_db(monkeypatch)
+    session = factory()
+    insights = {"benefit_level": "높음", "objective_tags": ["신규"], "threat_reason": "긴 설명" * 100}
+    db.insert_events_bulk(session, [
+        {"url": "https://www.kbcard.com/e0", "company": "KB국민카드", "title": "주유 할인",
+         "period": "2026.01.01 ~ 2026.12.31", "raw_text": "본문" * 500,
+         "marketing_insights": json.dumps(insights, ensure_ascii=False)},
+        {"url": "https://www.kbcard.com/e1", "company": "KB국민카드", "title": "여행 캐시백",
+         "period": "2026.01.01 ~ 2026.12.31", "marketing_insights": "깨진 JSON"},
+    ])
+    rows, _ = db.list_events(session, fields="summary")
+    by_title = {r["title"]: r for r in rows}
+    assert "raw_text" not in by_title["주유 할인"]
+    assert json.loads(by_title["주유 할인"]["marketing_insights"]) == {"benefit_level": "높음", "objective_tags": ["신규"]}
+    assert by_title["주유 할인"]["extracted"] is True
+    assert by_title["여행 캐시백"]["marketing_insights"] is None
+    assert by_title["여행 캐시백"]["extracted"] is False
+
+    rows, cursor = db.list_events(session, limit=1, fields=["title"])
+    assert set(rows[0]) == {"id", "title"} and cursor
+    rows, _ = db.list_events(session, limit=1, cursor=cursor, fields=["title"])
+    assert len(rows) == 1
+    try:
+        db.list_events(session, fields=["nope"])
+        assert False, "모르는 필드는 ValueError"
+    except ValueError:
+        pass
+    session.close()
+
+
+def test_data_version_bumps_on_writes(monkeypatch):
+    factory = _memory_db(monkeypatch)
+    session = factory()
+    assert db.get_data_version(session) == 0
+    event_id = db.insert_event(session, {"url": "https://www.kbcard.com/e0", "company": "KB국민카드", "title": "이벤트"})
+    other_id = db.insert_event(session, {"url": "https://www.kbcard.com/e1", "company": "KB국민카드", "title": "삭제"})
+
+    writes = [
+        lambda: db.update_event(session, event_id, {"title": "수정"}),
+        lambda: db.save_insight(session, event_id, {"benefit_level": "보통"}),
+        lambda: db.save_manual_edit(session, event_id, "title", "수정", "수동"),
+        lambda: db.lock_event(session, event_id),
+        lambda: db.delete_event(session, other_id),
+    ]
+    for write in writes:
+        before = db.get_data_version(session)
+        write()
+        assert db.get_data_version(session) > before
+
+    before = db.get_data_version(session)
+    db.insert_events_bulk(session, [{"url": "https://www.kbcard.com/e0", "company": "KB국민카드", "title": "중복"}])
+    assert db.get_data_version(session) == before  # 변경 없는 bulk insert는 버전 유지
+    db.save_snapshot(session, event_id, raw_text="본문", latency_ms=10)
+    assert db.get_data_version(session) == before  # 스냅샷은 제공 데이터가 아니므로 버전 유지
+    session.close()
+
+
+def test_enrichment_queue_upgrades_and_retries(monkeypatch):
+    factory = _memory_db(monkeypatch)
+    session = factory()
+    ids = []
+    for n in range(2):
+        event_id = db.insert_event(session, {"url": f"https://www.kbcard.com/e{n}", "company": "KB국민카드",
+                                             "title": f"이벤트{n}"})
+        db.save_snapshot(session, event_id, extracted_json={"title": f"이벤트{n}", "raw_text": "본문"})
+        db.enqueue_enrichment(session, event_id)
+        ids.append(event_id)
+    session.close()
+
+    async def fake_batch(items):
+        return {
+            ids[0]: ({"one_line_summary": "요약", "category": "쇼핑", "threat_level": "High"}, "gemini"),
+            ids[1]: ({"benefit_level": "보통"}, "rule"),
+        }
+
+    monkeypatch.setattr(pipeline, "is_gemini_configured", lambda: True)
+    monkeypatch.setattr(pipeline, "agenerate_hybrid_insights_batch", fake_batch)
+    monkeypatch.setattr(pipeline, "ENRICH_MAX_ATTEMPTS", 2)
+
+    first = asyncio.run(pipeline.run_enrichment_queue())
+    assert first["upgraded"] == 1 and first["retry"] == 1
+
+    session = factory()
+    assert db.get_event_by_id(session, ids[0]).threat_level == "High"
+    assert db.get_latest_insight(session, ids[0]).source == "gemini"
+    stats = db.get_enrichment_queue_stats(session)
+    assert stats["done"] == 1 and stats["pending"] == 1
+    session.close()
+
+    second = asyncio.run(pipeline.run_enrichment_queue())
+    assert second["failed"] == 1
+    session = factory()
+    assert db.get_enrichment_queue_stats(session)["failed"] == 1
+    session.close()
+
+
+def test_enrichment_claims_do_not_overlap_and_reset_skips_live_claims(monkeypatch):
+    factory = _memory_db(monkeypatch)
+    session = factory()
+    for n in range(5):
+        event_id = db.insert_event(session, {"url": f"https://www.kbcard.com/e{n}", "company": "KB국민카드",
+                                             "title": f"이벤트{n}"})
+        db.enqueue_enrichment(session, event_id)
+    other = factory()
+    first = [row.event_id for row in db.claim_enrichment_batch(session, 3)]
+    second = [row.event_id for row in db.claim_enrichment_batch(other, 3)]
+    assert len(first) == 3 and len(second) == 2
+    assert not set(first) & set(second)
+    assert db.claim_enrichment_batch(other, 3) == []
+
+    # 다른 워커가 막 claim한 항목은 기동 시 reset 대상이 아님 (오래된 claim만 되돌림)
+    assert db.reset_running_enrichment(session) == 0
+    session.query(db.EnrichmentQueue).filter(db.EnrichmentQueue.event_id == first[0])\
+        .update({"updated_at": datetime.now() - timedelta(hours=1)})
+    session.commit()
+    assert db.reset_running_enrichment(session) == 1
+    assert [row.event_id for row in db.claim_enrichment_batch(other, 3)] == [first[0]]
+    session.close()
+    other.close()
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            try:
+                fn()
+                print(f"  PASS {name}")
+            except AssertionError as e:
+                print(f"  FAIL {name}: {e}")
+    print("Done.")